@@ -0,0 +1,20 @@
+"""AcademiQ - Academic Load Index (ALI) core library."""
+
+from .engine import (
+    SAFE_MAX,
+    WARNING_MAX,
+    STATUS_SAFE,
+    STATUS_WARNING,
+    STATUS_CRITICAL,
+    STATUS_LABELS,
+    DEFAULT_POLICY,
+    Score,
+    ThresholdPolicy,
+    classify,
+    round_ali,
+    score_arrays,
+    score_frame,
+    score_assignments,
+    score_student,
+    score_students,
+)
@@ -0,0 +1,435 @@
+"""
+Background overload alerts.
+
+`AlertScanner` follows the record store's change feed
+(`RecordStore.changes`) from a watermark, so each cycle reads only the
+assessments stored since the previous one and never rescans the cohort.
+Per student it compares the ALI before the cycle's first new assessment
+with the latest one and raises an alert when
+
+- the status rose (Safe -> Warning, Warning -> Critical, Safe -> Critical,
+  or a first assessment that is already Warning / Critical), or
+- the ALI jumped by at least `jump_delta` without a status change.
+
+Alerts are deduplicated: one per student per batch, and the same student,
+kind and status is not alerted again within `cooldown` minutes. Each
+batch of alerts goes to an outbox in one call:
+
+- `SQLiteOutbox`: an `alert_outbox` table; the watermark is saved in the
+  same transaction, so a restarted scanner resumes where it stopped
+- `JSONLinesOutbox`: one JSON object per alert appended to a file
+- `SMTPOutbox`: one digest e-mail per batch via an SMTP server
+- `MaildirOutbox`: the same digest e-mails written to a local Maildir, a
+  stand-in for SMTP on machines without a mail server
+
+    python -m academiq.alerts --outbox sqlite:alerts.db --interval 30
+"""
+
+import argparse
+import json
+import mailbox
+import os
+import smtplib
+import sqlite3
+import sys
+import threading
+import time
+from email.message import EmailMessage
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from .engine import STATUS_EMOJIS, STATUS_LABELS, STATUS_WARNING, classify
+from .records import TIMESTAMP_FORMAT, minute_datetime, student_key
+from .store import open_store
+
+ALERT_JUMP_DELTA = 0.3          # ALI increase that alerts even without a status change
+DEFAULT_COOLDOWN = 24 * 60      # minutes before the same alert may repeat
+DEFAULT_SCAN_INTERVAL = 30.0    # seconds between background scans
+DEFAULT_SCAN_BATCH = 5_000      # changes read per batch
+
+
+class Alert(NamedTuple):
+    """One overload notification."""
+
+    seq: int                     # change sequence number of the latest assessment
+    name: str
+    kind: str                    # "status" or "jump"
+    from_status: Optional[int]   # None for a first assessment
+    to_status: int
+    previous_ali: Optional[float]
+    ali: float
+    minute: int
+
+    def to_dict(self):
+        data = self._asdict()
+        data["from_label"] = None if self.from_status is None else STATUS_LABELS[self.from_status]
+        data["to_label"] = STATUS_LABELS[self.to_status]
+        data["assessed"] = minute_datetime(self.minute).strftime(TIMESTAMP_FORMAT)
+        return data
+
+    def summary(self):
+        before = "first assessment" if self.from_status is None else STATUS_LABELS[self.from_status]
+        if self.previous_ali is None:
+            values = f"ALI {self.ali:.2f}"
+        else:
+            values = f"ALI {self.previous_ali:.2f} → {self.ali:.2f}"
+        reason = "ALI jump" if self.kind == "jump" else "status"
+        return (f"{STATUS_EMOJIS[self.to_status]} {self.name}: {reason} {before} → "
+                f"{STATUS_LABELS[self.to_status]} ({values})")
+
+
+def detect_alerts(changes, jump_delta=ALERT_JUMP_DELTA, policy=None):
+    """
+    Alerts for a batch of change-feed tuples, at most one per student: the
+    student's ALI before the batch is compared with their latest one, both
+    classified under `policy` (default thresholds if None).
+    """
+    first_previous, latest = {}, {}
+    for seq, name, minute, previous, ali in changes:
+        key = student_key(name)
+        if key not in first_previous:
+            first_previous[key] = previous
+        latest[key] = (seq, name, minute, ali)
+    if not latest:
+        return []
+
+    before = np.array([np.nan if p is None else p for p in first_previous.values()], dtype=np.float64)
+    after = np.array([ali for _, _, _, ali in latest.values()], dtype=np.float64)
+    known = ~np.isnan(before)
+    before = np.where(known, before, 0.0)
+    old_codes = np.where(known, classify(before, policy), -1)
+    new_codes = classify(after, policy)
+    rose = (new_codes > old_codes) & (new_codes >= STATUS_WARNING)
+    jumped = known & ~rose & (after - before >= jump_delta)
+
+    entries = list(latest.values())
+    alerts = []
+    for i in np.flatnonzero(rose | jumped).tolist():
+        seq, name, minute, ali = entries[i]
+        alerts.append(Alert(
+            seq=seq,
+            name=name,
+            kind="status" if rose[i] else "jump",
+            from_status=int(old_codes[i]) if known[i] else None,
+            to_status=int(new_codes[i]),
+            previous_ali=float(before[i]) if known[i] else None,
+            ali=float(ali),
+            minute=minute,
+        ))
+    return alerts
+
+
+# ============================================================================
+# OUTBOXES
+# ============================================================================
+class Outbox:
+    """Destination for alert batches."""
+
+    def send(self, alerts, watermark):
+        """Deliver one batch; `watermark` is the last change sequence number it covers."""
+        raise NotImplementedError
+
+    def watermark(self):
+        """Watermark to resume from, for outboxes that persist it (else None)."""
+        return None
+
+    def close(self):
+        pass
+
+
+_OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alert_outbox (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    seq           INTEGER NOT NULL UNIQUE,
+    name          TEXT    NOT NULL,
+    kind          TEXT    NOT NULL,
+    from_status   INTEGER,
+    to_status     INTEGER NOT NULL,
+    previous_ali  REAL,
+    ali           REAL    NOT NULL,
+    minute        INTEGER NOT NULL,
+    delivered     INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_alert_outbox_pending ON alert_outbox (delivered, id);
+CREATE TABLE IF NOT EXISTS alert_state (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class SQLiteOutbox(Outbox):
+    """
+    Alerts as rows of an `alert_outbox` table for a relay (or the app) to
+    deliver; `pending` / `mark_delivered` implement the hand-off. The
+    unique change sequence number makes re-sent batches a no-op, so several
+    scanners may share one outbox.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_OUTBOX_SCHEMA)
+            self._conn.commit()
+
+    def send(self, alerts, watermark):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO alert_outbox "
+                "(seq, name, kind, from_status, to_status, previous_ali, ali, minute) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [tuple(alert) for alert in alerts],
+            )
+            self._conn.execute(
+                "INSERT INTO alert_state (key, value) VALUES ('watermark', ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)",
+                (watermark,),
+            )
+
+    def watermark(self):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM alert_state WHERE key = 'watermark'").fetchone()
+        return row[0] if row else None
+
+    def pending(self, limit=100):
+        """Undelivered alerts, oldest first, as (outbox id, Alert) pairs."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, seq, name, kind, from_status, to_status, previous_ali, ali, minute "
+                "FROM alert_outbox WHERE delivered = 0 ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [(row[0], Alert(*row[1:])) for row in rows]
+
+    def mark_delivered(self, ids):
+        ids = list(ids)
+        with self._lock, self._conn:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                self._conn.execute(
+                    f"UPDATE alert_outbox SET delivered = 1 WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+                )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JSONLinesOutbox(Outbox):
+    """Appends one JSON object per alert to a file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, alerts, watermark):
+        if not alerts:
+            return
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.writelines(json.dumps({**alert.to_dict(), "watermark": watermark}) + "\n" for alert in alerts)
+
+
+def digest_message(alerts, sender, recipients):
+    """One plain-text e-mail listing a batch of alerts."""
+    message = EmailMessage()
+    message["Subject"] = f"AcademiQ: {len(alerts)} overload alert{'s' if len(alerts) != 1 else ''}"
+    message["From"] = sender
+    message["To"] = ", ".join(recipients)
+    message.set_content("\n".join(alert.summary() for alert in alerts) + "\n")
+    return message
+
+
+class SMTPOutbox(Outbox):
+    """Sends one digest e-mail per batch through an SMTP server."""
+
+    def __init__(self, host="localhost", port=25, sender="academiq@localhost", recipients=("mentors@localhost",)):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = list(recipients)
+
+    def send(self, alerts, watermark):
+        if not alerts:
+            return
+        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+            smtp.send_message(digest_message(alerts, self.sender, self.recipients))
+
+
+class MaildirOutbox(SMTPOutbox):
+    """Writes the digest e-mails `SMTPOutbox` would send into a local Maildir."""
+
+    def __init__(self, path, sender="academiq@localhost", recipients=("mentors@localhost",)):
+        super().__init__(sender=sender, recipients=recipients)
+        self.path = path
+
+    def send(self, alerts, watermark):
+        if not alerts:
+            return
+        mailbox.Maildir(self.path, create=True).add(digest_message(alerts, self.sender, self.recipients))
+
+
+def open_outbox(spec=None):
+    """
+    Outbox from a spec string (default: the ACADEMIQ_OUTBOX environment
+    variable): "sqlite:PATH", "jsonl:PATH", "maildir:PATH" or
+    "smtp:HOST[:PORT]". E-mail outboxes use ACADEMIQ_ALERT_FROM and the
+    comma-separated ACADEMIQ_ALERT_TO.
+    """
+    spec = spec or os.environ.get("ACADEMIQ_OUTBOX", "sqlite:academiq_alerts.db")
+    kind, _, target = spec.partition(":")
+    mail = {
+        "sender": os.environ.get("ACADEMIQ_ALERT_FROM", "academiq@localhost"),
+        "recipients": os.environ.get("ACADEMIQ_ALERT_TO", "mentors@localhost").split(","),
+    }
+    if kind == "sqlite" and target:
+        return SQLiteOutbox(target)
+    if kind == "jsonl" and target:
+        return JSONLinesOutbox(target)
+    if kind == "maildir" and target:
+        return MaildirOutbox(target, **mail)
+    if kind == "smtp":
+        host, _, port = target.partition(":")
+        return SMTPOutbox(host or "localhost", int(port or 25), **mail)
+    raise ValueError(f"Unknown alert outbox: {spec!r}")
+
+
+# ============================================================================
+# SCANNER
+# ============================================================================
+class AlertScanner:
+    """
+    Turns new assessments into alert batches, from a watermark.
+
+    Starts from `since`, else the outbox's saved watermark, else the
+    store's latest change (only assessments stored from now on alert).
+    """
+
+    def __init__(self, store, outbox, jump_delta=ALERT_JUMP_DELTA, cooldown=DEFAULT_COOLDOWN,
+                 batch_size=DEFAULT_SCAN_BATCH, since=None):
+        self.store = store
+        self.outbox = outbox
+        self.jump_delta = jump_delta
+        self.cooldown = cooldown
+        self.batch_size = batch_size
+        if since is None:
+            since = outbox.watermark()
+        self.watermark = store.last_change() if since is None else since
+        self._last_alerted = {}  # (student key, kind, status) -> minute
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.scans = 0
+        self.changes_read = 0
+        self.alerts_sent = 0
+        self.suppressed = 0
+        self.errors = 0
+        self.last_error = None
+
+    def scan(self):
+        """Process every change since the watermark; returns the alerts sent."""
+        sent = []
+        with self._lock:
+            while True:
+                changes = self.store.changes(self.watermark, self.batch_size)
+                if not changes:
+                    break
+                alerts = self._deduplicate(detect_alerts(changes, self.jump_delta, self.store.policy))
+                watermark = changes[-1][0]
+                self.outbox.send(alerts, watermark)
+                self.watermark = watermark
+                self.changes_read += len(changes)
+                self.alerts_sent += len(alerts)
+                sent.extend(alerts)
+                if len(changes) < self.batch_size:
+                    break
+            self.scans += 1
+        return sent
+
+    def _deduplicate(self, alerts):
+        fresh = []
+        for alert in alerts:
+            key = (student_key(alert.name), alert.kind, alert.to_status)
+            last = self._last_alerted.get(key)
+            if last is not None and abs(alert.minute - last) < self.cooldown:
+                self.suppressed += 1
+                continue
+            self._last_alerted[key] = alert.minute
+            fresh.append(alert)
+        if len(self._last_alerted) > 100_000 and fresh:
+            # Forget alerts older than the cooldown
+            newest = max(alert.minute for alert in fresh)
+            self._last_alerted = {
+                key: minute for key, minute in self._last_alerted.items() if newest - minute < self.cooldown
+            }
+        return fresh
+
+    def start(self, interval=DEFAULT_SCAN_INTERVAL):
+        """Scan every `interval` seconds on a daemon thread until `stop()`."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(interval,), name="academiq-alerts", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self, interval):
+        while not self._stop.is_set():
+            try:
+                self.scan()
+            except Exception as exc:  # keep scanning; the watermark only moves on success
+                self.errors += 1
+                self.last_error = repr(exc)
+            self._stop.wait(interval)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        return {
+            "watermark": self.watermark,
+            "scans": self.scans,
+            "changes_read": self.changes_read,
+            "alerts_sent": self.alerts_sent,
+            "suppressed": self.suppressed,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m academiq.alerts", description="Overload alert scanner.")
+    parser.add_argument("--outbox", help="sqlite:PATH, jsonl:PATH, maildir:PATH or smtp:HOST[:PORT] "
+                                         "(default: ACADEMIQ_OUTBOX or sqlite:academiq_alerts.db)")
+    parser.add_argument("--interval", type=float, default=DEFAULT_SCAN_INTERVAL, help="seconds between scans")
+    parser.add_argument("--jump", type=float, default=ALERT_JUMP_DELTA, help="ALI increase that alerts")
+    parser.add_argument("--cooldown", type=int, default=DEFAULT_COOLDOWN,
+                        help="minutes before the same alert repeats")
+    parser.add_argument("--since", type=int, help="change sequence number to start after (default: resume)")
+    parser.add_argument("--once", action="store_true", help="scan once and exit")
+    args = parser.parse_args(argv)
+
+    store = open_store()
+    outbox = open_outbox(args.outbox)
+    scanner = AlertScanner(store, outbox, jump_delta=args.jump, cooldown=args.cooldown, since=args.since)
+    try:
+        while True:
+            for alert in scanner.scan():
+                print(alert.summary(), file=sys.stderr)
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        outbox.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Streaming ALI distribution.
+
+`AliSketch` is a fixed-bin histogram of ALI values kept up to date as
+records are added, replaced and cleared (next to `stats.StatusCounters`),
+so percentiles and the distribution chart cost the same for ten students
+or a million:
+
+- below FINE_MAX the bins are FINE_STEP wide and centred on the values
+  `records.make_record` rounds ALI to, so quantiles there are exact;
+- above it bins grow geometrically by COARSE_GROWTH (under 1% relative
+  error), and an infinite ALI (no available time) has a bin of its own.
+
+Unlike sampling sketches it removes values exactly (a re-assessment just
+moves one count), and two sketches merge by adding their counts, so
+shards or processes can build sketches separately and combine them.
+"""
+
+import math
+
+import numpy as np
+
+from .engine import STATUS_LABELS, classify
+
+FINE_STEP = 0.01        # ALI display precision
+FINE_MAX = 5.0          # exact bins below this ALI
+COARSE_GROWTH = 1.02    # bin width ratio above FINE_MAX
+COARSE_MAX = 1e6        # last finite bin edge (beyond: one open bin, then +inf)
+
+
+def _layout():
+    n_fine = round(FINE_MAX / FINE_STEP)
+    fine = (np.arange(n_fine + 1) - 0.5) * FINE_STEP
+    n_coarse = math.ceil(math.log(COARSE_MAX / fine[-1]) / math.log(COARSE_GROWTH))
+    coarse = fine[-1] * COARSE_GROWTH ** np.arange(1, n_coarse + 1)
+    edges = np.r_[fine, coarse, np.inf]  # bin i holds edges[i] <= ALI < edges[i + 1]; the last one is +inf
+    values = np.r_[
+        np.round(np.arange(n_fine) * FINE_STEP, 2),       # fine bin centres
+        np.sqrt(edges[n_fine:-2] * edges[n_fine + 1:-1]),  # geometric centres of coarse bins
+        edges[-2],                                         # open bin above COARSE_MAX
+        np.inf,
+    ]
+    edges.flags.writeable = values.flags.writeable = False
+    return n_fine, edges, values
+
+
+N_FINE, BIN_EDGES, BIN_VALUES = _layout()
+N_BINS = len(BIN_VALUES)
+
+
+def bin_index(ali):
+    """Sketch bin of each ALI value (scalar or array)."""
+    index = np.searchsorted(BIN_EDGES, np.asarray(ali, dtype=np.float64), side="right") - 1
+    return np.maximum(index, 0)  # NaN lands in the +inf bin, negatives in the first
+
+
+class AliSketch:
+    """Mergeable fixed-bin ALI histogram with quantile and chart queries."""
+
+    __slots__ = ("counts",)
+
+    def __init__(self, counts=None):
+        self.counts = np.zeros(N_BINS, dtype=np.int64) if counts is None else np.array(counts, dtype=np.int64)
+
+    @classmethod
+    def from_values(cls, alis, weights=None):
+        sketch = cls()
+        sketch.add_many(alis, weights)
+        return sketch
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def add(self, ali):
+        self.counts[bin_index(ali)] += 1
+
+    def add_many(self, alis, weights=None):
+        """Count a batch of ALI values (optionally with integer multiplicities)."""
+        alis = np.asarray(alis, dtype=np.float64)
+        if alis.size:
+            self.counts += np.bincount(bin_index(alis), weights, minlength=N_BINS).astype(np.int64)
+
+    def remove(self, ali):
+        self.counts[bin_index(ali)] -= 1
+
+    def remove_many(self, alis):
+        alis = np.asarray(alis, dtype=np.float64)
+        if alis.size:
+            self.counts -= np.bincount(bin_index(alis), minlength=N_BINS)
+
+    def merge(self, other):
+        """Add another sketch's counts into this one; returns self."""
+        self.counts += other.counts
+        return self
+
+    def copy(self):
+        return AliSketch(self.counts)
+
+    def clear(self):
+        self.counts[:] = 0
+
+    def quantiles(self, qs):
+        """
+        ALI at each quantile in `qs` (nearest rank: the smallest stored
+        value with at least q of the records at or below it); None if empty.
+        """
+        total = self.total
+        if total == 0:
+            return [None] * len(qs)
+        ranks = np.clip(np.ceil(np.asarray(qs, dtype=np.float64) * total), 1, total)
+        return BIN_VALUES[np.searchsorted(np.cumsum(self.counts), ranks)].tolist()
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    def histogram(self, step=0.1, upper=3.0, policy=None):
+        """
+        Counts per display bin and status: `upper / step` bins of width
+        `step` from 0, plus one bin for ALI >= `upper`. Returns (bin lower
+        bounds, int array of shape (bins, 3)) with statuses classified under
+        `policy`, so a bin straddling a cut-off is split by status.
+        """
+        per = round(step / FINE_STEP)
+        n = round(upper / step)
+        if n * per > N_FINE:
+            raise ValueError(f"histogram upper bound must not exceed {FINE_MAX:g}")
+        display = np.minimum(np.arange(N_BINS) // per, n)
+        counts = np.zeros((n + 1, len(STATUS_LABELS)), dtype=np.int64)
+        np.add.at(counts, (display, classify(BIN_VALUES, policy)), self.counts)
+        return np.round(np.arange(n + 1) * step, 6), counts
+
+    def to_dict(self):
+        """Sparse JSON-friendly form, for shipping a sketch between processes."""
+        bins = np.flatnonzero(self.counts)
+        return {"bins": bins.tolist(), "counts": self.counts[bins].tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls()
+        sketch.counts[np.asarray(data["bins"], dtype=np.intp)] = data["counts"]
+        return sketch
@@ -0,0 +1,380 @@
+"""
+Academic Load Index (ALI) engine.
+
+Headless, vectorized implementation of the ALI math used by the Streamlit
+app. Every function works on whole columns at once so a full cohort can be
+scored in a single pass:
+
+    ALI = Total Required Hours / (Daily Study Hours x Tightest Deadline)
+
+It also provides the "horizon ALI": an earliest-deadline-first sweep that
+compares the hours due by each deadline with the hours available up to that
+deadline and reports the worst ratio. It never exceeds the classic ALI and
+does not penalize students whose later assignments have later deadlines.
+
+pandas is only imported by the DataFrame helpers, so the scalar / array
+scoring path (and the app pages built on it) loads without it.
+"""
+
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+# ============================================================================
+# THRESHOLDS & STATUS LABELS
+# ============================================================================
+SAFE_MAX = 1.0       # ALI < 1.0          -> Safe
+WARNING_MAX = 1.3    # 1.0 <= ALI <= 1.3  -> Warning, above -> Critical
+                     # (defaults; a cohort can use its own ThresholdPolicy)
+
+ALI_DECIMALS = 2     # precision ALI is stored, shown and classified at
+
+STATUS_SAFE = 0
+STATUS_WARNING = 1
+STATUS_CRITICAL = 2
+
+STATUS_LABELS = ("Safe", "Warning", "Critical Overload")
+STATUS_EMOJIS = ("✅", "⚠️", "🚨")
+STATUS_COLORS = ("safe", "warning", "critical")
+
+
+class Score(NamedTuple):
+    """ALI result for a single student."""
+
+    total_hours: float
+    min_deadline: int
+    available_hours: float
+    ali: float
+    status_code: int
+    buffer_hours: float
+    shortage_hours: float
+    horizon_ali: float = 0.0
+    horizon_deadline: int = 1
+
+    @property
+    def status(self):
+        return STATUS_LABELS[self.status_code]
+
+    @property
+    def emoji(self):
+        return STATUS_EMOJIS[self.status_code]
+
+    @property
+    def color(self):
+        return STATUS_COLORS[self.status_code]
+
+
+class ThresholdPolicy(NamedTuple):
+    """
+    Status cut-offs for one cohort / programme: ALI < safe_max is Safe,
+    safe_max <= ALI <= warning_max is Warning, anything above is Critical.
+    """
+
+    safe_max: float = SAFE_MAX
+    warning_max: float = WARNING_MAX
+    name: str = "default"
+
+    def classify(self, ali):
+        return classify(ali, self)
+
+    def edges(self):
+        """Sorted bucket edges: a status code is the number of edges <= ALI."""
+        return _edges(float(self.safe_max), float(self.warning_max))
+
+    def describe(self, code):
+        """ALI range of a status code as text, e.g. "1.0 ≤ ALI ≤ 1.3"."""
+        safe_max, warning_max = _cutoff_text(self.safe_max), _cutoff_text(self.warning_max)
+        if code == STATUS_SAFE:
+            return f"ALI < {safe_max}"
+        if code == STATUS_WARNING:
+            return f"{safe_max} ≤ ALI ≤ {warning_max}"
+        return f"ALI > {warning_max}"
+
+    def changed_ranges(self, other):
+        """
+        Half-open ALI ranges [low, high) whose status differs between this
+        policy and `other`; everything outside them keeps its status, so a
+        policy change only has to reclassify these.
+        """
+        return [
+            (min(old, new), max(old, new))
+            for old, new in zip(self.edges().tolist(), other.edges().tolist())
+            if old != new
+        ]
+
+
+DEFAULT_POLICY = ThresholdPolicy()
+
+
+def _cutoff_text(value):
+    """1.0 -> "1.0", 1.15 -> "1.15" (at least one decimal, at most three)."""
+    text = f"{value:.3f}".rstrip("0")
+    return text + "0" if text.endswith(".") else text
+
+
+@lru_cache(maxsize=64)
+def _edges(safe_max, warning_max):
+    if not safe_max <= warning_max:
+        raise ValueError(f"safe_max ({safe_max:g}) must not exceed warning_max ({warning_max:g})")
+    # ALI == warning_max is still Warning, so its edge sits just above it
+    edges = np.array([safe_max, np.nextafter(warning_max, np.inf)])
+    edges.flags.writeable = False
+    return edges
+
+
+# ============================================================================
+# VECTORIZED CORE
+# ============================================================================
+def round_ali(ali):
+    """ALI (scalar or array) at ALI_DECIMALS, as records store it."""
+    return np.round(np.asarray(ali, dtype=np.float64), ALI_DECIMALS)
+
+
+def classify(ali, policy=None):
+    """
+    Map ALI values (scalar or array) to status codes 0/1/2 under `policy`
+    (default thresholds if None): one `searchsorted` over the policy's
+    edges, so a whole cohort is a single vectorized call. NaN is Critical.
+
+    Values are classified at display precision (`round_ali`), so a fresh
+    score, its stored record and every later reclassification agree: an
+    ALI of 1.3043 is shown and stored as 1.30 and is Warning everywhere.
+    """
+    edges = (policy or DEFAULT_POLICY).edges()
+    return np.searchsorted(edges, round_ali(ali), side="right").astype(np.int8)
+
+
+def score_arrays(total_hours, min_deadline, daily_hours, policy=None):
+    """
+    Score a cohort given per-student columns.
+
+    Returns a dict of NumPy arrays: available_hours, ali, status_code,
+    buffer_hours and shortage_hours. A non-positive available time gives
+    an infinite ALI (always Critical), matching the original form logic.
+    """
+    total_hours = np.asarray(total_hours, dtype=np.float64)
+    min_deadline = np.asarray(min_deadline, dtype=np.float64)
+    daily_hours = np.asarray(daily_hours, dtype=np.float64)
+
+    available_hours = daily_hours * min_deadline
+    positive = available_hours > 0
+    ali = np.divide(
+        total_hours,
+        available_hours,
+        out=np.full(total_hours.shape, np.inf),
+        where=positive,
+    )
+    diff = available_hours - total_hours
+
+    return {
+        "available_hours": available_hours,
+        "ali": ali,
+        "status_code": classify(ali, policy),
+        "buffer_hours": np.maximum(diff, 0.0),
+        "shortage_hours": np.maximum(-diff, 0.0),
+    }
+
+
+def edf_sweep(group, required_hours, deadline_days, daily_hours):
+    """
+    Earliest-deadline-first sweep over per-subject rows.
+
+    `group` holds one integer code per row identifying the student (all
+    zeros for a single student); `daily_hours` is repeated per row. Rows are
+    sorted by (group, deadline) in O(n log n) and, within each group, the
+    hours due by each deadline are accumulated and divided by the hours
+    available up to it.
+
+    Returns (order, cum_hours, ratio): the sort permutation plus the
+    cumulative hours and load ratio for each row in sorted order.
+    """
+    group = np.asarray(group)
+    required_hours = np.asarray(required_hours, dtype=np.float64)
+    deadline_days = np.asarray(deadline_days, dtype=np.float64)
+    daily_hours = np.asarray(daily_hours, dtype=np.float64)
+
+    order = np.lexsort((deadline_days, group))
+    g = group[order]
+    hours = required_hours[order]
+
+    if g.size == 0 or g[0] == g[-1]:
+        cum_hours = np.cumsum(hours)  # single student (rows are sorted by group)
+    else:
+        import pandas as pd
+
+        # Per-group running sum: subtracting offsets from one global cumsum would
+        # make each student's result depend on who else is in the batch
+        cum_hours = pd.Series(hours).groupby(g, sort=False).cumsum().to_numpy()
+
+    available = daily_hours[order] * deadline_days[order]
+    ratio = np.divide(
+        cum_hours,
+        available,
+        out=np.full(cum_hours.shape, np.inf),
+        where=available > 0,
+    )
+    return order, cum_hours, ratio
+
+
+def horizon_arrays(group, required_hours, deadline_days, daily_hours):
+    """
+    Horizon ALI per group (see `edf_sweep`).
+
+    Returns a dict of arrays ordered by ascending group code: group,
+    horizon_ali (the worst cumulative load ratio) and horizon_deadline (the
+    deadline at which it occurs).
+    """
+    order, _, ratio = edf_sweep(group, required_hours, deadline_days, daily_hours)
+    g = np.asarray(group)[order]
+    d = np.asarray(deadline_days)[order]
+    if len(g) == 0:
+        return {"group": g, "horizon_ali": ratio, "horizon_deadline": d}
+
+    starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+    sizes = np.diff(np.r_[starts, len(g)])
+    horizon = np.maximum.reduceat(ratio, starts)
+
+    # First row in each group that reaches the group's maximum
+    hits = np.flatnonzero(ratio == np.repeat(horizon, sizes))
+    hit_group = np.searchsorted(starts, hits, side="right") - 1
+    first_hits = hits[np.r_[True, hit_group[1:] != hit_group[:-1]]]
+
+    return {"group": g[starts], "horizon_ali": horizon, "horizon_deadline": d[first_hits]}
+
+
+def score_frame(df, total_col="total_hours", deadline_col="min_deadline",
+                daily_col="daily_hours", policy=None):
+    """
+    Score a per-student DataFrame and return a copy with the ALI columns
+    appended (available_hours, ali, status_code, status, buffer_hours,
+    shortage_hours).
+    """
+    import pandas as pd
+
+    result = score_arrays(df[total_col], df[deadline_col], df[daily_col], policy)
+    out = df.copy()
+    for key, values in result.items():
+        out[key] = values
+    out["status"] = pd.Categorical.from_codes(
+        result["status_code"], categories=list(STATUS_LABELS)
+    )
+    return out
+
+
+def aggregate_assignments(df, student_col="student", assignments_col="assignments",
+                          hours_col="hours_per_assignment",
+                          deadline_col="deadline_days", daily_col="daily_hours"):
+    """
+    Collapse per-subject / per-assignment rows into one row per student.
+
+    Returns a DataFrame indexed by student with total_hours, min_deadline and
+    daily_hours columns, ready for `score_frame`.
+    """
+    import pandas as pd
+
+    work = pd.DataFrame({
+        "student": df[student_col].to_numpy(),
+        "total_hours": df[assignments_col].to_numpy(dtype=np.float64)
+        * df[hours_col].to_numpy(dtype=np.float64),
+        "min_deadline": df[deadline_col].to_numpy(),
+        "daily_hours": df[daily_col].to_numpy(dtype=np.float64),
+    })
+    grouped = work.groupby("student", sort=False)
+    return pd.DataFrame({
+        "total_hours": grouped["total_hours"].sum(),
+        "min_deadline": grouped["min_deadline"].min(),
+        "daily_hours": grouped["daily_hours"].first(),
+    })
+
+
+def horizon_frame(df, student_col="student", assignments_col="assignments",
+                  hours_col="hours_per_assignment", deadline_col="deadline_days",
+                  daily_col="daily_hours"):
+    """
+    Horizon ALI for every student in a per-subject / per-assignment frame.
+
+    Returns a DataFrame indexed by student (first-appearance order) with
+    horizon_ali and horizon_deadline columns.
+    """
+    import pandas as pd
+
+    codes, students = pd.factorize(df[student_col], sort=False)
+    required = df[hours_col].to_numpy(dtype=np.float64)
+    if assignments_col in df.columns:
+        required = required * df[assignments_col].to_numpy(dtype=np.float64)
+    result = horizon_arrays(codes, required, df[deadline_col].to_numpy(), df[daily_col].to_numpy())
+    return pd.DataFrame(
+        {"horizon_ali": result["horizon_ali"], "horizon_deadline": result["horizon_deadline"]},
+        index=pd.Index(students[result["group"]], name=student_col),
+    )
+
+
+def score_assignments(df, policy=None, **columns):
+    """Aggregate per-assignment rows and score every student in one pass."""
+    scored = score_frame(aggregate_assignments(df, **columns), policy=policy)
+    return scored.join(horizon_frame(df, **columns))
+
+
+# ============================================================================
+# PER-STUDENT WRAPPERS (used by the Student Assessment form and the API)
+# ============================================================================
+def score_students(students, policy=None):
+    """
+    Score a batch of students given as (subjects, daily_hours) pairs, where
+    `subjects` is a list like the form's `subject_data`.
+
+    All students are scored together in one vectorized pass; returns one
+    `Score` per student, in order.
+    """
+    n = len(students)
+    group, required, deadlines = [], [], []
+    for code, (subjects, _) in enumerate(students):
+        for s in subjects:
+            group.append(code)
+            required.append(s["assignments"] * s["hours_per_assignment"])
+            deadlines.append(s["deadline_days"])
+
+    group = np.asarray(group, dtype=np.intp)
+    required = np.asarray(required, dtype=np.float64)
+    deadlines = np.asarray(deadlines, dtype=np.int64)
+    daily = np.asarray([daily_hours for _, daily_hours in students], dtype=np.float64)
+
+    total_hours = np.bincount(group, weights=required, minlength=n)
+    min_deadline = np.full(n, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(min_deadline, group, deadlines)
+    min_deadline[np.bincount(group, minlength=n) == 0] = 1  # no subjects
+
+    result = score_arrays(total_hours, min_deadline, daily, policy)
+
+    # Students without subjects keep horizon ALI 0 at the default deadline
+    horizon_ali = np.zeros(n)
+    horizon_deadline = min_deadline.copy()
+    horizon = horizon_arrays(group, required, deadlines, daily[group])
+    horizon_ali[horizon["group"]] = horizon["horizon_ali"]
+    horizon_deadline[horizon["group"]] = horizon["horizon_deadline"]
+
+    return [
+        Score(
+            total_hours=float(total_hours[i]),
+            min_deadline=int(min_deadline[i]),
+            available_hours=float(result["available_hours"][i]),
+            ali=float(result["ali"][i]),
+            status_code=int(result["status_code"][i]),
+            buffer_hours=float(result["buffer_hours"][i]),
+            shortage_hours=float(result["shortage_hours"][i]),
+            horizon_ali=float(horizon_ali[i]),
+            horizon_deadline=int(horizon_deadline[i]),
+        )
+        for i in range(n)
+    ]
+
+
+def score_student(subjects, daily_hours, policy=None):
+    """
+    Score one student from the form's `subject_data` list.
+
+    Runs through `score_students` so the form, the API and batch scoring
+    always agree.
+    """
+    return score_students([(subjects, daily_hours)], policy)[0]
@@ -0,0 +1,109 @@
+"""
+Record export.
+
+Exports are produced batch by batch from the record store, so the whole
+cohort never exists as one DataFrame plus one giant string at the same
+time. Parquet and Arrow outputs keep proper column types (numeric ALI,
+real timestamps, categorical status) for downstream analytics.
+
+Parquet / Arrow output needs `pyarrow`.
+"""
+
+import io
+
+import pandas as pd
+
+from .engine import STATUS_EMOJIS, STATUS_LABELS
+from .records import TIMESTAMP_FORMAT
+from .store import RECORD_FIELDS
+
+DEFAULT_BATCH_SIZE = 10_000
+
+STATUS_CATEGORIES = [f"{emoji} {label}" for emoji, label in zip(STATUS_EMOJIS, STATUS_LABELS)]
+
+COLUMN_DTYPES = {
+    "Name": "string",
+    "ALI": "float64",
+    "Total Hours": "float64",
+    "Available Hours": "float64",
+    "Tightest Deadline": "int32",
+    "Daily Capacity": "float64",
+    "Horizon ALI": "float64",
+    "Horizon Deadline": "Int32",
+}
+
+
+def typed_frame(records):
+    """Build a DataFrame with analytics-friendly column types."""
+    df = pd.DataFrame(records, columns=list(RECORD_FIELDS)).astype(COLUMN_DTYPES)
+    df["Status"] = pd.Categorical(df["Status"], categories=STATUS_CATEGORIES)
+    df["Timestamp"] = pd.to_datetime(df["Timestamp"], format=TIMESTAMP_FORMAT)
+    return df
+
+
+def iter_csv(store, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield the CSV export as UTF-8 byte chunks, header first."""
+    yield (",".join(RECORD_FIELDS) + "\n").encode("utf-8")
+    for batch in store.iter_batches(batch_size):
+        df = pd.DataFrame(batch, columns=list(RECORD_FIELDS))
+        yield df.to_csv(index=False, header=False).encode("utf-8")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ImportError("Parquet / Arrow export requires `pyarrow` (pip install pyarrow).") from exc
+    return pyarrow
+
+
+def _arrow_batches(store, batch_size):
+    pa = _require_pyarrow()
+    schema = pa.Schema.from_pandas(typed_frame([]), preserve_index=False)
+    batches = (
+        pa.RecordBatch.from_pandas(typed_frame(batch), schema=schema, preserve_index=False)
+        for batch in store.iter_batches(batch_size)
+    )
+    return schema, batches
+
+
+def write_parquet(store, sink, batch_size=DEFAULT_BATCH_SIZE):
+    """Write all records to a Parquet file path or binary file object."""
+    schema, batches = _arrow_batches(store, batch_size)
+    import pyarrow.parquet as pq
+
+    with pq.ParquetWriter(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+def write_arrow(store, sink, batch_size=DEFAULT_BATCH_SIZE):
+    """Write all records as an Arrow IPC stream to a path or binary file object."""
+    schema, batches = _arrow_batches(store, batch_size)
+    import pyarrow as pa
+
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+def export_bytes(store, fmt, batch_size=DEFAULT_BATCH_SIZE):
+    """Serialize all records in one of `EXPORT_FORMATS` and return the bytes."""
+    if fmt == "csv":
+        return b"".join(iter_csv(store, batch_size))
+    buffer = io.BytesIO()
+    if fmt == "parquet":
+        write_parquet(store, buffer, batch_size)
+    elif fmt == "arrow":
+        write_arrow(store, buffer, batch_size)
+    else:
+        raise ValueError(f"Unknown export format: {fmt!r}")
+    return buffer.getvalue()
+
+
+# format -> (label, file extension, mime type)
+EXPORT_FORMATS = {
+    "csv": ("CSV", "csv", "text/csv"),
+    "parquet": ("Parquet", "parquet", "application/vnd.apache.parquet"),
+    "arrow": ("Arrow IPC", "arrows", "application/vnd.apache.arrow.stream"),
+}
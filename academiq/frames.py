@@ -0,0 +1,75 @@
+"""
+Versioned DataFrame cache for the Mentor Dashboard.
+
+Building a DataFrame from the stored records is the most expensive part of
+a dashboard rerun. `FrameCache` keeps the records DataFrame (used by the
+cohort what-if) keyed on `RecordStore.version`, so reruns caused by button
+clicks or page switches reuse it until the records change. Ranked and
+ALI-range views are served by the store's own indexes, not from here.
+
+Under a steady stream of submissions the version changes on nearly every
+rerun. `max_staleness` (seconds) bounds how often the frames are rebuilt:
+a build younger than that is reused even if newer records exist, so the
+frame lags the store by at most `max_staleness`.
+"""
+
+import os
+import threading
+import time
+
+DEFAULT_MAX_STALENESS = 2.0  # seconds
+
+
+def default_staleness():
+    """Frame staleness bound (seconds) from ACADEMIQ_STALENESS_SECONDS."""
+    return float(os.environ.get("ACADEMIQ_STALENESS_SECONDS", DEFAULT_MAX_STALENESS))
+
+
+class FrameCache:
+    """Records DataFrame rebuilt only when the store version changes."""
+
+    def __init__(self, max_staleness=0.0):
+        self.max_staleness = max_staleness
+        self._lock = threading.Lock()
+        self._version = None
+        self._built_at = None
+        self._frame = None
+        self.hits = 0
+        self.misses = 0
+        self.last_build_seconds = 0.0
+
+    def frame(self, store):
+        """All records, newest first. Treat as read-only."""
+        with self._lock:
+            version = store.version
+            fresh_enough = (
+                self._built_at is not None
+                and time.monotonic() - self._built_at < self.max_staleness
+            )
+            if version == self._version or (self._version is not None and fresh_enough):
+                self.hits += 1
+                return self._frame
+
+            self.misses += 1
+            started = time.perf_counter()
+            self._frame = store.frame()
+            self._version = version
+            self._built_at = time.monotonic()
+            self.last_build_seconds = time.perf_counter() - started
+            return self._frame
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "version": self._version,
+            "age_seconds": time.monotonic() - self._built_at if self._built_at is not None else None,
+            "last_build_seconds": self.last_build_seconds,
+        }
+
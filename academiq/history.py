@@ -0,0 +1,155 @@
+"""
+Per-student ALI history.
+
+Every stored assessment is also appended to its student's time series of
+(epoch minute, ALI) points. `AliHistory` is the in-memory series index used
+by `MemoryStore` (the SQLite backend keeps the same series in an indexed
+table), and the helpers below turn a series into rolling averages, a
+"rising fast" flag and a small inline SVG sparkline for the dashboard
+cards.
+
+The same points in arrival order, each with the ALI of the record it
+replaced and addressed by a sequence number, are the change feed that
+incremental consumers (the alert scanner) resume from a watermark.
+"""
+
+import bisect
+from array import array
+
+import numpy as np
+
+from .records import minute_datetime
+
+SPARKLINE_POINTS = 12    # points fetched per student card
+RISING_DELTA = 0.25      # ALI increase vs. the recent average that counts as "rising fast"
+RISING_WINDOW = 3        # previous points the latest one is compared against
+
+
+class AliHistory:
+    """
+    Append-only (student, minute, previous ALI, ALI) log in arrival order,
+    with 1-based sequence numbers that keep growing across clear().
+
+    Students are small integer ids (the owning store's row positions). Each
+    point links to the same student's previous one, which gives both the
+    student's series (by walking the links) and the ALI the point replaced,
+    so one set of typed arrays (24 bytes per point, plus 8 per student)
+    serves the series reads and the change feed.
+    """
+
+    def __init__(self):
+        self._base = 0
+        self._reset()
+
+    def __len__(self):
+        return len(self._alis)
+
+    @property
+    def last(self):
+        """Sequence number of the newest point (0 if nothing was ever logged)."""
+        return self._base + len(self._alis)
+
+    def extend(self, points):
+        """Append (student, minute, ALI) triples."""
+        heads = self._heads
+        for student, minute, ali in points:
+            missing = student + 1 - len(heads)
+            if missing > 0:
+                heads.extend(array("q", [-1]) * missing)
+            self._previous.append(heads[student])
+            heads[student] = len(self._alis)
+            self._students.append(student)
+            self._minutes.append(minute)
+            self._alis.append(ali)
+
+    def points(self, student, last=None, since=None):
+        """
+        (datetime, ALI) pairs for `student`, oldest first: the `last` most
+        recent points and / or those at or after the epoch minute `since`.
+        """
+        chain = []
+        i = self._heads[student] if student < len(self._heads) else -1
+        while i >= 0:
+            chain.append(i)
+            i = self._previous[i]
+        chain.reverse()
+        minutes = [self._minutes[i] for i in chain]
+        if any(a > b for a, b in zip(minutes, minutes[1:])):
+            # Back-dated assessment (e.g. an import with an explicit timestamp);
+            # the stable sort keeps arrival order within a minute
+            chain.sort(key=self._minutes.__getitem__)
+            minutes.sort()
+        start = 0 if since is None else bisect.bisect_left(minutes, since)
+        if last is not None:
+            start = max(start, len(chain) - last)
+        return [(minute_datetime(self._minutes[i]), self._alis[i]) for i in chain[start:]]
+
+    def since(self, after, limit=None):
+        """Points with sequence number > `after`, oldest first, as (seq, student, minute, previous ALI, ALI)."""
+        start = max(after - self._base, 0)
+        stop = len(self._alis) if limit is None else min(start + limit, len(self._alis))
+        previous = self._previous
+        return [
+            (self._base + i + 1, self._students[i], self._minutes[i],
+             None if previous[i] < 0 else self._alis[previous[i]], self._alis[i])
+            for i in range(start, stop)
+        ]
+
+    def clear(self):
+        self._base += len(self._alis)
+        self._reset()
+
+    def _reset(self):
+        self._heads = array("q")      # student -> index of their newest point (-1: none)
+        self._previous = array("q")   # point -> the student's previous point (-1: first)
+        self._students = array("i")
+        self._minutes = array("i")
+        self._alis = array("d")
+
+
+# ============================================================================
+# TREND ANALYSIS
+# ============================================================================
+def rolling_mean(values, window=RISING_WINDOW):
+    """Trailing mean over up to `window` points (shorter at the start)."""
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return values
+    finite = np.where(np.isfinite(values), values, 0.0)
+    cum = np.cumsum(np.r_[0.0, finite])
+    idx = np.arange(1, values.size + 1)
+    lo = np.maximum(idx - window, 0)
+    return (cum[idx] - cum[lo]) / (idx - lo)
+
+
+def ali_delta(values, window=RISING_WINDOW):
+    """Latest ALI minus the mean of the `window` points before it (None if < 2 points)."""
+    values = np.asarray(values, dtype=np.float64)
+    if values.size < 2:
+        return None
+    return float(values[-1] - values[-1 - window:-1].mean())
+
+
+def rising_fast(values, threshold=RISING_DELTA, window=RISING_WINDOW):
+    delta = ali_delta(values, window)
+    return delta is not None and delta >= threshold
+
+
+def sparkline_svg(values, width=160, height=36, color="#58a6ff"):
+    """Inline SVG polyline of a short ALI series (empty string for < 2 points)."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if values.size < 2:
+        return ""
+    low, high = float(values.min()), float(values.max())
+    span = (high - low) or 1.0
+    xs = np.linspace(2, width - 2, values.size)
+    ys = height - 2 - (values - low) / span * (height - 4)
+    points = " ".join(f"{x:.1f},{y:.1f}" for x, y in zip(xs, ys))
+    return (
+        f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" '
+        f'xmlns="http://www.w3.org/2000/svg">'
+        f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="2" '
+        f'stroke-linejoin="round" stroke-linecap="round"/>'
+        f'<circle cx="{xs[-1]:.1f}" cy="{ys[-1]:.1f}" r="2.5" fill="{color}"/></svg>'
+    )
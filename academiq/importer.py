@@ -0,0 +1,222 @@
+"""
+Bulk cohort import.
+
+Streams a per-assignment workload file (CSV or Parquet) in chunks, folds
+each chunk into running per-student, per-deadline hour totals and scores
+the cohort at the end. Only those aggregates (at most one row per student
+and distinct deadline) are kept in memory, never the raw file. Keeping the
+deadline level lets the horizon ALI be computed without the raw rows.
+
+Expected columns (one row per subject or per assignment):
+
+    student, hours_per_assignment, deadline_days, daily_hours
+    assignments   (optional, defaults to 1 per row)
+
+Command line usage:
+
+    python -m academiq.importer workload.csv -o scored.csv
+    python -m academiq.importer history.csv --workers 8 --save   # see parallel.py
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from .engine import horizon_frame, score_frame
+from .records import student_key
+
+DEFAULT_CHUNKSIZE = 250_000
+COMPACT_EVERY = 16  # merge partial aggregates after this many chunks
+
+REQUIRED_COLUMNS = ("student", "hours_per_assignment", "deadline_days", "daily_hours")
+
+# Student ids stay text in every chunk ("007" must not become 7 in an all-numeric one)
+CSV_DTYPES = {"student": str}
+
+
+def _source_name(source):
+    return str(getattr(source, "name", source))
+
+
+def iter_chunks(source, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yield DataFrame chunks from a CSV or Parquet path / file-like object.
+
+    Parquet support needs `pyarrow`.
+    """
+    if _source_name(source).lower().endswith((".parquet", ".pq")):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Parquet import requires `pyarrow` (pip install pyarrow).") from exc
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunksize, dtype=CSV_DTYPES)
+
+
+def _numeric(chunk, column):
+    """`column` as numbers; blank or non-numeric cells raise ValueError naming their students."""
+    values = pd.to_numeric(chunk[column], errors="coerce")
+    bad = ~np.isfinite(values.to_numpy(dtype=np.float64))
+    if bad.any():
+        students = chunk["student"][bad].astype(str).str.strip().unique()
+        shown = ", ".join(students[:5]) + (", ..." if len(students) > 5 else "")
+        raise ValueError(
+            f"Column '{column}' is blank or not a number in {int(bad.sum())} row(s) (students: {shown})"
+        )
+    return values
+
+
+def _aggregate_chunk(chunk):
+    missing = [c for c in REQUIRED_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+    hours = _numeric(chunk, "hours_per_assignment")
+    if "assignments" in chunk.columns:
+        hours = hours * _numeric(chunk, "assignments")
+
+    names = chunk["student"].astype(str).str.strip()
+    work = pd.DataFrame({
+        # Grouped by the normalized id, as in the stores; the first spelling is shown
+        "student": names.map(student_key),
+        "name": names,
+        "deadline_days": _numeric(chunk, "deadline_days"),
+        "hours": hours.astype("float64"),
+        "daily_hours": _numeric(chunk, "daily_hours").astype("float64"),
+    })
+    return _merge([work.set_index(["student", "deadline_days"])])
+
+
+def _merge(parts):
+    combined = pd.concat(parts) if len(parts) > 1 else parts[0]
+    grouped = combined.groupby(level=[0, 1], sort=False)
+    return pd.DataFrame({
+        "name": grouped["name"].first(),
+        "hours": grouped["hours"].sum(),
+        "daily_hours": grouped["daily_hours"].first(),
+    })
+
+
+class CohortAccumulator:
+    """Running per-student aggregates built one chunk at a time."""
+
+    def __init__(self):
+        self._parts = []
+        self.rows_read = 0
+        self.chunks_read = 0
+
+    def add_chunk(self, chunk):
+        self.add_aggregates(_aggregate_chunk(chunk))
+        self.rows_read += len(chunk)
+        self.chunks_read += 1
+
+    def add_aggregates(self, part):
+        """Fold in partial (student, deadline_days) aggregates, e.g. from another process."""
+        self._parts.append(part)
+        if len(self._parts) >= COMPACT_EVERY:
+            self._parts = [_merge(self._parts)]
+
+    def by_deadline(self):
+        """Hours due (and the student's display name) per (student key, deadline_days)."""
+        if not self._parts:
+            return pd.DataFrame(
+                {"name": [], "hours": [], "daily_hours": []},
+                index=pd.MultiIndex.from_arrays([[], []], names=["student", "deadline_days"]),
+            )
+        self._parts = [_merge(self._parts)]
+        return self._parts[0]
+
+    def aggregates(self):
+        """Per-student (key) display name, total_hours, min_deadline and daily_hours."""
+        deadlines = self.by_deadline().reset_index()
+        grouped = deadlines.groupby("student", sort=False)
+        return pd.DataFrame({
+            "name": grouped["name"].first(),
+            "total_hours": grouped["hours"].sum(),
+            "min_deadline": grouped["deadline_days"].min(),
+            "daily_hours": grouped["daily_hours"].first(),
+        })
+
+    def result(self):
+        """Score every student seen so far, including the horizon ALI, indexed by display name."""
+        deadlines = self.by_deadline().reset_index()
+        horizon = horizon_frame(deadlines, hours_col="hours")
+        aggregates = self.aggregates()
+        scored = score_frame(aggregates.drop(columns="name")).join(horizon)
+        return scored.rename(index=aggregates["name"]).rename_axis("student")
+
+
+def import_cohort(source, chunksize=DEFAULT_CHUNKSIZE, progress=None):
+    """
+    Stream `source` and return the scored per-student DataFrame.
+
+    `progress`, if given, is called as progress(rows_read, chunks_read)
+    after every chunk.
+    """
+    acc = CohortAccumulator()
+    for chunk in iter_chunks(source, chunksize):
+        acc.add_chunk(chunk)
+        if progress is not None:
+            progress(acc.rows_read, acc.chunks_read)
+    return acc.result()
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m academiq.importer",
+        description="Score a per-assignment workload file (CSV or Parquet).",
+    )
+    parser.add_argument("input", help="CSV or Parquet workload file")
+    parser.add_argument("-o", "--output", help="write scored students to this CSV (default: stdout)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"rows per chunk (default: {DEFAULT_CHUNKSIZE})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="score on this many processes, sharded by student (0 = one per CPU; "
+                             "default: ACADEMIQ_WORKERS if set, else 1)")
+    parser.add_argument("--save", action="store_true",
+                        help="also add the scored students to the record store (ACADEMIQ_STORE / ACADEMIQ_DB)")
+    args = parser.parse_args(argv)
+
+    workers = args.workers
+    if workers is None:
+        from .parallel import default_workers
+
+        workers = default_workers() if os.environ.get("ACADEMIQ_WORKERS") else 1
+    if workers == 1:
+        def report(rows, chunks):
+            print(f"\r{rows:,} rows / {chunks} chunks", end="", file=sys.stderr)
+
+        scored = import_cohort(args.input, chunksize=args.chunksize, progress=report)
+    else:
+        from .parallel import score_sharded
+
+        def report(rows, done, total):
+            print(f"\r{rows:,} rows / {done} of {total} blocks", end="", file=sys.stderr)
+
+        scored = score_sharded(args.input, workers=workers or None, chunksize=args.chunksize,
+                               progress=report)
+    print(file=sys.stderr)
+
+    if args.save:
+        from .parallel import save_scored
+        from .store import open_store
+
+        saved = save_scored(open_store(), scored)
+        print(f"Saved {saved:,} students to the record store", file=sys.stderr)
+    if args.output or not args.save:
+        scored.to_csv(args.output or sys.stdout)
+    if args.output:
+        print(f"Scored {len(scored):,} students -> {os.path.abspath(args.output)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
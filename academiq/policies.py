@@ -0,0 +1,63 @@
+"""
+Threshold policies per cohort / programme.
+
+A policy file (ACADEMIQ_POLICIES) maps programme names to their cut-offs:
+
+    {
+        "default":  {"safe_max": 1.0, "warning_max": 1.3},
+        "medicine": {"safe_max": 0.9, "warning_max": 1.15}
+    }
+
+and ACADEMIQ_POLICY names the one a deployment's record store classifies
+with. Stores keep their policy (SQLite persists it), and switching to
+another one reclassifies only the records whose status actually changes;
+see `RecordStore.set_policy`.
+"""
+
+import json
+import os
+
+from .engine import DEFAULT_POLICY, ThresholdPolicy
+
+
+def policy_from_dict(name, data):
+    """`ThresholdPolicy` from a {"safe_max": ..., "warning_max": ...} mapping."""
+    policy = ThresholdPolicy(
+        safe_max=float(data.get("safe_max", DEFAULT_POLICY.safe_max)),
+        warning_max=float(data.get("warning_max", DEFAULT_POLICY.warning_max)),
+        name=name,
+    )
+    policy.edges()  # raises ValueError for inverted thresholds
+    return policy
+
+
+def policy_to_dict(policy):
+    return {"safe_max": policy.safe_max, "warning_max": policy.warning_max}
+
+
+def load_policies(path=None):
+    """
+    Policies by name from the JSON file at `path` (default:
+    ACADEMIQ_POLICIES); "default" is always present.
+    """
+    path = path or os.environ.get("ACADEMIQ_POLICIES")
+    policies = {DEFAULT_POLICY.name: DEFAULT_POLICY}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            for name, data in json.load(f).items():
+                policies[name] = policy_from_dict(name, data)
+    return policies
+
+
+def open_policy(name=None, path=None):
+    """
+    The policy named `name` (default: ACADEMIQ_POLICY), or None when no
+    policy is configured, so a store keeps the one it already has.
+    """
+    name = name or os.environ.get("ACADEMIQ_POLICY")
+    if name is None:
+        return None
+    policies = load_policies(path)
+    if name not in policies:
+        raise ValueError(f"Unknown threshold policy: {name!r} (known: {', '.join(policies)})")
+    return policies[name]
@@ -0,0 +1,142 @@
+"""
+Opt-in render profiling for the Streamlit app.
+
+`RenderProfiler` splits a rerun into named sections with `checkpoint()`
+and records, per section, wall time plus the number of `st.markdown` calls
+and bytes emitted. With cProfile enabled it also captures a function-level
+profile of the whole rerun.
+
+Enable with the `ACADEMIQ_PROFILE` environment variable or the `?profile=`
+query parameter: `1` for section timings, `cprofile` to add cProfile.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import tempfile
+import threading
+import time
+
+PROFILE_ENV = "ACADEMIQ_PROFILE"
+PROFILE_PARAM = "profile"
+
+# Streamlit runs every session's script in its own thread
+_active = threading.local()
+_patch_lock = threading.Lock()
+_patched = False
+
+
+def _install_markdown_hook():
+    """Wrap st.markdown / DeltaGenerator.markdown once to feed active profilers."""
+    global _patched
+    with _patch_lock:
+        if _patched:
+            return
+        import streamlit as st
+        from streamlit.delta_generator import DeltaGenerator
+
+        original_method = DeltaGenerator.markdown
+        original_module = st.markdown
+
+        def _count(body):
+            profiler = getattr(_active, "profiler", None)
+            if profiler is not None:
+                profiler.count_markdown(body)
+
+        def method(self, body, *args, **kwargs):
+            _count(body)
+            return original_method(self, body, *args, **kwargs)
+
+        def module_level(body, *args, **kwargs):
+            _count(body)
+            return original_module(body, *args, **kwargs)
+
+        DeltaGenerator.markdown = method
+        st.markdown = module_level
+        _patched = True
+
+
+def profile_mode(query_value=None):
+    """Resolve the requested mode: None (off), "timing" or "cprofile"."""
+    value = (query_value or os.environ.get(PROFILE_ENV, "")).strip().lower()
+    if value in ("", "0", "false", "off", "no"):
+        return None
+    return "cprofile" if value == "cprofile" else "timing"
+
+
+class RenderProfiler:
+    """Section timings and markdown counters for one script rerun."""
+
+    def __init__(self, mode=None):
+        self.mode = mode
+        self.sections = []
+        self._current = None
+        self._started = None
+        self._profile = None
+
+    @property
+    def enabled(self):
+        return self.mode is not None
+
+    def start(self, first_section="Setup"):
+        if not self.enabled:
+            return self
+        _install_markdown_hook()
+        _active.profiler = self
+        self._started = time.perf_counter()
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self.checkpoint(first_section)
+        return self
+
+    def checkpoint(self, name):
+        """Close the running section and start a new one called `name`."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._current is not None:
+            self._current["seconds"] = now - self._current.pop("_t0")
+            self.sections.append(self._current)
+        self._current = {"section": name, "markdown_calls": 0, "markdown_bytes": 0, "_t0": now}
+
+    def count_markdown(self, body):
+        if self._current is not None:
+            self._current["markdown_calls"] += 1
+            self._current["markdown_bytes"] += len(str(body).encode("utf-8"))
+
+    def finish(self):
+        """Stop timing; returns the list of section dicts."""
+        if not self.enabled:
+            return []
+        self.checkpoint(None)
+        self._current = None
+        if self._profile is not None:
+            self._profile.disable()
+        _active.profiler = None
+        return self.sections
+
+    @property
+    def total_seconds(self):
+        return sum(s["seconds"] for s in self.sections)
+
+    def cprofile_text(self, limit=30, sort="cumulative"):
+        if self._profile is None:
+            return ""
+        out = io.StringIO()
+        pstats.Stats(self._profile, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def cprofile_bytes(self):
+        """Raw pstats dump (load with pstats.Stats / snakeviz)."""
+        if self._profile is None:
+            return b""
+        fd, path = tempfile.mkstemp(suffix=".prof")
+        os.close(fd)
+        try:
+            self._profile.dump_stats(path)
+            with open(path, "rb") as fh:
+                return fh.read()
+        finally:
+            os.remove(path)
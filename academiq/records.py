@@ -0,0 +1,302 @@
+"""
+Assessment record helpers.
+
+`make_record` / `records_from_frame` build the record dicts exchanged with
+the app, the API and the stores, so the assessment form and bulk imports
+produce identical rows. `RecordColumns` is the compact typed form records
+are kept in while stored in memory.
+"""
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+from .engine import STATUS_EMOJIS, STATUS_LABELS, classify, round_ali
+from .subjects import clean_subjects
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M"
+
+RECORD_FIELDS = (
+    "Name",
+    "ALI",
+    "Status",
+    "Total Hours",
+    "Available Hours",
+    "Tightest Deadline",
+    "Daily Capacity",
+    "Timestamp",
+    "Horizon ALI",
+    "Horizon Deadline",
+)
+
+# Display text per status code, e.g. "✅ Safe"
+STATUS_TEXT = tuple(f"{emoji} {label}" for emoji, label in zip(STATUS_EMOJIS, STATUS_LABELS))
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def make_record(name, score, daily_hours, timestamp=None, subjects=None):
+    """
+    Build one dashboard record from an engine `Score`. `subjects` (the
+    form's `subject_data` rows) is kept under "Subjects" for the stores'
+    subject-level aggregation; it is not one of RECORD_FIELDS.
+    """
+    timestamp = timestamp or datetime.now()
+    record = {
+        "Name": name,
+        "ALI": float(round_ali(score.ali)),
+        "Status": f"{score.emoji} {score.status}",
+        "Total Hours": round(score.total_hours, 1),
+        "Available Hours": round(score.available_hours, 1),
+        "Tightest Deadline": score.min_deadline,
+        "Daily Capacity": daily_hours,
+        "Timestamp": timestamp.strftime(TIMESTAMP_FORMAT),
+        "Horizon ALI": round(score.horizon_ali, 2),
+        "Horizon Deadline": score.horizon_deadline,
+    }
+    if subjects:
+        record["Subjects"] = clean_subjects(subjects)
+    return record
+
+
+def records_from_frame(scored, timestamp=None):
+    """
+    Convert a scored per-student DataFrame (indexed by student name, as
+    returned by `engine.score_frame`) into dashboard records. Horizon
+    columns are used when present, otherwise the classic ALI stands in.
+    """
+    stamp = (timestamp or datetime.now()).strftime(TIMESTAMP_FORMAT)
+    codes = scored["status_code"].to_numpy()
+    if "horizon_ali" in scored.columns:
+        horizon_ali = scored["horizon_ali"].to_numpy()
+        horizon_deadline = scored["horizon_deadline"].to_numpy()
+    else:
+        horizon_ali = scored["ali"].to_numpy()
+        horizon_deadline = scored["min_deadline"].to_numpy()
+    return [
+        {
+            "Name": str(name),
+            "ALI": ali,
+            "Status": STATUS_TEXT[code],
+            "Total Hours": round(float(total), 1),
+            "Available Hours": round(float(available), 1),
+            "Tightest Deadline": int(deadline),
+            "Daily Capacity": float(daily),
+            "Timestamp": stamp,
+            "Horizon ALI": round(float(h_ali), 2),
+            "Horizon Deadline": int(h_deadline),
+        }
+        for name, ali, code, total, available, deadline, daily, h_ali, h_deadline in zip(
+            scored.index,
+            round_ali(scored["ali"].to_numpy()).tolist(),
+            codes,
+            scored["total_hours"].to_numpy(),
+            scored["available_hours"].to_numpy(),
+            scored["min_deadline"].to_numpy(),
+            scored["daily_hours"].to_numpy(),
+            horizon_ali,
+            horizon_deadline,
+        )
+    ]
+
+
+# ============================================================================
+# COMPACT STORAGE
+# ============================================================================
+# Hours are rounded to 0.1 and horizon ALI to 0.01 by `make_record`, so
+# float32 holds them exactly at display precision.
+_COLUMN_DTYPES = {
+    "name_offset": np.int64,        # start of the UTF-8 name in the shared name buffer
+    "name_length": np.int32,        # its length in bytes
+    "ali": np.float64,
+    "status_code": np.int8,
+    "total_hours": np.float32,
+    "available_hours": np.float32,
+    "tightest_deadline": np.int32,
+    "daily_capacity": np.float64,
+    "minute": np.int32,             # minutes since the Unix epoch (naive local time)
+    "horizon_ali": np.float32,      # NaN = missing
+    "horizon_deadline": np.int32,   # -1 = missing
+}
+
+
+def student_key(name):
+    """
+    Normalized student identifier: surrounding / repeated whitespace is
+    collapsed and case is folded, so "Ada  Lovelace" and "ada lovelace"
+    are the same student.
+    """
+    return " ".join(str(name).split()).casefold()
+
+
+def datetime_minute(moment):
+    """Minutes since the Unix epoch for a naive datetime."""
+    return int((moment - _EPOCH).total_seconds()) // 60
+
+
+def minute_datetime(minute):
+    return _EPOCH + timedelta(minutes=int(minute))
+
+
+# Stored timestamps repeat heavily (one per batch / minute), so cache both ways
+@lru_cache(maxsize=4096)
+def timestamp_minute(text):
+    """Epoch minutes for a record `Timestamp` string."""
+    return datetime_minute(datetime.strptime(text, TIMESTAMP_FORMAT))
+
+
+@lru_cache(maxsize=4096)
+def _from_minute(minute):
+    return minute_datetime(minute).strftime(TIMESTAMP_FORMAT)
+
+
+class RecordColumns:
+    """
+    Column-oriented record storage (append, or overwrite in place).
+
+    A record costs about 57 bytes of numpy columns plus its name's UTF-8
+    bytes, kept in one contiguous buffer instead of a Python `str` per
+    name (whose ~49-byte header would outweigh the row itself); names
+    overwritten in place leave dead bytes that are compacted away once they
+    outnumber the live ones. `Status` and `Timestamp` are kept as a status code
+    and epoch minutes and only formatted back into text by `records()` /
+    `frame()`, when something is displayed or exported. Status codes are
+    derived from ALI under `policy` (the owning store's threshold policy).
+    """
+
+    def __init__(self, capacity=1024, policy=None):
+        self.policy = policy
+        self._size = 0
+        self._columns = {name: np.empty(capacity, dtype) for name, dtype in _COLUMN_DTYPES.items()}
+        self._name_bytes = bytearray()
+        self._dead_name_bytes = 0
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, column):
+        """Read-only view of one column, e.g. `columns["ali"]`."""
+        view = self._columns[column][:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def nbytes(self):
+        """Approximate memory held: used column bytes plus the name buffer."""
+        column_bytes = sum(col.itemsize for col in self._columns.values()) * self._size
+        return column_bytes + len(self._name_bytes)
+
+    def _reserve(self, n):
+        capacity = len(self._columns["ali"])
+        if self._size + n <= capacity:
+            return
+        capacity = max(self._size + n, capacity * 2)
+        for name, col in self._columns.items():
+            grown = np.empty(capacity, col.dtype)
+            grown[:self._size] = col[:self._size]
+            self._columns[name] = grown
+
+    def _append_names(self, names):
+        """Append names to the buffer; returns their (offsets, lengths)."""
+        encoded = [str(name).encode("utf-8") for name in names]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        offsets = len(self._name_bytes) + np.cumsum(lengths) - lengths
+        self._name_bytes += b"".join(encoded)
+        return offsets, lengths
+
+    def _compact_names(self):
+        # Copy the live names to a fresh buffer in position order, in one gather
+        lengths = self._columns["name_length"][:self._size].astype(np.int64)
+        offsets = np.cumsum(lengths) - lengths
+        source = np.repeat(self._columns["name_offset"][:self._size] - offsets, lengths) + np.arange(lengths.sum())
+        self._name_bytes = bytearray(np.frombuffer(self._name_bytes, dtype=np.uint8)[source].tobytes())
+        self._columns["name_offset"][:self._size] = offsets
+        self._dead_name_bytes = 0
+
+    def extend(self, records):
+        """Append record dicts; returns the range of positions they were stored at."""
+        records = list(records)
+        start = self._size
+        self._reserve(len(records))
+        self._write(slice(start, start + len(records)), records)
+        self._size = start + len(records)
+        return range(start, self._size)
+
+    def assign(self, positions, records):
+        """Overwrite the records stored at `positions` in place."""
+        positions = np.asarray(positions, dtype=np.intp)
+        self._dead_name_bytes += int(self._columns["name_length"][positions].sum())
+        self._write(positions, list(records))
+        if self._dead_name_bytes > len(self._name_bytes) // 2:
+            self._compact_names()
+
+    def set_status(self, positions, codes):
+        """Overwrite the status codes at `positions` (after a policy change)."""
+        self._columns["status_code"][np.asarray(positions, dtype=np.intp)] = codes
+
+    def _write(self, index, records):
+        cols = self._columns
+        ali = np.array([r["ALI"] for r in records], dtype=np.float64)
+
+        cols["name_offset"][index], cols["name_length"][index] = self._append_names(r["Name"] for r in records)
+        cols["ali"][index] = ali
+        cols["status_code"][index] = classify(ali, self.policy)
+        cols["total_hours"][index] = [r["Total Hours"] for r in records]
+        cols["available_hours"][index] = [r["Available Hours"] for r in records]
+        cols["tightest_deadline"][index] = [r["Tightest Deadline"] for r in records]
+        cols["daily_capacity"][index] = [r["Daily Capacity"] for r in records]
+        cols["minute"][index] = [timestamp_minute(r["Timestamp"]) for r in records]
+        cols["horizon_ali"][index] = [
+            np.nan if r.get("Horizon ALI") is None else r["Horizon ALI"] for r in records
+        ]
+        cols["horizon_deadline"][index] = [
+            -1 if r.get("Horizon Deadline") is None else r["Horizon Deadline"] for r in records
+        ]
+
+    def clear(self):
+        self.__init__(policy=self.policy)
+
+    def names(self, positions):
+        """Stored names at `positions`."""
+        idx = np.asarray(positions, dtype=np.intp)
+        return self._decode_names(self._columns["name_offset"][idx], self._columns["name_length"][idx])
+
+    def _decode_names(self, offsets, lengths):
+        names = self._name_bytes
+        return [names[start:start + n].decode("utf-8") for start, n in zip(offsets.tolist(), lengths.tolist())]
+
+    def _display_columns(self, positions):
+        """Formatted columns (in RECORD_FIELDS order) for the given positions."""
+        idx = np.arange(self._size) if positions is None else np.asarray(positions, dtype=np.intp)
+        cols = {name: col[:self._size][idx] for name, col in self._columns.items()}
+        return (
+            self._decode_names(cols["name_offset"], cols["name_length"]),
+            cols["ali"],
+            [STATUS_TEXT[code] for code in cols["status_code"].tolist()],
+            np.round(cols["total_hours"].astype(np.float64), 1),
+            np.round(cols["available_hours"].astype(np.float64), 1),
+            cols["tightest_deadline"],
+            cols["daily_capacity"],
+            [_from_minute(m) for m in cols["minute"].tolist()],
+            np.round(cols["horizon_ali"].astype(np.float64), 2),
+            cols["horizon_deadline"],
+        )
+
+    def records(self, positions=None):
+        """Record dicts for `positions` (default: all, in insertion order)."""
+        columns = [col.tolist() if isinstance(col, np.ndarray) else col for col in self._display_columns(positions)]
+        h_ali, h_deadline = columns[8], columns[9]
+        columns[8] = [None if value != value else value for value in h_ali]  # NaN -> None
+        columns[9] = [None if value < 0 else value for value in h_deadline]
+        return [dict(zip(RECORD_FIELDS, row)) for row in zip(*columns)]
+
+    def frame(self, positions=None):
+        """DataFrame with RECORD_FIELDS columns, built straight from the arrays."""
+        columns = dict(zip(RECORD_FIELDS, self._display_columns(positions)))
+        h_deadline = columns["Horizon Deadline"]
+        if (h_deadline < 0).any():
+            columns["Horizon Deadline"] = np.where(h_deadline < 0, np.nan, h_deadline)
+        import pandas as pd
+
+        return pd.DataFrame(columns, columns=list(RECORD_FIELDS))
@@ -0,0 +1,402 @@
+"""
+Local HTTP/JSON scoring API.
+
+A small asyncio HTTP/1.1 server (standard library only, no Streamlit) that
+exposes the ALI engine and the record store to LMS integrations:
+
+    GET  /health                          liveness check
+    POST /score                           score one student
+    POST /score/batch                     score {"students": [...]} in one call
+    GET  /records?status=critical         query stored records by status
+                  [&limit=50&offset=0]
+    GET  /stats                           running store aggregates
+    GET  /subjects[?limit=20]             per-subject load, largest Critical share first
+
+A student payload looks like:
+
+    {"name": "Ada", "daily_hours": 4,
+     "subjects": [{"assignments": 2, "hours_per_assignment": 3, "deadline_days": 7}],
+     "save": false}
+
+Concurrent `/score` requests are micro-batched: requests arriving within a
+short window are scored together in a single vectorized engine call. Saved
+single-student results go through the shared `BatchWriter` (HTTP 503 when
+its queue is full).
+
+    python -m academiq.server --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import traceback
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from .engine import STATUS_CRITICAL, STATUS_LABELS, STATUS_SAFE, STATUS_WARNING, score_students
+from .records import make_record
+from .store import open_store
+from .writer import WriterOverloaded, open_writer
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_BATCH_WINDOW = 0.005  # seconds
+DEFAULT_MAX_BATCH = 512
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+# Accepted ranges of the numeric payload fields (inclusive)
+DAILY_HOURS_RANGE = (1, 24)  # same floor as the assessment form
+ASSIGNMENTS_RANGE = (0, 1000)
+HOURS_PER_ASSIGNMENT_RANGE = (0, 1000)
+DEADLINE_DAYS_RANGE = (1, 3650)
+
+STATUS_NAMES = {
+    "safe": STATUS_SAFE,
+    "warning": STATUS_WARNING,
+    "critical": STATUS_CRITICAL,
+}
+
+
+class BadRequest(ValueError):
+    """Raised for malformed request payloads (HTTP 400)."""
+
+
+# ============================================================================
+# PAYLOADS
+# ============================================================================
+def _number(payload, key, bounds):
+    try:
+        value = float(payload[key])
+    except KeyError:
+        raise BadRequest(f"missing field: {key}") from None
+    except (TypeError, ValueError):
+        raise BadRequest(f"field {key} must be a number") from None
+    minimum, maximum = bounds
+    if not (math.isfinite(value) and minimum <= value <= maximum):
+        raise BadRequest(f"field {key} must be between {minimum} and {maximum}")
+    return value
+
+
+def _query_int(query, key, default):
+    """Non-negative integer query parameter."""
+    try:
+        value = int(query.get(key, [str(default)])[0])
+    except ValueError:
+        raise BadRequest(f"{key} must be an integer") from None
+    if value < 0:
+        raise BadRequest(f"{key} must be >= 0")
+    return value
+
+
+def parse_student(payload):
+    """Validate a student payload and return (name, subjects, daily_hours)."""
+    if not isinstance(payload, dict):
+        raise BadRequest("student must be a JSON object")
+    subjects = payload.get("subjects", [])
+    if not isinstance(subjects, list):
+        raise BadRequest("subjects must be a list")
+    parsed = []
+    for subject in subjects:
+        if not isinstance(subject, dict):
+            raise BadRequest("each subject must be a JSON object")
+        parsed.append({
+            "name": str(subject.get("name", "")),
+            "assignments": _number(subject, "assignments", ASSIGNMENTS_RANGE),
+            "hours_per_assignment": _number(subject, "hours_per_assignment", HOURS_PER_ASSIGNMENT_RANGE),
+            "deadline_days": int(_number(subject, "deadline_days", DEADLINE_DAYS_RANGE)),
+        })
+    name = str(payload.get("name", "")).strip()
+    # No available time would mean an infinite ALI
+    return name, parsed, _number(payload, "daily_hours", DAILY_HOURS_RANGE)
+
+
+def _finite(data):
+    # JSON has no Infinity / NaN
+    return {
+        key: None if isinstance(value, float) and not math.isfinite(value) else value
+        for key, value in data.items()
+    }
+
+
+def score_to_dict(score):
+    data = score._asdict()
+    data["status"] = STATUS_LABELS[score.status_code]
+    return _finite(data)
+
+
+# ============================================================================
+# MICRO-BATCHING
+# ============================================================================
+class MicroBatcher:
+    """
+    Collects single-student score requests and scores them together.
+
+    A batch is flushed when `max_batch` requests are waiting or `window`
+    seconds after the first one arrived, whichever comes first. Each batch
+    is classified under the policy returned by `get_policy` (default
+    thresholds if None).
+    """
+
+    def __init__(self, window=DEFAULT_BATCH_WINDOW, max_batch=DEFAULT_MAX_BATCH, get_policy=None):
+        self.window = window
+        self.max_batch = max_batch
+        self.get_policy = get_policy
+        self._pending = []
+        self._timer = None
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    async def submit(self, subjects, daily_hours):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((subjects, daily_hours), future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        self.batches += 1
+        self.items += len(pending)
+        self.largest_batch = max(self.largest_batch, len(pending))
+        try:
+            policy = self.get_policy() if self.get_policy is not None else None
+        except Exception as exc:  # no policy: surface the error to every waiter
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        try:
+            scores = score_students([item for item, _ in pending], policy)
+        except Exception:
+            # Score one by one, so a bad request only fails its own future
+            scores = None
+        for index, (item, future) in enumerate(pending):
+            if future.done():
+                continue
+            try:
+                future.set_result(scores[index] if scores is not None else score_students([item], policy)[0])
+            except Exception as exc:
+                future.set_exception(exc)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "largest_batch": self.largest_batch,
+            "mean_batch": self.items / self.batches if self.batches else 0.0,
+        }
+
+
+# ============================================================================
+# APPLICATION
+# ============================================================================
+class ScoringAPI:
+    """Routes parsed requests to the engine, batcher and record store."""
+
+    def __init__(self, store=None, batch_window=DEFAULT_BATCH_WINDOW, max_batch=DEFAULT_MAX_BATCH):
+        self.store = store if store is not None else open_store()
+        self.batcher = MicroBatcher(batch_window, max_batch, get_policy=lambda: self.store.policy)
+        self.writer = open_writer(self.store)
+
+    async def handle(self, method, path, query, body):
+        """Return (HTTPStatus, JSON-serializable payload)."""
+        routes = {
+            ("GET", "/health"): self.health,
+            ("POST", "/score"): self.score_one,
+            ("POST", "/score/batch"): self.score_batch,
+            ("GET", "/records"): self.records,
+            ("GET", "/stats"): self.stats,
+            ("GET", "/subjects"): self.subjects,
+        }
+        handler = routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in routes):
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{method} not allowed on {path}"}
+            return HTTPStatus.NOT_FOUND, {"error": f"no route for {path}"}
+
+        try:
+            payload = json.loads(body) if body else {}
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return HTTPStatus.BAD_REQUEST, {"error": "body must be valid JSON"}
+        try:
+            return HTTPStatus.OK, await handler(payload, query)
+        except BadRequest as exc:
+            return HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+        except WriterOverloaded as exc:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(exc)}
+        except Exception:  # reply instead of dropping the connection
+            traceback.print_exc()
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal server error"}
+
+    async def health(self, payload, query):
+        return {"status": "ok"}
+
+    async def _save(self, name, score, daily_hours, subjects):
+        if not name:
+            raise BadRequest("name is required when save is true")
+        record = make_record(name, score, daily_hours, subjects=subjects)
+        # submit() may block on a full queue, so it runs off the event loop
+        future = await asyncio.to_thread(self.writer.submit, record)
+        await asyncio.wrap_future(future)
+
+    async def score_one(self, payload, query):
+        name, subjects, daily_hours = parse_student(payload)
+        score = await self.batcher.submit(subjects, daily_hours)
+        if payload.get("save"):
+            await self._save(name, score, daily_hours, subjects)
+        return score_to_dict(score)
+
+    async def score_batch(self, payload, query):
+        if not isinstance(payload, dict):
+            raise BadRequest("body must be a JSON object")
+        students = payload.get("students")
+        if not isinstance(students, list):
+            raise BadRequest("students must be a list")
+        parsed = [parse_student(student) for student in students]
+        scores = score_students([(subjects, daily) for _, subjects, daily in parsed], self.store.policy)
+        if payload.get("save"):
+            if not all(name for name, _, _ in parsed):
+                raise BadRequest("every student needs a name when save is true")
+            records = [
+                make_record(name, score, daily, subjects=subjects)
+                for (name, subjects, daily), score in zip(parsed, scores)
+            ]
+            await asyncio.to_thread(self.store.add_many, records)
+        return {"results": [score_to_dict(score) for score in scores]}
+
+    async def records(self, payload, query):
+        status = query.get("status", [None])[0]
+        limit = _query_int(query, "limit", 100)
+        offset = _query_int(query, "offset", 0)
+        if status is None:
+            rows = await asyncio.to_thread(self.store.ali_range, None, None, limit, offset)
+        elif status.lower() in STATUS_NAMES:
+            rows = await asyncio.to_thread(self.store.by_status, STATUS_NAMES[status.lower()], limit, offset)
+        else:
+            raise BadRequest(f"status must be one of: {', '.join(STATUS_NAMES)}")
+        return {"records": [_finite(row) for row in rows]}
+
+    async def stats(self, payload, query):
+        store_stats = await asyncio.to_thread(self.store.stats)
+        store_stats["counts"] = {STATUS_LABELS[code]: n for code, n in store_stats["counts"].items()}
+        store_stats["policy"] = self.store.policy._asdict()
+        sketch = await asyncio.to_thread(self.store.distribution)
+        store_stats["percentiles"] = _finite(dict(zip(("p50", "p90", "p99"), sketch.quantiles([0.5, 0.9, 0.99]))))
+        return {"store": _finite(store_stats), "batching": self.batcher.stats(), "writes": self.writer.stats()}
+
+    async def subjects(self, payload, query):
+        limit = _query_int(query, "limit", 20)
+        return {"subjects": await asyncio.to_thread(self.store.subject_load, limit)}
+
+
+# ============================================================================
+# HTTP
+# ============================================================================
+async def _read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise BadRequest("malformed request line") from None
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length", "0") or 0)
+    if length > MAX_BODY_BYTES:
+        raise BadRequest("request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload, allow_nan=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def _serve_connection(api, reader, writer):
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except (BadRequest, ValueError) as exc:
+                writer.write(_response(HTTPStatus.BAD_REQUEST, {"error": str(exc)}, False))
+                break
+            if request is None:
+                break
+            method, target, headers, body = request
+            url = urlsplit(target)
+            status, payload = await api.handle(method, url.path.rstrip("/") or "/", parse_qs(url.query), body)
+            keep_alive = headers.get("connection", "").lower() != "close"
+            try:
+                response = _response(status, payload, keep_alive)
+            except ValueError:  # e.g. a non-finite float in the payload
+                traceback.print_exc()
+                response = _response(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal server error"}, keep_alive)
+            writer.write(response)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(api, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Start serving `api`; returns the asyncio Server (port 0 picks a free port)."""
+    return await asyncio.start_server(lambda r, w: _serve_connection(api, r, w), host, port)
+
+
+async def _main(args):
+    api = ScoringAPI(batch_window=args.batch_window_ms / 1000, max_batch=args.max_batch)
+    server = await start_server(api, args.host, args.port)
+    address = server.sockets[0].getsockname()
+    print(f"AcademiQ scoring API on http://{address[0]}:{address[1]}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m academiq.server", description="Local ALI scoring API.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--batch-window-ms", type=float, default=DEFAULT_BATCH_WINDOW * 1000,
+                        help="how long to wait for more /score requests before scoring a batch")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH,
+                        help="flush a batch as soon as this many requests are waiting")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
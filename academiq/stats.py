@@ -0,0 +1,142 @@
+"""
+Running aggregate counters for the metrics strip.
+
+`StatusCounters` keeps the total, per-status counts, min / max / mean ALI
+and the ALI distribution sketch (`distribution.AliSketch`) up to date as
+records are added, replaced or cleared, so the Home page and Mentor
+Dashboard metrics never have to scan the records. The running ALI sum
+covers finite values only, with infinite ALIs (no available time) counted
+separately, so removing one never leaves `inf - inf` behind.
+"""
+
+import math
+
+import numpy as np
+
+from .distribution import AliSketch
+from .engine import STATUS_LABELS, classify
+
+
+class StatusCounters:
+    """O(1) per-record running totals over ALI values."""
+
+    __slots__ = ("total", "counts", "ali_sum", "inf_count", "min_ali", "max_ali", "extrema_stale", "policy", "sketch")
+
+    def __init__(self, policy=None):
+        self.policy = policy  # threshold policy the status counts follow
+        self.clear()
+
+    def clear(self):
+        self.total = 0
+        self.counts = [0] * len(STATUS_LABELS)
+        self.ali_sum = 0.0    # finite ALIs only
+        self.inf_count = 0
+        self.min_ali = math.inf
+        self.max_ali = -math.inf
+        self.extrema_stale = False
+        self.sketch = AliSketch()
+
+    def add(self, ali):
+        self.total += 1
+        self.counts[int(classify(ali, self.policy))] += 1
+        self.sketch.add(ali)
+        self._add_sum(ali, 1)
+        self.min_ali = min(self.min_ali, ali)
+        self.max_ali = max(self.max_ali, ali)
+
+    def _code_counts(self, alis, codes):
+        codes = classify(alis, self.policy) if codes is None else np.asarray(codes, dtype=np.intp)
+        return np.bincount(codes, minlength=len(STATUS_LABELS))
+
+    def add_many(self, alis, codes=None):
+        """
+        Vectorized `add` for a batch of ALI values. `codes` are their status
+        codes when already known (e.g. stored under an earlier policy).
+        """
+        alis = np.asarray(alis, dtype=np.float64)
+        if alis.size == 0:
+            return
+        codes = self._code_counts(alis, codes)
+        self.total += int(alis.size)
+        self.counts = [c + int(n) for c, n in zip(self.counts, codes)]
+        self.sketch.add_many(alis)
+        self._add_sum_many(alis, 1)
+        self.min_ali = min(self.min_ali, float(alis.min()))
+        self.max_ali = max(self.max_ali, float(alis.max()))
+
+    def remove(self, ali):
+        """
+        Drop one record's ALI. Removing the current min or max marks the
+        extrema stale; the owner refreshes them with `set_extrema`.
+        """
+        self.total -= 1
+        self.counts[int(classify(ali, self.policy))] -= 1
+        self.sketch.remove(ali)
+        self._add_sum(ali, -1)
+        if self.total == 0:
+            self.clear()
+        elif ali <= self.min_ali or ali >= self.max_ali:
+            self.extrema_stale = True
+
+    def replace(self, old_ali, new_ali):
+        self.remove(old_ali)
+        self.add(new_ali)
+
+    def replace_many(self, old_alis, new_alis):
+        """Vectorized `replace` for records re-assessed in one batch."""
+        if len(old_alis):
+            self.remove_many(old_alis)
+            self.add_many(new_alis)
+
+    def remove_many(self, old_alis, codes=None):
+        """Vectorized `remove` (`codes` as in `add_many`)."""
+        old_alis = np.asarray(old_alis, dtype=np.float64)
+        if old_alis.size == 0:
+            return
+        codes = self._code_counts(old_alis, codes)
+        self.total -= int(old_alis.size)
+        self.counts = [c - int(n) for c, n in zip(self.counts, codes)]
+        self.sketch.remove_many(old_alis)
+        self._add_sum_many(old_alis, -1)
+        if self.total == 0:
+            self.clear()
+        elif old_alis.min() <= self.min_ali or old_alis.max() >= self.max_ali:
+            self.extrema_stale = True
+
+    def _add_sum(self, ali, sign):
+        if math.isinf(ali):
+            self.inf_count += sign
+        else:
+            self.ali_sum += sign * ali
+
+    def _add_sum_many(self, alis, sign):
+        finite = np.isfinite(alis)
+        self.inf_count += sign * int(alis.size - finite.sum())
+        self.ali_sum += sign * float(alis[finite].sum())
+
+    def move(self, old_codes, new_codes):
+        """Shift per-status counts for records reclassified from `old_codes` to `new_codes`."""
+        shift = (np.bincount(np.asarray(new_codes, dtype=np.intp), minlength=len(STATUS_LABELS))
+                 - np.bincount(np.asarray(old_codes, dtype=np.intp), minlength=len(STATUS_LABELS)))
+        self.counts = [c + int(n) for c, n in zip(self.counts, shift)]
+
+    def set_extrema(self, min_ali, max_ali):
+        self.min_ali = math.inf if min_ali is None else min_ali
+        self.max_ali = -math.inf if max_ali is None else max_ali
+        self.extrema_stale = False
+
+    @property
+    def mean_ali(self):
+        if not self.total:
+            return None
+        return math.inf if self.inf_count else self.ali_sum / self.total
+
+    def snapshot(self):
+        """Plain dict copy for display."""
+        return {
+            "total": self.total,
+            "counts": dict(enumerate(self.counts)),
+            "mean_ali": self.mean_ali,
+            "min_ali": self.min_ali if self.total else None,
+            "max_ali": self.max_ali if self.total else None,
+        }
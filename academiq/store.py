@@ -0,0 +1,1220 @@
+"""
+Assessment record storage.
+
+`RecordStore` defines the interface the app talks to; `SQLiteStore` is the
+default persistent backend and `MemoryStore` keeps the old in-process
+behaviour (useful for tests and throwaway sessions).
+
+Records are the dicts built by `records.make_record`.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+from array import array
+
+import numpy as np
+
+from .engine import DEFAULT_POLICY, STATUS_CRITICAL, STATUS_LABELS, classify
+from .history import AliHistory
+from .policies import open_policy, policy_from_dict, policy_to_dict
+from .records import (
+    RECORD_FIELDS,
+    STATUS_TEXT,
+    RecordColumns,
+    datetime_minute,
+    minute_datetime,
+    student_key,
+    timestamp_minute,
+)
+from .stats import StatusCounters
+from .subjects import SubjectLoad, subject_key, subject_rows
+from .topk import TopKIndex
+
+DEFAULT_DB_PATH = "academiq.db"
+
+
+class RecordStore:
+    """
+    Interface shared by all storage backends.
+
+    `version` increases every time the stored records change, so callers can
+    cache anything derived from them (see `frames.FrameCache`).
+
+    Statuses follow the store's threshold `policy` (see `engine.ThresholdPolicy`),
+    whatever status the incoming records carry.
+    """
+
+    @property
+    def version(self):
+        raise NotImplementedError
+
+    @property
+    def policy(self):
+        raise NotImplementedError
+
+    def set_policy(self, policy):
+        """
+        Switch threshold policy. Only records whose ALI falls in one of
+        `policy.changed_ranges` are reclassified; returns how many.
+        """
+        raise NotImplementedError
+
+    def add(self, record):
+        self.add_many([record])
+
+    def add_many(self, records):
+        """
+        Upsert records keyed by `records.student_key(record["Name"])`: a
+        student who already has a record gets it replaced (the previous
+        version stays in the ALI history), so counts are unique students.
+        The student's subject rows are replaced by the record's "Subjects"
+        (none if it has no such key).
+        """
+        raise NotImplementedError
+
+    def all(self):
+        """All records, newest first."""
+        raise NotImplementedError
+
+    def iter_batches(self, batch_size=10_000):
+        """Yield lists of records (newest first) without loading them all at once."""
+        records = self.all()
+        for start in range(0, len(records), batch_size):
+            yield records[start:start + batch_size]
+
+    def frame(self):
+        """All records as a DataFrame with RECORD_FIELDS columns, newest first."""
+        import pandas as pd
+
+        return pd.DataFrame(self.all(), columns=list(RECORD_FIELDS))
+
+    def by_status(self, status_code, limit=None, offset=0):
+        """Records with the given status code, highest ALI first (optionally one page)."""
+        raise NotImplementedError
+
+    def ali_range(self, low=None, high=None, limit=None, offset=0):
+        """
+        Records with low <= ALI <= high (either bound optional), highest ALI
+        first with ties newest first, the order of `top("ali", k)`, so
+        pages can be mixed with it. `limit` / `offset` select one page.
+        """
+        raise NotImplementedError
+
+    def query(self, statuses=None, deadline_range=(None, None), daily_range=(None, None),
+              limit=None, offset=0):
+        """
+        Combined filter: records whose status code is in `statuses` (all if
+        None), whose tightest deadline and daily capacity fall in the given
+        inclusive (low, high) ranges (None = open), highest ALI first.
+
+        Returns (page of records, total number of matches).
+        """
+        raise NotImplementedError
+
+    def histories(self, names, last=None, since=None):
+        """
+        ALI history per student: dict name -> [(datetime, ALI), ...], oldest
+        first, holding the `last` most recent points and / or the points
+        at or after the datetime `since`. Students without history are
+        omitted.
+        """
+        raise NotImplementedError
+
+    def history(self, name, last=None, since=None):
+        return self.histories([name], last, since).get(name, [])
+
+    def subjects(self, name):
+        """Subject rows of the student's current assessment (dicts like the form's `subject_data`)."""
+        raise NotImplementedError
+
+    def subject_load(self, limit=None):
+        """
+        Per-subject totals over every student's current subject rows, most
+        Critical hours first; see `subjects.SubjectLoad.report`. Maintained
+        on write, so this never scans the cohort.
+        """
+        raise NotImplementedError
+
+    def changes(self, after=0, limit=None):
+        """
+        Change feed for incremental consumers: assessments stored after the
+        sequence number `after`, oldest first, as (seq, name, epoch minute,
+        previous ALI, ALI) tuples. `previous` is the ALI of the record the
+        assessment replaced (None for a student's first one). Sequence
+        numbers only grow, even across `clear()`.
+        """
+        raise NotImplementedError
+
+    def last_change(self):
+        """Sequence number of the newest assessment (0 if none was ever stored)."""
+        raise NotImplementedError
+
+    def top(self, by="ali", k=10):
+        """
+        The `k` most at-risk records ranked by `by` ("ali", "shortage" or
+        "deadline"; see `topk.RANK_KEYS`), served from a maintained heap
+        index instead of a full sort.
+        """
+        raise NotImplementedError
+
+    def count(self):
+        raise NotImplementedError
+
+    def stats(self):
+        """
+        Running aggregates (total, per-status counts, min / max / mean ALI)
+        as a dict; see `stats.StatusCounters.snapshot`.
+        """
+        raise NotImplementedError
+
+    def counts_by_status(self):
+        """Dict mapping each status code to its record count."""
+        return self.stats()["counts"]
+
+    def distribution(self):
+        """
+        Copy of the ALI distribution sketch (`distribution.AliSketch`) of
+        the stored records, maintained on every write: percentiles and
+        histograms from it cost the same at any cohort size.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        return self.count()
+
+    def __bool__(self):
+        return self.count() > 0
+
+
+def _in_range(values, bounds):
+    """Boolean mask of `values` inside the inclusive (low, high) bounds; None is open."""
+    low, high = bounds
+    mask = np.ones(len(values), dtype=bool)
+    if low is not None:
+        mask &= values >= low
+    if high is not None:
+        mask &= values <= high
+    return mask
+
+
+# ============================================================================
+# IN-MEMORY BACKEND
+# ============================================================================
+class MemoryStore(RecordStore):
+    """
+    Column-backed store (see `records.RecordColumns`); data lives only as
+    long as the process.
+
+    A dict from normalized student key to column position is the hash index
+    behind upserts: a re-assessment overwrites the student's row in place
+    and only the ALI history keeps earlier versions.
+    """
+
+    def __init__(self, policy=None):
+        self._policy = policy or DEFAULT_POLICY
+        self._columns = RecordColumns(policy=self._policy)
+        self._positions = {}  # student_key -> column position
+        self._counters = StatusCounters(self._policy)
+        self._topk = TopKIndex(dense_ids=True)
+        # Status buckets: record positions per status code, maintained on
+        # write. A student whose status changes is appended to the new bucket
+        # and the old entry is skipped (and eventually compacted) on read.
+        self._buckets = tuple(array("q") for _ in STATUS_LABELS)
+        self._bucket_entries = 0
+        self._history = AliHistory()  # keyed by position; also the change feed
+        self._subjects = {}  # student_key -> subject dicts of the current record
+        self._subject_load = SubjectLoad()
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def policy(self):
+        return self._policy
+
+    def set_policy(self, policy):
+        with self._lock:
+            old = self._policy
+            if policy == old:
+                return 0
+            # One vectorized pass over the ALI column finds the rows in the
+            # changed ranges; only those are rewritten
+            alis = self._columns["ali"]
+            affected = np.zeros(len(alis), dtype=bool)
+            for low, high in old.changed_ranges(policy):
+                affected |= (alis >= low) & (alis < high)
+            positions = np.flatnonzero(affected)
+            old_codes = self._columns["status_code"][positions]
+            new_codes = classify(alis[positions], policy)
+            self._policy = self._columns.policy = self._counters.policy = policy
+            self._columns.set_status(positions, new_codes)
+            self._counters.move(old_codes, new_codes)
+            if self._subjects:
+                flipped = (old_codes == STATUS_CRITICAL) != (new_codes == STATUS_CRITICAL)
+                for record, code in zip(self._columns.records(positions[flipped]), new_codes[flipped].tolist()):
+                    subjects = self._subjects.get(student_key(record["Name"]))
+                    if subjects:
+                        self._subject_load.set_critical(subject_rows(subjects), code == STATUS_CRITICAL)
+            for code, bucket in enumerate(self._buckets):
+                bucket.extend(positions[new_codes == code].tolist())
+            self._bucket_entries += len(positions)
+            self._version += 1
+            return len(positions)
+
+    def add_many(self, records):
+        records = list(records)
+        keys = [student_key(r["Name"]) for r in records]
+        minutes = [timestamp_minute(r["Timestamp"]) for r in records]
+        with self._lock:
+            # Last assessment per student in this batch wins
+            latest = {}
+            for key, record in zip(keys, records):
+                latest.pop(key, None)
+                latest[key] = record
+            updates = [(self._positions[key], r) for key, r in latest.items() if key in self._positions]
+            fresh = [(key, r) for key, r in latest.items() if key not in self._positions]
+            # New students are appended in `fresh` order; history is keyed by position
+            placed = dict(zip((key for key, _ in fresh), range(len(self._columns), len(self._columns) + len(fresh))))
+            placed.update((key, self._positions[key]) for key in latest if key in self._positions)
+            self._history.extend(
+                (placed[key], minute, float(r["ALI"])) for key, minute, r in zip(keys, minutes, records)
+            )
+            if self._subjects or any("Subjects" in r for r in latest.values()):
+                self._replace_subjects(latest)
+
+            if updates:
+                positions = [position for position, _ in updates]
+                old_alis = self._columns["ali"][positions]
+                self._columns.assign(positions, [r for _, r in updates])
+                new_alis = self._columns["ali"][positions]
+                self._counters.replace_many(old_alis, new_alis)
+                self._topk.add_many(updates)
+                old_codes = classify(old_alis, self._policy).tolist()
+                new_codes = classify(new_alis, self._policy).tolist()
+                for position, old_code, new_code in zip(positions, old_codes, new_codes):
+                    if new_code != old_code:
+                        self._buckets[new_code].append(position)
+                        self._bucket_entries += 1
+                if self._bucket_entries > 2 * len(self._columns) + 1024:
+                    self._rebuild_buckets()
+
+            if fresh:
+                positions = self._columns.extend(r for _, r in fresh)
+                self._positions.update(zip((key for key, _ in fresh), positions))
+                alis = self._columns["ali"][positions.start:]
+                self._counters.add_many(alis)
+                self._topk.add_many(zip(positions, (r for _, r in fresh)))
+                codes = classify(alis, self._policy)
+                for code, bucket in enumerate(self._buckets):
+                    bucket.extend((np.flatnonzero(codes == code) + positions.start).tolist())
+                self._bucket_entries += len(fresh)
+            self._version += 1
+
+    def _replace_subjects(self, latest):
+        # Runs before the batch is applied: stored status codes are the old ones
+        new_codes = classify([r["ALI"] for r in latest.values()], self._policy).tolist()
+        for (key, record), code in zip(latest.items(), new_codes):
+            old = self._subjects.pop(key, None)
+            if old:
+                old_critical = self._columns["status_code"][self._positions[key]] == STATUS_CRITICAL
+                self._subject_load.remove(subject_rows(old), old_critical)
+            subjects = record.get("Subjects")
+            if subjects:
+                self._subjects[key] = subjects
+                self._subject_load.add(subject_rows(subjects), code == STATUS_CRITICAL)
+
+    def _rebuild_buckets(self):
+        codes = self._columns["status_code"]
+        self._buckets = tuple(array("q", np.flatnonzero(codes == code).tolist()) for code in range(len(STATUS_LABELS)))
+        self._bucket_entries = len(self._columns)
+
+    def _newest_first(self):
+        # Latest assessment time first; rows written later win ties
+        columns = self._columns
+        return np.lexsort((np.arange(len(columns)), columns["minute"]))[::-1]
+
+    def all(self):
+        with self._lock:
+            return self._columns.records(self._newest_first())
+
+    def iter_batches(self, batch_size=10_000):
+        with self._lock:
+            order = self._newest_first()
+        for start in range(0, len(order), batch_size):
+            with self._lock:
+                batch = self._columns.records(order[start:start + batch_size])
+            yield batch
+
+    def frame(self):
+        with self._lock:
+            return self._columns.frame(self._newest_first())
+
+    def _ranked_page(self, positions, limit, offset):
+        # Highest ALI first, ties by later position: the top-K index's order
+        positions = positions[np.lexsort((-positions, -self._columns["ali"][positions]))]
+        page = positions[offset:] if limit is None else positions[offset:offset + limit]
+        return self._columns.records(page), len(positions)
+
+    def by_status(self, status_code, limit=None, offset=0):
+        return self.query([status_code], limit=limit, offset=offset)[0]
+
+    def query(self, statuses=None, deadline_range=(None, None), daily_range=(None, None),
+              limit=None, offset=0):
+        codes = list(range(len(self._buckets))) if statuses is None else sorted(set(statuses))
+        with self._lock:
+            # Only the selected buckets are scanned; entries left behind by a
+            # status change fail the status check
+            positions = np.unique(np.concatenate(
+                [np.array(self._buckets[code], dtype=np.intp) for code in codes] or [np.empty(0, np.intp)]
+            ))
+            mask = (
+                np.isin(self._columns["status_code"][positions], codes)
+                & _in_range(self._columns["tightest_deadline"][positions], deadline_range)
+                & _in_range(self._columns["daily_capacity"][positions], daily_range)
+            )
+            return self._ranked_page(positions[mask], limit, offset)
+
+    def ali_range(self, low=None, high=None, limit=None, offset=0):
+        with self._lock:
+            positions = np.flatnonzero(_in_range(self._columns["ali"], (low, high)))
+            return self._ranked_page(positions, limit, offset)[0]
+
+    def histories(self, names, last=None, since=None):
+        since = None if since is None else datetime_minute(since)
+        with self._lock:
+            positions = {name: self._positions.get(student_key(name)) for name in names}
+            found = {
+                name: self._history.points(position, last, since)
+                for name, position in positions.items() if position is not None
+            }
+        return {name: points for name, points in found.items() if points}
+
+    def subjects(self, name):
+        with self._lock:
+            return [dict(s) for s in self._subjects.get(student_key(name), [])]
+
+    def subject_load(self, limit=None):
+        with self._lock:
+            return self._subject_load.report(limit)
+
+    def changes(self, after=0, limit=None):
+        with self._lock:
+            entries = self._history.since(after, limit)
+            names = self._columns.names([entry[1] for entry in entries])
+        # Under the student's current spelling: rows are overwritten in place
+        return [(seq, name, *rest) for (seq, _, *rest), name in zip(entries, names)]
+
+    def last_change(self):
+        return self._history.last
+
+    def top(self, by="ali", k=10):
+        with self._lock:
+            return self._columns.records(self._topk.top(by, k))
+
+    def count(self):
+        return self._counters.total
+
+    def stats(self):
+        with self._lock:
+            if self._counters.extrema_stale:
+                alis = self._columns["ali"]
+                self._counters.set_extrema(float(alis.min()), float(alis.max()))
+            return self._counters.snapshot()
+
+    def distribution(self):
+        with self._lock:
+            return self._counters.sketch.copy()
+
+    def memory_bytes(self):
+        """Approximate bytes held by the stored records (excluding indexes)."""
+        return self._columns.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._columns.clear()
+            self._positions = {}
+            self._counters.clear()
+            self._topk.clear()
+            self._buckets = tuple(array("q") for _ in STATUS_LABELS)
+            self._bucket_entries = 0
+            self._history.clear()
+            self._subjects = {}
+            self._subject_load.clear()
+            self._version += 1
+
+
+# ============================================================================
+# SQLITE BACKEND
+# ============================================================================
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id                INTEGER PRIMARY KEY AUTOINCREMENT,
+    name              TEXT    NOT NULL,
+    ali               REAL    NOT NULL,
+    status            TEXT    NOT NULL,
+    status_code       INTEGER NOT NULL,
+    total_hours       REAL    NOT NULL,
+    available_hours   REAL    NOT NULL,
+    tightest_deadline INTEGER NOT NULL,
+    daily_capacity    REAL    NOT NULL,
+    timestamp         TEXT    NOT NULL,
+    horizon_ali       REAL,
+    horizon_deadline  INTEGER,
+    student_key       TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_records_ali ON records (ali);
+CREATE INDEX IF NOT EXISTS idx_records_status ON records (status_code, ali);
+CREATE INDEX IF NOT EXISTS idx_records_timestamp ON records (timestamp);
+
+-- Subject rows of each student's current assessment
+CREATE TABLE IF NOT EXISTS subjects (
+    id                   INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_key          TEXT    NOT NULL,
+    subject_key          TEXT    NOT NULL,
+    subject              TEXT    NOT NULL,
+    assignments          REAL    NOT NULL,
+    hours_per_assignment REAL    NOT NULL,
+    deadline_days        INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_subjects_student ON subjects (student_key);
+
+-- Store-wide settings as JSON values, e.g. the threshold policy
+CREATE TABLE IF NOT EXISTS settings (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+-- Append-only per-student ALI time series (epoch minutes); its ids are the
+-- change feed's sequence numbers and previous_ali is the ALI replaced
+CREATE TABLE IF NOT EXISTS ali_history (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    name         TEXT    NOT NULL,
+    minute       INTEGER NOT NULL,
+    ali          REAL    NOT NULL,
+    student_key  TEXT,
+    previous_ali REAL
+);
+"""
+
+# Every row written to records / subjects, by any connection, lands in
+# store_changes (records: -1 removed / +1 added, an update is both; subjects:
+# -2 / +2), so a store can catch up on another process's commits by
+# replaying the entries after its watermark instead of reloading everything.
+# seq is a plain rowid (no AUTOINCREMENT bookkeeping per row); it still only
+# grows because pruning and clear() never delete the newest entry
+_CHANGE_LOG = """
+CREATE TABLE IF NOT EXISTS store_changes (
+    seq         INTEGER PRIMARY KEY,
+    kind        INTEGER NOT NULL,
+    row_id      INTEGER NOT NULL,
+    student_key TEXT,
+    ali         REAL,
+    status_code INTEGER,
+    subject_key TEXT,
+    subject     TEXT,
+    hours       REAL
+);
+CREATE TRIGGER IF NOT EXISTS log_records_insert AFTER INSERT ON records BEGIN
+    INSERT INTO store_changes (kind, row_id, student_key, ali, status_code)
+    VALUES (1, NEW.id, NEW.student_key, NEW.ali, NEW.status_code);
+END;
+CREATE TRIGGER IF NOT EXISTS log_records_delete AFTER DELETE ON records BEGIN
+    INSERT INTO store_changes (kind, row_id, student_key, ali, status_code)
+    VALUES (-1, OLD.id, OLD.student_key, OLD.ali, OLD.status_code);
+END;
+CREATE TRIGGER IF NOT EXISTS log_records_update AFTER UPDATE OF ali, status_code ON records BEGIN
+    INSERT INTO store_changes (kind, row_id, student_key, ali, status_code)
+    VALUES (-1, OLD.id, OLD.student_key, OLD.ali, OLD.status_code),
+           (1, NEW.id, NEW.student_key, NEW.ali, NEW.status_code);
+END;
+CREATE TRIGGER IF NOT EXISTS log_subjects_insert AFTER INSERT ON subjects BEGIN
+    INSERT INTO store_changes (kind, row_id, student_key, subject_key, subject, hours)
+    VALUES (2, NEW.id, NEW.student_key, NEW.subject_key, NEW.subject, NEW.assignments * NEW.hours_per_assignment);
+END;
+CREATE TRIGGER IF NOT EXISTS log_subjects_delete AFTER DELETE ON subjects BEGIN
+    INSERT INTO store_changes (kind, row_id, student_key, subject_key, subject, hours)
+    VALUES (-2, OLD.id, OLD.student_key, OLD.subject_key, OLD.subject, OLD.assignments * OLD.hours_per_assignment);
+END;
+"""
+CHANGE_LOG_KEEP = 200_000  # entries kept for lagging readers; older ones mean a full reload
+
+# Columns added after the first release: (table, name, declaration)
+_MIGRATIONS = (
+    ("records", "horizon_ali", "REAL"),
+    ("records", "horizon_deadline", "INTEGER"),
+    ("records", "student_key", "TEXT"),
+    ("ali_history", "student_key", "TEXT"),
+    ("ali_history", "previous_ali", "REAL"),
+)
+
+# Created once the migrated columns exist
+_KEY_INDEXES = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_records_student ON records (student_key);
+CREATE INDEX IF NOT EXISTS idx_history_student_minute ON ali_history (student_key, minute);
+DROP INDEX IF EXISTS idx_history_name_minute;
+"""
+
+_COLUMNS = (
+    "name, ali, status, status_code, total_hours, available_hours, "
+    "tightest_deadline, daily_capacity, timestamp, horizon_ali, horizon_deadline"
+)
+_INSERT_COLUMNS = f"{_COLUMNS}, student_key"
+
+# Per-subject totals, joined with each student's current status (reloads only)
+_SUBJECT_TOTALS = f"""
+SELECT s.subject_key, MIN(s.subject),
+       SUM(s.assignments * s.hours_per_assignment), COUNT(DISTINCT s.student_key),
+       SUM(CASE WHEN r.status_code = {STATUS_CRITICAL} THEN s.assignments * s.hours_per_assignment ELSE 0 END),
+       COUNT(DISTINCT CASE WHEN r.status_code = {STATUS_CRITICAL} THEN s.student_key END)
+FROM subjects s JOIN records r ON r.student_key = s.student_key
+GROUP BY s.subject_key
+"""
+_SUBJECT_COLUMNS = "subject, assignments, hours_per_assignment, deadline_days"
+
+
+def _subject_from_row(row):
+    name, assignments, hours_per_assignment, deadline_days = row
+    return {"name": name, "assignments": assignments,
+            "hours_per_assignment": hours_per_assignment, "deadline_days": deadline_days}
+
+
+def _merged_subject_rows(rows):
+    """`subjects.subject_rows` form of (id, subject key, name, hours) rows of one student."""
+    merged = {}
+    for _, key, name, hours in rows:
+        if key in merged:
+            merged[key][1] += hours
+        else:
+            merged[key] = [name, hours]
+    return [(key, name, hours) for key, (name, hours) in merged.items()]
+
+
+# Status code for the `ali` column under the bound (safe_max, warning_max)
+_STATUS_CASE = "CASE WHEN ali < ? THEN 0 WHEN ali <= ? THEN 1 ELSE 2 END"
+
+
+def _to_row(record, policy):
+    code = int(classify(record["ALI"], policy))
+    return (
+        record["Name"],
+        float(record["ALI"]),
+        STATUS_TEXT[code],
+        code,
+        float(record["Total Hours"]),
+        float(record["Available Hours"]),
+        int(record["Tightest Deadline"]),
+        float(record["Daily Capacity"]),
+        record["Timestamp"],
+        record.get("Horizon ALI"),
+        record.get("Horizon Deadline"),
+        student_key(record["Name"]),
+    )
+
+
+def _from_row(row):
+    return dict(zip(RECORD_FIELDS, row[:3] + row[4:]))
+
+
+class SQLiteStore(RecordStore):
+    """
+    SQLite-backed store with indexes on ALI, status and timestamp.
+
+    `records` holds one row per student: a unique index on the normalized
+    student key turns every write into an upsert, while `ali_history`
+    keeps every assessment.
+
+    One connection is shared by all threads (Streamlit runs each browser
+    session in its own thread) and serialized with a lock; WAL mode plus a
+    busy timeout lets several app processes write to the same file.
+
+    Aggregate counters are loaded once and then maintained on every write;
+    the top-K heap index is built on the first `top()` call and maintained
+    the same way. Commits from other processes (e.g. the API server) bump
+    `PRAGMA data_version`; the next read then replays their `store_changes`
+    entries into the counters, sketch, subject totals and heaps, so it
+    costs O(rows they changed). Only a reader that fell more than
+    CHANGE_LOG_KEEP entries behind, or a `clear()` elsewhere, reloads.
+
+    The threshold policy is saved in `settings`; without one the stored
+    policy (else the default) is kept.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, timeout=30.0, policy=None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            # REPLACE's implicit delete must fire log_records_delete too
+            self._conn.execute("PRAGMA recursive_triggers=ON")
+            self._conn.executescript(_SCHEMA)
+            for table, column, declaration in _MIGRATIONS:
+                existing = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+            self._backfill_history()
+            self._backfill_student_keys()
+            self._conn.executescript(_KEY_INDEXES)
+            self._conn.executescript(_CHANGE_LOG)
+            self._conn.commit()
+            self._policy = self._stored_policy()
+            self._counters = StatusCounters(self._policy)
+            self._subject_load = SubjectLoad()
+            self._topk = None
+            self._version = 0
+            self._reload_counters()
+        if policy is not None:
+            self.set_policy(policy)
+
+    def _backfill_history(self):
+        # Databases created before the history table: seed it from the records
+        if self._conn.execute("SELECT 1 FROM ali_history LIMIT 1").fetchone() is None:
+            self._conn.execute(
+                "INSERT INTO ali_history (name, minute, ali) "
+                "SELECT name, CAST(strftime('%s', timestamp) AS INTEGER) / 60, ali FROM records ORDER BY id"
+            )
+
+    def _backfill_student_keys(self):
+        # Rows written before upserts: key them, then keep only each
+        # student's latest record (the others are already in ali_history)
+        self._conn.create_function("student_key", 1, student_key, deterministic=True)
+        self._conn.execute("UPDATE ali_history SET student_key = student_key(name) WHERE student_key IS NULL")
+        if self._conn.execute("SELECT 1 FROM records WHERE student_key IS NULL LIMIT 1").fetchone():
+            self._conn.execute("UPDATE records SET student_key = student_key(name) WHERE student_key IS NULL")
+            self._conn.execute(
+                "DELETE FROM records WHERE id NOT IN (SELECT MAX(id) FROM records GROUP BY student_key)"
+            )
+
+    def _stored_policy(self):
+        row = self._conn.execute("SELECT value FROM settings WHERE key = 'policy'").fetchone()
+        if row is None:
+            return DEFAULT_POLICY
+        data = json.loads(row[0])
+        return policy_from_dict(data.get("name", DEFAULT_POLICY.name), data)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _data_version(self):
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _reload_counters(self):
+        with self._lock:
+            self._policy = self._counters.policy = self._stored_policy()
+            self._counters.clear()
+            rows = self._conn.execute(
+                "SELECT status_code, COUNT(*), TOTAL(CASE WHEN ali < ? THEN ali END), "
+                "COUNT(*) - COUNT(CASE WHEN ali < ? THEN 1 END), MIN(ali), MAX(ali) "
+                "FROM records GROUP BY status_code",
+                (math.inf, math.inf),
+            ).fetchall()
+            for code, n, ali_sum, inf_count, min_ali, max_ali in rows:
+                self._counters.total += n
+                self._counters.counts[code] = n
+                self._counters.ali_sum += ali_sum
+                self._counters.inf_count += inf_count
+                self._counters.min_ali = min(self._counters.min_ali, min_ali)
+                self._counters.max_ali = max(self._counters.max_ali, max_ali)
+            # ALI is stored rounded, so this returns few distinct values
+            values = self._conn.execute("SELECT ali, COUNT(*) FROM records GROUP BY ali").fetchall()
+            if values:
+                alis, weights = zip(*values)
+                self._counters.sketch.add_many(alis, weights)
+            self._subject_load.clear()
+            for row in self._conn.execute(_SUBJECT_TOTALS):
+                self._subject_load.add_totals(*row)
+            self._topk = None  # rebuilt lazily by top()
+            self._seen_version = self._data_version()
+            self._change_seq = self._last_change_seq()
+
+    def _last_change_seq(self):
+        return self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM store_changes").fetchone()[0]
+
+    def _sync(self):
+        # Pick up commits made through other connections
+        with self._lock:
+            if self._data_version() == self._seen_version:
+                return
+            in_transaction = self._conn.in_transaction
+            if not in_transaction:
+                self._conn.execute("BEGIN")  # one snapshot for the log and the rows it points at
+            try:
+                self._catch_up()
+            finally:
+                if not in_transaction:
+                    self._conn.commit()
+            self._version += 1
+
+    def _catch_up(self):
+        self._seen_version = self._data_version()
+        first = self._conn.execute("SELECT MIN(seq) FROM store_changes").fetchone()[0]
+        entries = self._conn.execute(
+            "SELECT seq, kind, row_id, student_key, ali, status_code, subject_key, subject, hours "
+            "FROM store_changes WHERE seq > ? ORDER BY seq",
+            (self._change_seq,),
+        ).fetchall()
+        if (first is not None and first > self._change_seq + 1) or any(e[1] == 0 for e in entries):
+            self._reload_counters()  # pruned past our watermark, or cleared elsewhere
+            return
+        self._policy = self._counters.policy = self._stored_policy()
+        if entries:
+            self._apply_changes(entries)
+            self._change_seq = entries[-1][0]
+
+    def _apply_changes(self, entries):
+        added = [e for e in entries if e[1] == 1]
+        removed = [e for e in entries if e[1] == -1]
+        # Adds first, so the running total never dips to zero part-way
+        self._counters.add_many([e[4] for e in added], [e[5] for e in added])
+        self._counters.remove_many([e[4] for e in removed], [e[5] for e in removed])
+        if self._topk is not None:
+            for e in removed:
+                self._topk.remove(e[2])
+            self._topk.add_many(self._topk_items([e[2] for e in added]))
+        if len(self._subject_load) or any(abs(e[1]) == 2 for e in entries):
+            self._replay_subjects(entries)
+
+    def _replay_subjects(self, entries):
+        # Per touched student: take back the subject hours counted before the
+        # entries (rebuilt from the current rows and the logged ones) and add
+        # the current ones, each under the status the student had then
+        keys = list(dict.fromkeys(e[3] for e in entries))
+        inserted = {e[2] for e in entries if e[1] == 2}
+        first_record = {}
+        for e in entries:
+            if abs(e[1]) == 1:
+                first_record.setdefault(e[3], e)
+        status, rows = {}, {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            marks = ", ".join("?" * len(chunk))
+            status.update(self._conn.execute(
+                f"SELECT student_key, status_code FROM records WHERE student_key IN ({marks})", chunk
+            ))
+            for row_id, key, *row in self._conn.execute(
+                f"SELECT id, student_key, subject_key, subject, assignments * hours_per_assignment "
+                f"FROM subjects WHERE student_key IN ({marks}) ORDER BY id",
+                chunk,
+            ):
+                rows.setdefault(key, []).append((row_id, *row))
+        deleted = {}
+        for e in entries:
+            if e[1] == -2 and e[2] not in inserted:
+                deleted.setdefault(e[3], []).append((e[2], e[6], e[7], e[8]))
+        for key in keys:
+            current = rows.get(key, [])
+            before = sorted([r for r in current if r[0] not in inserted] + deleted.get(key, []))
+            first = first_record.get(key)
+            old_code = status.get(key) if first is None else (first[5] if first[1] == -1 else None)
+            if old_code is not None and before:
+                self._subject_load.remove(_merged_subject_rows(before), old_code == STATUS_CRITICAL)
+            if key in status and current:
+                self._subject_load.add(_merged_subject_rows(current), status[key] == STATUS_CRITICAL)
+
+    def _begin_write(self):
+        # Take the write lock first, so no other commit can land between
+        # catching up and our own change-log entries
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._sync()
+
+    def _end_write(self):
+        last = self._last_change_seq()
+        if last > CHANGE_LOG_KEEP:
+            self._conn.execute("DELETE FROM store_changes WHERE seq <= ?", (last - CHANGE_LOG_KEEP,))
+        self._change_seq = last
+
+    @property
+    def version(self):
+        with self._lock:
+            self._sync()
+            return self._version
+
+    @property
+    def policy(self):
+        with self._lock:
+            self._sync()
+            return self._policy
+
+    def set_policy(self, policy):
+        with self._lock, self._conn:
+            self._begin_write()
+            old = self._policy
+            if policy == old:
+                return 0
+            bounds = (policy.safe_max, policy.warning_max)
+            moved = 0
+            # Range scans on idx_records_ali: rows outside the changed ranges
+            # are never read
+            for low, high in old.changed_ranges(policy):
+                if len(self._subject_load):
+                    self._reclassify_subjects(policy, low, high)
+                for old_code, new_code, n in self._conn.execute(
+                    f"SELECT status_code, {_STATUS_CASE}, COUNT(*) FROM records "
+                    "WHERE ali >= ? AND ali < ? GROUP BY 1, 2",
+                    (*bounds, low, high),
+                ):
+                    self._counters.counts[old_code] -= n
+                    self._counters.counts[new_code] += n
+                moved += self._conn.execute(
+                    f"UPDATE records SET status_code = {_STATUS_CASE}, "
+                    f"status = CASE {_STATUS_CASE} WHEN 0 THEN ? WHEN 1 THEN ? ELSE ? END "
+                    "WHERE ali >= ? AND ali < ?",
+                    (*bounds, *bounds, *STATUS_TEXT, low, high),
+                ).rowcount
+            self._conn.execute(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES ('policy', ?)",
+                (json.dumps({"name": policy.name, **policy_to_dict(policy)}),),
+            )
+            self._policy = self._counters.policy = policy
+            self._end_write()
+            self._version += 1
+            return moved
+
+    def _reclassify_subjects(self, policy, low, high):
+        # Students in [low, high) whose Critical flag flips move their subject
+        # hours; compared with the stored code, as changed ranges may overlap
+        by_student = {}
+        for key, ali, code, *subject in self._conn.execute(
+            "SELECT r.student_key, r.ali, r.status_code, "
+            "s.subject, s.assignments, s.hours_per_assignment, s.deadline_days "
+            "FROM records r JOIN subjects s ON s.student_key = r.student_key WHERE r.ali >= ? AND r.ali < ?",
+            (low, high),
+        ):
+            by_student.setdefault(key, (ali, code, []))[2].append(_subject_from_row(subject))
+        for ali, code, subjects in by_student.values():
+            was, now = code == STATUS_CRITICAL, classify(ali, policy) == STATUS_CRITICAL
+            if was != now:
+                self._subject_load.set_critical(subject_rows(subjects), now)
+
+    def _replace_subjects(self, latest, current):
+        # Only students who already have a record can have stored subject rows
+        old = {}
+        keys = list(current)
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            for key, *subject in self._conn.execute(
+                f"SELECT student_key, {_SUBJECT_COLUMNS} FROM subjects "
+                f"WHERE student_key IN ({', '.join('?' * len(chunk))}) ORDER BY id",
+                chunk,
+            ):
+                old.setdefault(key, []).append(_subject_from_row(subject))
+        stale = list(old)
+        for start in range(0, len(stale), 500):
+            chunk = stale[start:start + 500]
+            self._conn.execute(f"DELETE FROM subjects WHERE student_key IN ({', '.join('?' * len(chunk))})", chunk)
+        for key, subjects in old.items():
+            critical = classify(current[key][1], self._policy) == STATUS_CRITICAL
+            self._subject_load.remove(subject_rows(subjects), critical)
+
+        fresh = []
+        for key, (row, record) in latest.items():
+            subjects = record.get("Subjects")
+            if subjects:
+                critical = row[3] == STATUS_CRITICAL  # status_code under the current policy
+                self._subject_load.add(subject_rows(subjects), critical)
+                fresh.extend(
+                    (key, subject_key(s["name"]), s["name"], s["assignments"], s["hours_per_assignment"],
+                     s["deadline_days"])
+                    for s in subjects
+                )
+        self._conn.executemany(
+            f"INSERT INTO subjects (student_key, subject_key, {_SUBJECT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+            fresh,
+        )
+
+    def _current(self, keys):
+        """student_key -> (id, ali) for the keys that already have a record."""
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            found.update(
+                (key, (record_id, ali))
+                for key, record_id, ali in self._conn.execute(
+                    f"SELECT student_key, id, ali FROM records WHERE student_key IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+            )
+        return found
+
+    def add_many(self, records):
+        records = list(records)
+        if not records:
+            return
+        with self._lock, self._conn:
+            self._begin_write()
+            # Classified in the write transaction, so a concurrent set_policy
+            # (here or in another process) either precedes it or sees its rows
+            rows = [_to_row(r, self._policy) for r in records]
+            # Last assessment per student in this batch wins
+            latest = {}
+            for row, record in zip(rows, records):
+                latest.pop(row[-1], None)
+                latest[row[-1]] = (row, record)
+            current = self._current(list(latest))
+            if len(self._subject_load) or any("Subjects" in record for _, record in latest.values()):
+                self._replace_subjects(latest, current)
+            # Each assessment replaces the previous one in this batch, else the stored row
+            previous = {key: ali for key, (_, ali) in current.items()}
+            history = []
+            for row in rows:
+                history.append((row[0], timestamp_minute(row[8]), row[1], row[-1], previous.get(row[-1])))
+                previous[row[-1]] = row[1]
+            self._conn.executemany(
+                "INSERT INTO ali_history (name, minute, ali, student_key, previous_ali) VALUES (?, ?, ?, ?, ?)",
+                history,
+            )
+            # REPLACE deletes the student's previous row (unique student_key)
+            # and inserts the new version with a fresh id
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO records ({_INSERT_COLUMNS}) VALUES ({', '.join('?' * len(rows[0]))})",
+                [row for row, _ in latest.values()],
+            )
+            self._counters.add_many([row[1] for key, (row, _) in latest.items() if key not in current])
+            self._counters.replace_many(
+                [old_ali for _, old_ali in current.values()], [latest[key][0][1] for key in current]
+            )
+            if self._topk is not None:
+                for old_id, _ in current.values():
+                    self._topk.remove(old_id)
+                # The write lock is held for the whole transaction, so the new
+                # ids are the consecutive run ending at last_insert_rowid()
+                last_id = self._conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                self._topk.add_many(zip(
+                    range(last_id - len(latest) + 1, last_id + 1), (record for _, record in latest.values())
+                ))
+            self._end_write()
+            self._version += 1
+
+    def all(self):
+        rows = self._query(f"SELECT {_COLUMNS} FROM records ORDER BY id DESC")
+        return [_from_row(r) for r in rows]
+
+    def iter_batches(self, batch_size=10_000):
+        # Keyset pagination on the primary key: the lock is only held per batch
+        last_id = None
+        while True:
+            if last_id is None:
+                rows = self._query(
+                    f"SELECT id, {_COLUMNS} FROM records ORDER BY id DESC LIMIT ?", (batch_size,)
+                )
+            else:
+                rows = self._query(
+                    f"SELECT id, {_COLUMNS} FROM records WHERE id < ? ORDER BY id DESC LIMIT ?",
+                    (last_id, batch_size),
+                )
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [_from_row(r[1:]) for r in rows]
+
+    def by_status(self, status_code, limit=None, offset=0):
+        sql = f"SELECT {_COLUMNS} FROM records WHERE status_code = ? ORDER BY ali DESC, id DESC"
+        params = [int(status_code)]
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend((int(limit), int(offset)))
+        return [_from_row(r) for r in self._query(sql, params)]
+
+    def query(self, statuses=None, deadline_range=(None, None), daily_range=(None, None),
+              limit=None, offset=0):
+        # status_code is the leading column of idx_records_status, so each
+        # selected bucket is an index range already ordered by ALI
+        clauses, params = [], []
+        if statuses is not None:
+            codes = sorted({int(code) for code in statuses})
+            clauses.append(f"status_code IN ({', '.join('?' * len(codes))})" if codes else "0")
+            params.extend(codes)
+        for column, (low, high) in (("tightest_deadline", deadline_range), ("daily_capacity", daily_range)):
+            if low is not None:
+                clauses.append(f"{column} >= ?")
+                params.append(low)
+            if high is not None:
+                clauses.append(f"{column} <= ?")
+                params.append(high)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        page = ""
+        page_params = []
+        if limit is not None:
+            page = "LIMIT ? OFFSET ?"
+            page_params = [int(limit), int(offset)]
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM records {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM records {where} ORDER BY ali DESC, id DESC {page}", params + page_params
+            ).fetchall()
+        return [_from_row(r) for r in rows], total
+
+    def ali_range(self, low=None, high=None, limit=None, offset=0):
+        clauses, params = [], []
+        if low is not None:
+            clauses.append("ali >= ?")
+            params.append(float(low))
+        if high is not None:
+            clauses.append("ali <= ?")
+            params.append(float(high))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        page = ""
+        if limit is not None:
+            page = "LIMIT ? OFFSET ?"
+            params.extend((int(limit), int(offset)))
+        # Reverse scan of idx_records_ali, whose entries end in the rowid: no sort step
+        rows = self._query(f"SELECT {_COLUMNS} FROM records {where} ORDER BY ali DESC, id DESC {page}", params)
+        return [_from_row(r) for r in rows]
+
+    def histories(self, names, last=None, since=None):
+        keys = {}
+        for name in names:
+            keys.setdefault(student_key(name), []).append(name)
+        if not keys:
+            return {}
+        clauses = [f"student_key IN ({', '.join('?' * len(keys))})"]
+        params = list(keys)
+        if since is not None:
+            clauses.append("minute >= ?")
+            params.append(datetime_minute(since))
+        where = " AND ".join(clauses)
+        if last is None:
+            sql = f"SELECT student_key, minute, ali FROM ali_history WHERE {where} ORDER BY student_key, minute, id"
+        else:
+            # Newest `last` points per student via idx_history_student_minute
+            sql = (
+                "SELECT student_key, minute, ali FROM ("
+                "  SELECT id, student_key, minute, ali, ROW_NUMBER() OVER ("
+                "    PARTITION BY student_key ORDER BY minute DESC, id DESC) AS rn"
+                f"  FROM ali_history WHERE {where}"
+                ") WHERE rn <= ? ORDER BY student_key, minute, id"
+            )
+            params.append(int(last))
+        by_key = {}
+        for key, minute, ali in self._query(sql, params):
+            by_key.setdefault(key, []).append((minute_datetime(minute), ali))
+        return {name: points for key, points in by_key.items() for name in keys[key]}
+
+    def subjects(self, name):
+        rows = self._query(
+            f"SELECT {_SUBJECT_COLUMNS} FROM subjects WHERE student_key = ? ORDER BY id", (student_key(name),)
+        )
+        return [_subject_from_row(row) for row in rows]
+
+    def subject_load(self, limit=None):
+        with self._lock:
+            self._sync()
+            return self._subject_load.report(limit)
+
+    def changes(self, after=0, limit=None):
+        # Primary-key range scan: only rows written since the watermark are read
+        sql = "SELECT id, name, minute, previous_ali, ali FROM ali_history WHERE id > ? ORDER BY id"
+        params = [after]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [tuple(row) for row in self._query(sql, params)]
+
+    def last_change(self):
+        # AUTOINCREMENT ids are never reused, so this survives clear()
+        row = self._query("SELECT seq FROM sqlite_sequence WHERE name = 'ali_history'")
+        return row[0][0] if row else 0
+
+    def _build_topk(self):
+        index = TopKIndex()
+        index.add_many(self._topk_items())
+        return index
+
+    def _topk_items(self, ids=None):
+        """(id, ranking fields) of every record, or of the given ids that still exist."""
+        sql = "SELECT id, ali, total_hours, available_hours, tightest_deadline FROM records"
+        if ids is None:
+            rows = self._conn.execute(sql).fetchall()
+        else:
+            rows = []
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows += self._conn.execute(f"{sql} WHERE id IN ({', '.join('?' * len(chunk))})", chunk).fetchall()
+        return [
+            (row[0], {"ALI": row[1], "Total Hours": row[2], "Available Hours": row[3], "Tightest Deadline": row[4]})
+            for row in rows
+        ]
+
+    def top(self, by="ali", k=10):
+        with self._lock:
+            self._sync()
+            if self._topk is None:
+                self._topk = self._build_topk()
+            ids = self._topk.top(by, k)
+            if not ids:
+                return []
+            rows = self._conn.execute(
+                f"SELECT id, {_COLUMNS} FROM records WHERE id IN ({', '.join('?' * len(ids))})", ids
+            ).fetchall()
+        by_id = {row[0]: _from_row(row[1:]) for row in rows}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def count(self):
+        return self.stats()["total"]
+
+    def stats(self):
+        with self._lock:
+            self._sync()
+            if self._counters.extrema_stale:
+                self._counters.set_extrema(*self._conn.execute(
+                    "SELECT MIN(ali), MAX(ali) FROM records"
+                ).fetchone())
+            return self._counters.snapshot()
+
+    def distribution(self):
+        with self._lock:
+            self._sync()
+            return self._counters.sketch.copy()
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            # The policy is the only state that outlives a clear
+            self._policy = self._counters.policy = self._stored_policy()
+            self._conn.execute("DELETE FROM records")
+            self._conn.execute("DELETE FROM ali_history")
+            self._conn.execute("DELETE FROM subjects")
+            # Other stores reload on the reset entry instead of replaying every delete
+            self._change_seq = self._conn.execute(
+                "INSERT INTO store_changes (kind, row_id) VALUES (0, 0)"
+            ).lastrowid
+            self._conn.execute("DELETE FROM store_changes WHERE seq < ?", (self._change_seq,))
+            self._seen_version = self._data_version()
+            self._subject_load.clear()
+            self._counters.clear()
+            if self._topk is not None:
+                self._topk.clear()
+            self._version += 1
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_store(backend=None, path=None, policy=None):
+    """
+    Open the configured record store.
+
+    Defaults come from the ACADEMIQ_STORE ("sqlite" or "memory"),
+    ACADEMIQ_DB and ACADEMIQ_POLICY / ACADEMIQ_POLICIES (see `policies`)
+    environment variables.
+    """
+    backend = backend or os.environ.get("ACADEMIQ_STORE", "sqlite")
+    policy = policy or open_policy()
+    if backend == "memory":
+        return MemoryStore(policy)
+    if backend == "sqlite":
+        return SQLiteStore(path or os.environ.get("ACADEMIQ_DB", DEFAULT_DB_PATH), policy=policy)
+    raise ValueError(f"Unknown record store backend: {backend!r}")
@@ -0,0 +1,112 @@
+"""
+Subject-level load aggregation.
+
+Assessments from the form and the API carry their subject rows
+(`records.make_record(..., subjects=...)`). The stores keep each student's
+current rows and a `SubjectLoad` that is updated on every write and
+policy change, so the per-subject report never scans the cohort:
+
+- total assigned hours and the number of students taking the subject
+- the hours and students coming from students currently in Critical
+  overload, and the subject's share of all Critical hours
+"""
+
+UNNAMED_SUBJECT = "(unnamed)"
+
+
+def subject_key(name):
+    """Normalized subject identifier (whitespace collapsed, case folded)."""
+    return (" ".join(str(name).split()) or UNNAMED_SUBJECT).casefold()
+
+
+def clean_subjects(subjects):
+    """Form-style subject dicts reduced to the persisted fields, with numeric values."""
+    return [
+        {
+            "name": " ".join(str(s.get("name", "")).split()) or UNNAMED_SUBJECT,
+            "assignments": float(s["assignments"]),
+            "hours_per_assignment": float(s["hours_per_assignment"]),
+            "deadline_days": int(s["deadline_days"]),
+        }
+        for s in subjects
+    ]
+
+
+def subject_rows(subjects):
+    """
+    (subject key, display name, hours) per distinct subject in one
+    student's subject dicts; repeated subjects are summed.
+    """
+    merged = {}
+    for s in subjects:
+        key = subject_key(s["name"])
+        hours = float(s["assignments"]) * float(s["hours_per_assignment"])
+        if key in merged:
+            merged[key][1] += hours
+        else:
+            merged[key] = [s["name"], hours]
+    return [(key, name, hours) for key, (name, hours) in merged.items()]
+
+
+class SubjectLoad:
+    """Running per-subject totals over every student's current subject rows."""
+
+    def __init__(self):
+        self.clear()
+
+    def __len__(self):
+        return len(self._subjects)
+
+    def clear(self):
+        # subject key -> [name, hours, students, critical hours, critical students]
+        self._subjects = {}
+
+    def add(self, rows, critical, sign=1):
+        """Count one student's `subject_rows` (`sign=-1` removes them)."""
+        for key, name, hours in rows:
+            entry = self._subjects.get(key)
+            if entry is None:
+                entry = self._subjects[key] = [name, 0.0, 0, 0.0, 0]
+            entry[1] += sign * hours
+            entry[2] += sign
+            if critical:
+                entry[3] += sign * hours
+                entry[4] += sign
+            if entry[2] <= 0:
+                del self._subjects[key]
+
+    def remove(self, rows, critical):
+        self.add(rows, critical, sign=-1)
+
+    def set_critical(self, rows, critical):
+        """Move one student's hours into (or out of) the Critical totals after a status change."""
+        self.remove(rows, not critical)
+        self.add(rows, critical)
+
+    def add_totals(self, key, name, hours, students, critical_hours, critical_students):
+        """Fold in pre-aggregated totals for one subject (e.g. from a GROUP BY)."""
+        entry = self._subjects.setdefault(key, [name, 0.0, 0, 0.0, 0])
+        entry[1] += hours
+        entry[2] += students
+        entry[3] += critical_hours
+        entry[4] += critical_students
+
+    def report(self, limit=None):
+        """
+        One dict per subject, largest Critical contribution first (then most
+        hours): Subject, Total Hours, Students, Critical Students, Critical
+        Hours and Critical Share (of all Critical hours, 0-1).
+        """
+        critical_total = sum(entry[3] for entry in self._subjects.values())
+        ranked = sorted(self._subjects.values(), key=lambda entry: (-entry[3], -entry[1], entry[0]))
+        return [
+            {
+                "Subject": name,
+                "Total Hours": round(hours, 1),
+                "Students": students,
+                "Critical Students": critical_students,
+                "Critical Hours": round(critical_hours, 1),
+                "Critical Share": critical_hours / critical_total if critical_total > 0 else 0.0,
+            }
+            for name, hours, students, critical_hours, critical_students in ranked[:limit]
+        ]
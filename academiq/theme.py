@@ -0,0 +1,31 @@
+"""
+Dark theme stylesheet for the Streamlit app.
+
+The CSS lives in `static/theme.css` and is read, stripped of comments and
+whitespace and wrapped in a `<style>` tag once per process; every rerun
+then injects the same cached string instead of rebuilding a ~9 KB literal.
+(Streamlit's static file server sends non-image files as text/plain with
+`nosniff`, so a `<link rel="stylesheet">` to it would be ignored.)
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+
+THEME_PATH = Path(__file__).with_name("static") / "theme.css"
+
+_COMMENTS = re.compile(r"/\*.*?\*/", re.S)
+_SPACE = re.compile(r"\s+")
+_PUNCTUATION_SPACE = re.compile(r"\s*([{};,])\s*")
+
+
+def minify_css(css):
+    """Drop comments and redundant whitespace (selectors and values keep their inner spaces)."""
+    css = _SPACE.sub(" ", _COMMENTS.sub("", css))
+    return _PUNCTUATION_SPACE.sub(r"\1", css).strip()
+
+
+@lru_cache(maxsize=None)
+def theme_style(path=THEME_PATH):
+    """The theme as a minified `<style>` block, read from disk once."""
+    return f"<style>{minify_css(Path(path).read_text(encoding='utf-8'))}</style>"
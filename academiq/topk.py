@@ -0,0 +1,267 @@
+"""
+Heap-backed "most overloaded students" index.
+
+`TopKIndex` keeps one ranked run per ranking key, updated on insert,
+update and delete, and serves the K highest-risk records by walking it
+from the top in O(K log K) without sorting or popping anything.
+
+Ties rank the higher record id first, the same total order as the stores'
+paged queries (`ORDER BY ali DESC, id DESC`), so the top K is exactly the
+first page of `ali_range`. Record ids must be integers.
+
+Each run is a sorted block of typed arrays (24 bytes per entry) plus a
+small binary heap of recent entries that is merged into the block once it
+outgrows a fraction of it, so the index costs about 80 bytes per record
+instead of several hundred for per-entry Python tuples. A store whose ids
+are its row positions (`MemoryStore`) tracks live ids in an array too.
+
+Deletes and updates are lazy: old entries are skipped on read and the runs
+are compacted once stale entries outnumber live ones.
+"""
+
+import heapq
+from array import array
+
+import numpy as np
+
+# Ranking keys; larger value = more at risk
+RANK_KEYS = {
+    "ali": lambda r: float(r["ALI"]),
+    "shortage": lambda r: float(r["Total Hours"]) - float(r["Available Hours"]),
+    "deadline": lambda r: -float(r["Tightest Deadline"]),
+}
+
+RANK_LABELS = {
+    "ali": "Highest ALI",
+    "shortage": "Largest shortage (hours)",
+    "deadline": "Tightest deadline",
+}
+
+MIN_PENDING = 4096   # recent entries kept in the heap before a merge...
+PENDING_SHARE = 16   # ...or 1/16 of the sorted block, whichever is larger
+
+
+class _Run:
+    """(negated rank, negated id, version) entries in ascending order: sorted arrays + a heap of recent ones."""
+
+    def __init__(self):
+        self.ranks = np.empty(0, np.float64)
+        self.ids = np.empty(0, np.int64)
+        self.versions = np.empty(0, np.int64)
+        self.pending = []  # heapq of entry tuples
+        self._limit = MIN_PENDING
+
+    def __len__(self):
+        return len(self.ids) + len(self.pending)
+
+    def push_many(self, entries):
+        pending, push = self.pending, heapq.heappush
+        for entry in entries:
+            push(pending, entry)
+        if len(pending) > self._limit:
+            self.merge()
+
+    def merge(self, keep=None, extra=None):
+        """
+        Fold the pending (and `extra`, given as arrays) entries into the
+        sorted block, keeping only entries where `keep(ids, versions)` is
+        True if given.
+        """
+        parts = []
+        if self.pending:
+            ranks, ids, versions = zip(*self.pending)
+            parts.append((np.array(ranks, np.float64), np.array(ids, np.int64), np.array(versions, np.int64)))
+        if extra is not None:
+            parts.append(extra)
+        block = (self.ranks, self.ids, self.versions)
+        new = tuple(np.concatenate(column) for column in zip(*parts)) if parts else tuple(c[:0] for c in block)
+        if keep is not None:
+            masks = [keep(entries[1], entries[2]) for entries in (block, new)]
+            block, new = (tuple(column[mask] for column in entries) for entries, mask in zip((block, new), masks))
+        order = np.lexsort((new[2], new[1], new[0]))
+        new = tuple(column[order] for column in new)
+        at = _insert_positions(block[0], block[1], new[0], new[1])
+        if at is None:  # composite key would overflow: sort everything
+            merged = tuple(np.concatenate(pair) for pair in zip(block, new))
+            order = np.lexsort((merged[2], merged[1], merged[0]))
+            self.ranks, self.ids, self.versions = (column[order] for column in merged)
+        else:
+            self.ranks, self.ids, self.versions = (np.insert(old, at, added) for old, added in zip(block, new))
+        self.pending = []
+        self._limit = max(MIN_PENDING, len(self.ids) // PENDING_SHARE)
+
+    def ascending(self):
+        """Entries in ascending order: the block and the heap walked top-down, merged."""
+        ranks, ids, versions = self.ranks, self.ids, self.versions
+        heap = self.pending
+        frontier = [(heap[0], 0)] if heap else []
+        i = 0
+        while True:
+            block = (float(ranks[i]), int(ids[i]), int(versions[i])) if i < len(ids) else None
+            if frontier and (block is None or frontier[0][0] < block):
+                entry, j = heapq.heappop(frontier)
+                for child in (2 * j + 1, 2 * j + 2):
+                    if child < len(heap):
+                        heapq.heappush(frontier, (heap[child], child))
+                yield entry
+            elif block is not None:
+                i += 1
+                yield block
+            else:
+                return
+
+
+def _insert_positions(ranks, ids, new_ranks, new_ids):
+    """
+    Where sorted (rank, id) entries go in a sorted block, in O(N): by rank,
+    and among equal ranks by id through a (rank group, id) integer key.
+    None if that key could overflow int64.
+    """
+    at = np.searchsorted(ranks, new_ranks, "left")
+    if not len(ranks) or not len(new_ranks):
+        return at
+    tied = ranks[np.minimum(at, len(ranks) - 1)] == new_ranks
+    if not tied.any():
+        return at
+    low = min(int(ids.min()), int(new_ids.min()))
+    span = max(int(ids.max()), int(new_ids.max())) - low + 1
+    if len(ranks) * span >= 2 ** 62:
+        return None
+    starts = np.flatnonzero(np.r_[True, ranks[1:] != ranks[:-1]])
+    group = np.repeat(starts, np.diff(np.r_[starts, len(ranks)]))  # first index of each entry's rank
+    keys = group * span + (ids - low)
+    at[tied] = np.searchsorted(keys, at[tied] * span + (new_ids[tied] - low), "left")
+    return at
+
+
+class _DenseVersions:
+    """Record id -> entry version for ids that are row positions (0, 1, 2, ...): 8 bytes per id."""
+
+    def __init__(self):
+        self._versions = array("q")  # -1 = not live
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def get(self, record_id, default=None):
+        if 0 <= record_id < len(self._versions) and self._versions[record_id] >= 0:
+            return self._versions[record_id]
+        return default
+
+    def assign(self, record_ids, first_version):
+        """Give `record_ids` consecutive versions; returns how many replaced a live entry."""
+        versions = self._versions
+        missing = max(record_ids, default=-1) + 1 - len(versions)
+        if missing > 0:
+            versions.extend(array("q", [-1]) * missing)
+        replaced = 0
+        for version, record_id in enumerate(record_ids, first_version):
+            if versions[record_id] >= 0:
+                replaced += 1
+            versions[record_id] = version
+        self._count += len(record_ids) - replaced
+        return replaced
+
+    def pop(self, record_id, default=None):
+        version = self.get(record_id)
+        if version is None:
+            return default
+        self._versions[record_id] = -1
+        self._count -= 1
+        return version
+
+    def matches(self, record_ids, versions):
+        """Mask of (id, version) pairs that are the live entry of their id."""
+        current = np.frombuffer(self._versions, dtype=np.int64)
+        inside = record_ids < len(current)
+        return inside & (current[np.where(inside, record_ids, 0)] == versions)
+
+
+class _SparseVersions(dict):
+    """Record id -> entry version for arbitrary integer ids."""
+
+    def assign(self, record_ids, first_version):
+        replaced = 0
+        for version, record_id in enumerate(record_ids, first_version):
+            if record_id in self:
+                replaced += 1
+            self[record_id] = version
+        return replaced
+
+    def matches(self, record_ids, versions):
+        return np.fromiter(
+            (self.get(record_id) == version for record_id, version in zip(record_ids.tolist(), versions.tolist())),
+            dtype=bool, count=len(record_ids),
+        )
+
+
+class TopKIndex:
+    """
+    Per-key ranked runs over record ids with lazy deletion. Pass
+    `dense_ids=True` when ids are row positions, to track them in an array.
+    """
+
+    def __init__(self, dense_ids=False):
+        self._dense_ids = dense_ids
+        self._next_version = 0
+        self.clear()
+
+    def clear(self):
+        self._live = _DenseVersions() if self._dense_ids else _SparseVersions()  # record_id -> entry version
+        self._runs = {key: _Run() for key in RANK_KEYS}
+        self._stale = 0
+
+    def __len__(self):
+        return len(self._live)
+
+    def add(self, record_id, record):
+        """Insert a record, or replace the one already stored under `record_id`."""
+        self.add_many([(record_id, record)])
+
+    update = add
+
+    def add_many(self, items):
+        """Insert (record_id, record) pairs; large batches go straight into the sorted blocks."""
+        items = list(items)
+        record_ids = [record_id for record_id, _ in items]
+        first = self._next_version
+        self._next_version += len(items)
+        self._stale += self._live.assign(record_ids, first)
+        for key, rank in RANK_KEYS.items():
+            run = self._runs[key]
+            if len(items) > MIN_PENDING:
+                run.merge(extra=(
+                    np.fromiter((-rank(record) for _, record in items), np.float64, len(items)),
+                    -np.array(record_ids, np.int64),
+                    np.arange(first, first + len(items), dtype=np.int64),
+                ))
+            else:
+                run.push_many(
+                    (-rank(record), -record_id, version)
+                    for version, (record_id, record) in enumerate(items, first)
+                )
+        self._maybe_compact()
+
+    def remove(self, record_id):
+        if self._live.pop(record_id, None) is not None:
+            self._stale += 1
+            self._maybe_compact()
+
+    def top(self, key, k):
+        """Ids of the `k` highest-ranked live records for `key`, best first."""
+        result = []
+        if k <= 0:
+            return result
+        for _, neg_id, version in self._runs[key].ascending():
+            if self._live.get(-neg_id) == version:
+                result.append(-neg_id)
+                if len(result) == k:
+                    break
+        return result
+
+    def _maybe_compact(self):
+        if self._stale > max(len(self._live), 1024):
+            for run in self._runs.values():
+                run.merge(keep=lambda neg_ids, versions: self._live.matches(-neg_ids, versions))
+            self._stale = 0
@@ -0,0 +1,90 @@
+"""
+What-if simulation.
+
+Evaluates whole grids of scenarios - more daily study hours, deadline
+extensions, dropped assignments - in a single broadcast call to the ALI
+engine, for one student or for a full cohort.
+
+Extensions push every deadline back by the same number of days, so the
+tightest deadline grows by that amount. Scenarios use the classic ALI and
+are classified under the given threshold policy (default thresholds if
+None).
+"""
+
+import numpy as np
+
+from .engine import STATUS_LABELS, score_arrays
+
+
+def dropped_hours(subjects, max_dropped):
+    """
+    Hours removed by dropping the 0..max_dropped largest assignments from
+    the form's `subject_data` (best-case relief for each count).
+    """
+    hours = np.repeat(
+        [float(s["hours_per_assignment"]) for s in subjects],
+        [int(s["assignments"]) for s in subjects],
+    )
+    hours = np.sort(hours)[::-1][:max_dropped]
+    removed = np.r_[0.0, np.cumsum(hours)]
+    # Counts beyond the number of assignments drop nothing more
+    return np.pad(removed, (0, max_dropped + 1 - len(removed)), mode="edge")
+
+
+def scenario_grid(total_hours, min_deadline, daily_hours, extension_days, dropped=(0.0,), policy=None):
+    """
+    ALI for every combination of daily hours x extension days x dropped hours.
+
+    Returns a dict with `ali` and `status_code` arrays of shape
+    (len(daily_hours), len(extension_days), len(dropped)).
+    """
+    daily = np.asarray(daily_hours, dtype=np.float64)[:, None, None]
+    deadline = min_deadline + np.asarray(extension_days, dtype=np.float64)[None, :, None]
+    total = np.maximum(total_hours - np.asarray(dropped, dtype=np.float64), 0.0)[None, None, :]
+
+    total, deadline, daily = np.broadcast_arrays(total, deadline, daily)
+    result = score_arrays(total, deadline, daily, policy)
+    return {"ali": result["ali"], "status_code": result["status_code"]}
+
+
+def cohort_scenarios(total_hours, min_deadline, daily_hours, extension_days=(0,),
+                     extra_daily_hours=(0.0,), policy=None):
+    """
+    Score every student under every (extension, extra daily hours) scenario.
+
+    Returns a dict with `ali` and `status_code` arrays of shape
+    (n_students, len(extension_days), len(extra_daily_hours)).
+    """
+    total = np.asarray(total_hours, dtype=np.float64)[:, None, None]
+    deadline = (
+        np.asarray(min_deadline, dtype=np.float64)[:, None, None]
+        + np.asarray(extension_days, dtype=np.float64)[None, :, None]
+    )
+    daily = (
+        np.asarray(daily_hours, dtype=np.float64)[:, None, None]
+        + np.asarray(extra_daily_hours, dtype=np.float64)[None, None, :]
+    )
+
+    total, deadline, daily = np.broadcast_arrays(total, deadline, daily)
+    result = score_arrays(total, deadline, daily, policy)
+    return {"ali": result["ali"], "status_code": result["status_code"]}
+
+
+def status_transitions(total_hours, min_deadline, daily_hours, extension_days=0,
+                       extra_daily_hours=0.0, policy=None):
+    """
+    Count students moving between statuses under one scenario.
+
+    Returns a (3, 3) integer matrix: rows are the current status code,
+    columns the status code after the scenario. For example
+    `m[STATUS_CRITICAL, STATUS_SAFE]` answers "how many Critical students
+    become Safe?".
+    """
+    before = score_arrays(total_hours, min_deadline, daily_hours, policy)["status_code"]
+    after = cohort_scenarios(
+        total_hours, min_deadline, daily_hours, (extension_days,), (extra_daily_hours,), policy
+    )["status_code"][:, 0, 0]
+
+    n = len(STATUS_LABELS)
+    pairs = before.astype(np.intp) * n + after
+    return np.bincount(pairs, minlength=n * n).reshape(n, n)
@@ -0,0 +1,166 @@
+"""
+Shared, batched write path for the record store.
+
+Every Streamlit session runs in its own thread; instead of each one writing
+to the store directly, they all hand their records to one `BatchWriter`.
+A single background thread drains its queue and commits records in small
+batches (one `add_many` transaction each):
+
+- group commit: as soon as the writer is free it commits everything that
+  queued up meanwhile (up to `max_batch`), so batches grow with load while
+  a lone submission is committed right away. `max_delay` > 0 additionally
+  lingers up to that long after a batch's oldest record for more to
+  arrive; it trades latency for larger batches, and on few cores it only
+  adds latency, so it is off by default;
+- the queue is bounded: when `max_pending` records are waiting, `submit`
+  blocks for up to `timeout` seconds (back-pressure on the submitting
+  sessions) and then raises `WriterOverloaded`.
+
+`submit` returns a `concurrent.futures.Future` that resolves once the
+record is committed, and submit-to-commit latencies are sampled for the
+p50 / p99 figures in `stats()`.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_DELAY = 0.0         # seconds to linger for a fuller batch
+DEFAULT_MAX_PENDING = 4096
+DEFAULT_SUBMIT_TIMEOUT = 2.0    # seconds a submission may wait for queue space
+LATENCY_SAMPLES = 10_000
+
+_STOP = object()
+
+
+class WriterOverloaded(RuntimeError):
+    """Raised when the write queue stays full for longer than the submit timeout."""
+
+
+class BatchWriter:
+    """Bounded queue in front of a record store, committed by one thread."""
+
+    def __init__(self, store, max_batch=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY,
+                 max_pending=DEFAULT_MAX_PENDING):
+        self.store = store
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self.rejected = 0
+        self.failed = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="academiq-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record, timeout=DEFAULT_SUBMIT_TIMEOUT):
+        """Queue one record; returns a Future resolved once it is committed."""
+        if self._closed:
+            raise RuntimeError("BatchWriter is closed")
+        future = Future()
+        try:
+            self._queue.put((time.perf_counter(), record, future), timeout=timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self.rejected += 1
+            raise WriterOverloaded(
+                f"write queue full ({self._queue.maxsize} pending) for {timeout:g}s"
+            ) from None
+        return future
+
+    def flush(self):
+        """Block until everything queued so far is committed."""
+        self._queue.join()
+
+    def close(self):
+        """Commit what is queued, then stop the writer thread."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put((None, _STOP, None))
+            self._thread.join()
+
+    # ------------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------------
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first[1] is _STOP:
+                self._queue.task_done()
+                return
+            batch = [first]
+            deadline = first[0] + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item[1] is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch):
+        try:
+            self.store.add_many([record for _, record, _ in batch])
+        except Exception as exc:  # surface store errors to every waiter
+            with self._stats_lock:
+                self.failed += len(batch)
+            for _, _, future in batch:
+                future.set_exception(exc)
+        else:
+            committed = time.perf_counter()
+            with self._stats_lock:
+                self.batches += 1
+                self.items += len(batch)
+                self.largest_batch = max(self.largest_batch, len(batch))
+                self._latencies.extend(committed - queued for queued, _, _ in batch)
+            for _, _, future in batch:
+                future.set_result(None)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def stats(self):
+        with self._stats_lock:
+            latencies = np.fromiter(self._latencies, dtype=np.float64)
+            stats = {
+                "pending": self._queue.qsize(),
+                "batches": self.batches,
+                "items": self.items,
+                "largest_batch": self.largest_batch,
+                "mean_batch": self.items / self.batches if self.batches else 0.0,
+                "rejected": self.rejected,
+                "failed": self.failed,
+            }
+        p50, p99 = np.percentile(latencies, [50, 99]) if latencies.size else (0.0, 0.0)
+        stats["p50_ms"] = float(p50) * 1000
+        stats["p99_ms"] = float(p99) * 1000
+        return stats
+
+
+def open_writer(store):
+    """
+    A `BatchWriter` for `store` configured from ACADEMIQ_WRITE_BATCH,
+    ACADEMIQ_WRITE_QUEUE and ACADEMIQ_WRITE_DELAY_MS.
+    """
+    return BatchWriter(
+        store,
+        max_batch=int(os.environ.get("ACADEMIQ_WRITE_BATCH", DEFAULT_MAX_BATCH)),
+        max_delay=float(os.environ.get("ACADEMIQ_WRITE_DELAY_MS", DEFAULT_MAX_DELAY * 1000)) / 1000,
+        max_pending=int(os.environ.get("ACADEMIQ_WRITE_QUEUE", DEFAULT_MAX_PENDING)),
+    )
@@ -1,7 +1,14 @@
+import os
+
 import streamlit as st
-import pandas as pd
-from datetime import datetime, timedelta
-import math
+from datetime import datetime
+
+# Only what every page needs is imported here; each page imports its own
+# heavier dependencies (pandas, import / export, what-if) when it renders
+from academiq.engine import STATUS_CRITICAL, STATUS_SAFE, STATUS_WARNING
+from academiq.profiling import PROFILE_PARAM, RenderProfiler, profile_mode
+from academiq.store import open_store
+from academiq.theme import theme_style
 
 # ============================================================================
 # PAGE CONFIG & ADVANCED STYLING
@@ -13,299 +20,40 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# PROFESSIONAL DARK THEME WITH ANIMATIONS & GLASSMORPHISM
-st.markdown("""
-<style>
-    /* Root Colors */
-    :root {
-        --primary: #58a6ff;
-        --primary-dark: #1f6feb;
-        --success: #3fb950;
-        --warning: #d29922;
-        --danger: #f85149;
-        --bg-primary: #0d1117;
-        --bg-secondary: #161b22;
-        --bg-tertiary: #21262d;
-        --text-primary: #e6edf3;
-        --text-secondary: #8b949e;
-        --border: #30363d;
-    }
-    
-    /* Main Container */
-    [data-testid="stAppViewContainer"] {
-        background: linear-gradient(135deg, #0d1117 0%, #161b22 100%);
-    }
-    
-    [data-testid="stSidebar"] {
-        background: rgba(22, 27, 34, 0.8);
-        backdrop-filter: blur(10px);
-        border-right: 1px solid rgba(88, 166, 255, 0.1);
-    }
-    
-    /* Typography */
-    h1 {
-        color: #58a6ff;
-        font-size: 2.8rem !important;
-        font-weight: 700 !important;
-        background: linear-gradient(135deg, #58a6ff, #79c0ff);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        margin-bottom: 1.5rem !important;
-        letter-spacing: -1px;
-    }
-    
-    h2 {
-        color: #79c0ff;
-        font-size: 2rem !important;
-        margin-top: 2.5rem !important;
-        margin-bottom: 1.5rem !important;
-        display: flex;
-        align-items: center;
-        gap: 0.5rem;
-    }
-    
-    h3 {
-        color: #79c0ff;
-        font-size: 1.4rem !important;
-        margin-top: 1.5rem !important;
-    }
-    
-    p, span, label {
-        color: #e6edf3 !important;
-        line-height: 1.6;
-    }
-    
-    /* Input Fields with Glassmorphism */
-    input, textarea, select {
-        background: rgba(13, 17, 23, 0.5) !important;
-        color: #e6edf3 !important;
-        border: 1.5px solid rgba(88, 166, 255, 0.2) !important;
-        border-radius: 8px !important;
-        padding: 0.75rem !important;
-        backdrop-filter: blur(10px) !important;
-        transition: all 0.3s ease !important;
-        font-size: 1rem !important;
-    }
-    
-    input:focus, textarea:focus, select:focus {
-        border-color: #58a6ff !important;
-        box-shadow: 0 0 0 3px rgba(88, 166, 255, 0.15) !important;
-        background: rgba(13, 17, 23, 0.8) !important;
-    }
-    
-    /* Buttons - Enhanced */
-    button {
-        background: linear-gradient(135deg, #238636, #2ea043) !important;
-        color: #ffffff !important;
-        font-weight: 600 !important;
-        border-radius: 8px !important;
-        border: none !important;
-        padding: 0.8rem 1.8rem !important;
-        font-size: 1rem !important;
-        cursor: pointer !important;
-        transition: all 0.3s ease !important;
-        box-shadow: 0 4px 12px rgba(48, 54, 61, 0.3) !important;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    button:hover {
-        background: linear-gradient(135deg, #2ea043, #3fb950) !important;
-        box-shadow: 0 8px 20px rgba(63, 185, 80, 0.3) !important;
-        transform: translateY(-2px) !important;
-    }
-    
-    button:active {
-        transform: translateY(0) !important;
-    }
-    
-    /* Metrics */
-    [data-testid="metric-container"] {
-        background: linear-gradient(135deg, rgba(22, 27, 34, 0.6), rgba(33, 38, 45, 0.6)) !important;
-        border: 1px solid rgba(88, 166, 255, 0.15) !important;
-        border-radius: 12px !important;
-        padding: 1.5rem !important;
-        backdrop-filter: blur(10px) !important;
-        box-shadow: 0 8px 24px rgba(0, 0, 0, 0.4) !important;
-        transition: all 0.3s ease !important;
-    }
-    
-    [data-testid="metric-container"]:hover {
-        border-color: rgba(88, 166, 255, 0.3) !important;
-        box-shadow: 0 12px 32px rgba(88, 166, 255, 0.2) !important;
-        transform: translateY(-4px) !important;
-    }
-    
-    /* Status Cards */
-    .status-card {
-        border-radius: 12px;
-        padding: 1.5rem;
-        margin: 1rem 0;
-        border: 1px solid;
-        backdrop-filter: blur(10px);
-        box-shadow: 0 8px 24px rgba(0, 0, 0, 0.4);
-        transition: all 0.3s ease;
-    }
-    
-    .status-card-safe {
-        background: linear-gradient(135deg, rgba(13, 57, 34, 0.4), rgba(13, 57, 34, 0.2)) !important;
-        border-color: rgba(63, 185, 80, 0.3) !important;
-    }
-    
-    .status-card-warning {
-        background: linear-gradient(135deg, rgba(61, 40, 23, 0.4), rgba(61, 40, 23, 0.2)) !important;
-        border-color: rgba(210, 153, 34, 0.3) !important;
-    }
-    
-    .status-card-critical {
-        background: linear-gradient(135deg, rgba(61, 31, 26, 0.4), rgba(61, 31, 26, 0.2)) !important;
-        border-color: rgba(248, 81, 73, 0.3) !important;
-    }
-    
-    .status-card-safe:hover, .status-card-warning:hover, .status-card-critical:hover {
-        transform: translateY(-4px) !important;
-        box-shadow: 0 12px 32px rgba(0, 0, 0, 0.5) !important;
-    }
-    
-    /* Explanation Boxes */
-    .explanation-box {
-        background: linear-gradient(135deg, rgba(13, 31, 60, 0.5), rgba(31, 110, 251, 0.1)) !important;
-        border: 1px solid rgba(31, 110, 251, 0.2) !important;
-        padding: 1.5rem !important;
-        border-radius: 12px !important;
-        line-height: 1.8 !important;
-        margin: 1.5rem 0 !important;
-        color: #79c0ff !important;
-        backdrop-filter: blur(10px) !important;
-        box-shadow: 0 8px 24px rgba(0, 0, 0, 0.3) !important;
-    }
-    
-    /* Forms */
-    [data-testid="stForm"] {
-        background: linear-gradient(135deg, rgba(22, 27, 34, 0.5), rgba(33, 38, 45, 0.3)) !important;
-        border: 1px solid rgba(88, 166, 255, 0.1) !important;
-        padding: 2rem !important;
-        border-radius: 16px !important;
-        backdrop-filter: blur(10px) !important;
-        box-shadow: 0 12px 40px rgba(0, 0, 0, 0.4) !important;
-    }
-    
-    /* Dividers */
-    hr {
-        border-color: rgba(88, 166, 255, 0.1) !important;
-        margin: 2rem 0 !important;
-    }
-    
-    /* Tables */
-    [data-testid="dataframe"] {
-        background: linear-gradient(135deg, rgba(22, 27, 34, 0.6), rgba(33, 38, 45, 0.4)) !important;
-    }
-    
-    .dataframe {
-        color: #e6edf3 !important;
-    }
-    
-    /* Alerts */
-    [data-testid="stAlert"] {
-        background: linear-gradient(135deg, rgba(22, 27, 34, 0.6), rgba(33, 38, 45, 0.4)) !important;
-        border-radius: 12px !important;
-        border-left: 4px solid !important;
-        backdrop-filter: blur(10px) !important;
-    }
-    
-    /* Progress Bars */
-    .progress-container {
-        width: 100%;
-        height: 8px;
-        background: rgba(48, 54, 61, 0.5);
-        border-radius: 4px;
-        overflow: hidden;
-        margin: 0.5rem 0;
-    }
-    
-    .progress-bar {
-        height: 100%;
-        border-radius: 4px;
-        transition: width 0.5s ease;
-        background: linear-gradient(90deg, #58a6ff, #79c0ff);
-        box-shadow: 0 0 10px rgba(88, 166, 255, 0.5);
-    }
-    
-    /* Radio buttons */
-    [role="radio"], [role="checkbox"] {
-        accent-color: #58a6ff !important;
-    }
-    
-    /* Links */
-    a {
-        color: #58a6ff !important;
-        transition: color 0.3s ease !important;
-    }
-    
-    a:hover {
-        color: #79c0ff !important;
-        text-decoration: underline !important;
-    }
-    
-    /* Sidebar styling */
-    [data-testid="stSidebar"] p, [data-testid="stSidebar"] span {
-        color: #c9d1d9 !important;
-    }
-    
-    /* Animations */
-    @keyframes slideIn {
-        from {
-            opacity: 0;
-            transform: translateY(20px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    
-    @keyframes pulse {
-        0%, 100% {
-            opacity: 1;
-        }
-        50% {
-            opacity: 0.8;
-        }
-    }
-    
-    [data-testid="metric-container"] {
-        animation: slideIn 0.5s ease-out;
-    }
-    
-    /* Gradient Text */
-    .gradient-text {
-        background: linear-gradient(135deg, #58a6ff, #79c0ff);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-    }
-    
-    /* Hero Section */
-    .hero-section {
-        background: linear-gradient(135deg, rgba(31, 110, 251, 0.1), rgba(88, 166, 255, 0.05)) !important;
-        border: 1px solid rgba(88, 166, 255, 0.2) !important;
-        border-radius: 16px !important;
-        padding: 3rem !important;
-        margin-bottom: 2rem !important;
-        text-align: center !important;
-        backdrop-filter: blur(10px) !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+
+def _query_param(name):
+    """Read a URL query parameter on both old and new Streamlit APIs."""
+    if hasattr(st, "query_params"):
+        return st.query_params.get(name)
+    values = st.experimental_get_query_params().get(name)
+    return values[0] if values else None
+
+
+def _fragment(func):
+    """
+    Rerun `func` on its own when one of its widgets changes: st.fragment
+    (requirements.txt pins a Streamlit that has it; 1.33-1.36 call it
+    st.experimental_fragment). Older versions fall back to a full rerun.
+    """
+    fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+    return fragment(func) if fragment is not None else func
+
+
+# Opt-in render profiling: ?profile=1 / ?profile=cprofile or ACADEMIQ_PROFILE
+profiler = RenderProfiler(profile_mode(_query_param(PROFILE_PARAM))).start("CSS injection")
+
+# Professional dark theme (static/theme.css), read and minified once per process
+st.markdown(theme_style(), unsafe_allow_html=True)
 
 # ============================================================================
 # SIDEBAR: NAVIGATION
 # ============================================================================
+profiler.checkpoint("Sidebar")
 st.sidebar.markdown("## 📋 Navigation")
 page = st.sidebar.radio(
     "Select Page",
     ["🏠 Home", "📊 Student Assessment", "👨‍🏫 Mentor Dashboard", "📚 System Guide"],
+    key="page",
     label_visibility="collapsed"
 )
 
@@ -328,13 +76,92 @@ st.sidebar.markdown(
 # ============================================================================
 # SESSION STATE
 # ============================================================================
-if "student_records" not in st.session_state:
-    st.session_state.student_records = []
+profiler.checkpoint("Record store")
+@st.cache_resource
+def get_record_store():
+    """One shared, persistent record store for every browser session."""
+    return open_store()
+
+
+@st.cache_resource
+def get_record_writer():
+    """Batched write queue in front of the shared store, used by every session."""
+    from academiq.writer import open_writer
+
+    return open_writer(get_record_store())
+
+
+@st.cache_resource
+def get_frame_cache():
+    """Records DataFrame cache shared by every session, keyed on the store version."""
+    from academiq.frames import FrameCache, default_staleness
+
+    return FrameCache(max_staleness=default_staleness())
+
+
+@st.cache_resource
+def get_alert_scanner():
+    """Background overload alert scanner, started only when ACADEMIQ_OUTBOX is set."""
+    if not os.environ.get("ACADEMIQ_OUTBOX"):
+        return None
+    from academiq.alerts import DEFAULT_SCAN_INTERVAL, AlertScanner, open_outbox
+
+    interval = float(os.environ.get("ACADEMIQ_ALERT_INTERVAL", DEFAULT_SCAN_INTERVAL))
+    return AlertScanner(get_record_store(), open_outbox()).start(interval)
+
+
+record_store = get_record_store()
+get_alert_scanner()
+
+CARD_PAGE_SIZES = [10, 25, 50, 100]
+FILTER_PAGE_SIZE = 25
+SAVE_WAIT_SECONDS = 10  # how long the assessment page waits for its record to be committed
+STATUS_SHORT_LABELS = ["✅ Safe", "⚠️ Warning", "🚨 Critical"]  # indexed by status code
+STATUS_HEX = ("#3fb950", "#d29922", "#f85149")  # card colours, indexed by status code
+DISTRIBUTION_PERCENTILES = {"P25": 0.25, "Median": 0.5, "P75": 0.75, "P90": 0.9, "P99": 0.99}
+DISTRIBUTION_STEP = 0.1    # ALI width of a distribution chart bar
+DISTRIBUTION_UPPER = 3.0   # ALI at and above which students share the last bar
+
+
+def _set_status_filter(codes):
+    """Quick filter button callback: select the given statuses, back to page 1."""
+    st.session_state.filter_statuses = [STATUS_SHORT_LABELS[code] for code in codes]
+    st.session_state.filter_page = 1
+
+
+def _ali_text(ali):
+    """ALI for a metric tile ("∞" when there is no available time)."""
+    return "∞" if ali is None or ali == float("inf") else f"{ali:.2f}"
+
+
+def _get_recommendation(status_code, total_hours, available_hours):
+    """Next steps for a status code (classified under the store's threshold policy)."""
+    if status_code == STATUS_SAFE:
+        buffer_hours = available_hours - total_hours
+        return (
+            f"✅ **You're in Good Shape!**  \n"
+            f"You have **{buffer_hours:.1f} hours of buffer**. Use this time to deepen learning and rest."
+        )
+    elif status_code == STATUS_WARNING:
+        shortage = max(total_hours - available_hours, 0.0)
+        return (
+            f"⚠️ **Stay Disciplined**  \n"
+            f"You need **{shortage:.1f} more hours than available**. Any disruption could cause problems. "
+            f"Reach out to your mentor and consider asking for deadline extensions."
+        )
+    else:
+        shortage = max(total_hours - available_hours, 0.0)
+        return (
+            f"🚨 **Action Required**  \n"
+            f"Your workload exceeds capacity by **{shortage:.1f} hours**. **Contact your mentor immediately.** "
+            f"Request deadline extensions, workload reduction, or academic support."
+        )
 
 # ============================================================================
 # PAGE 0: HOME
 # ============================================================================
 if page == "🏠 Home":
+    profiler.checkpoint("Home: hero & features")
     st.markdown("# 📚 Academic Overload Detection System")
     
     # Hero Section
@@ -380,28 +207,31 @@ if page == "🏠 Home":
     st.markdown("---")
     
     # Stats Section
+    profiler.checkpoint("Home: metrics")
     st.markdown("## 📈 System Status")
     
     col1, col2, col3, col4 = st.columns(4)
-    
+    # Running counters maintained by the store - no scan over records
+    store_stats = record_store.stats()
+    status_counts = store_stats["counts"]
+    policy = record_store.policy
+
     with col1:
-        st.metric("Students Assessed", len(st.session_state.student_records), help="Total assessments")
-    
+        st.metric("Students Assessed", store_stats["total"], help="Unique students (latest assessment each)")
+
     with col2:
-        safe = sum(1 for r in st.session_state.student_records if r["ALI"] < 1.0)
-        st.metric("Safe Students", safe, help="ALI < 1.0")
-    
+        st.metric("Safe Students", status_counts[STATUS_SAFE], help=policy.describe(STATUS_SAFE))
+
     with col3:
-        warning = sum(1 for r in st.session_state.student_records if 1.0 <= r["ALI"] <= 1.3)
-        st.metric("At Risk", warning, help="1.0 ≤ ALI ≤ 1.3")
-    
+        st.metric("At Risk", status_counts[STATUS_WARNING], help=policy.describe(STATUS_WARNING))
+
     with col4:
-        critical = sum(1 for r in st.session_state.student_records if r["ALI"] > 1.3)
-        st.metric("Critical", critical, help="ALI > 1.3")
+        st.metric("Critical", status_counts[STATUS_CRITICAL], help=policy.describe(STATUS_CRITICAL))
     
     st.markdown("---")
     
     # CTA
+    profiler.checkpoint("Home: get started")
     st.markdown("## 🚀 Get Started")
     
     col1, col2 = st.columns(2)
@@ -432,6 +262,16 @@ if page == "🏠 Home":
 # PAGE 1: STUDENT ASSESSMENT
 # ============================================================================
 elif page == "📊 Student Assessment":
+    import numpy as np
+    import pandas as pd
+
+    from academiq.engine import STATUS_EMOJIS, edf_sweep, score_student
+    from academiq.history import ali_delta, rising_fast, rolling_mean
+    from academiq.records import make_record
+    from academiq.whatif import dropped_hours, scenario_grid
+    from academiq.writer import WriterOverloaded
+
+    profiler.checkpoint("Assessment: form")
     st.markdown("# 📊 Student Workload Assessment")
     
     st.markdown(
@@ -549,64 +389,58 @@ elif page == "📊 Student Assessment":
     # ========================================================================
     # RESULTS
     # ========================================================================
+    profiler.checkpoint("Assessment: results")
     if submit_button:
         if not student_name or student_name.strip() == "":
             st.error("❌ Please enter your name to proceed.")
         else:
-            total_required_hours = sum(
-                subject["assignments"] * subject["hours_per_assignment"]
-                for subject in subject_data
-            )
-
-            deadlines = [subject["deadline_days"] for subject in subject_data]
-            min_deadline = min(deadlines) if deadlines else 1
-
-            available_hours = daily_study_hours * min_deadline
+            policy = record_store.policy
+            score = score_student(subject_data, daily_study_hours, policy)
 
-            if available_hours > 0:
-                ali = total_required_hours / available_hours
-            else:
-                ali = float('inf')
+            total_required_hours = score.total_hours
+            min_deadline = score.min_deadline
+            available_hours = score.available_hours
+            ali = score.ali
 
             # Determine status
-            if ali < 1.0:
-                status = "Safe"
-                status_emoji = "✅"
-                status_color = "safe"
-            elif ali <= 1.3:
-                status = "Warning"
-                status_emoji = "⚠️"
-                status_color = "warning"
-            else:
-                status = "Critical Overload"
-                status_emoji = "🚨"
-                status_color = "critical"
-
-            record = {
-                "Name": student_name,
-                "ALI": round(ali, 2),
-                "Status": f"{status_emoji} {status}",
-                "Total Hours": round(total_required_hours, 1),
-                "Available Hours": round(available_hours, 1),
-                "Tightest Deadline": min_deadline,
-                "Daily Capacity": daily_study_hours,
-                "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M")
+            status = score.status
+            status_emoji = score.emoji
+            status_color = score.color
+
+            record = make_record(student_name, score, daily_study_hours, subjects=subject_data)
+            try:
+                # Committed by the shared writer together with other sessions' submissions
+                saved = get_record_writer().submit(record)
+            except WriterOverloaded:
+                saved = None
+                st.warning("⏳ Too many submissions right now - your result is shown below but was not saved. Please submit again in a minute.")
+            st.session_state.last_assessment = {
+                "name": student_name,
+                "subjects": subject_data,
+                "daily_hours": daily_study_hours,
+                "score": score,
             }
-            st.session_state.student_records.append(record)
 
             # Display Results
             st.markdown("---")
             st.markdown("## 📈 Your Results")
 
-            col1, col2, col3 = st.columns(3)
+            col1, col2, col3, col4 = st.columns(4)
             
             with col1:
                 st.metric("Academic Load Index", f"{ali:.2f}")
             
             with col2:
-                st.metric("Total Required Hours", f"{total_required_hours:.1f}h")
+                st.metric(
+                    "Horizon ALI",
+                    f"{score.horizon_ali:.2f}",
+                    help=f"Worst load across all deadlines, reached at day {score.horizon_deadline}"
+                )
             
             with col3:
+                st.metric("Total Required Hours", f"{total_required_hours:.1f}h")
+            
+            with col4:
                 st.metric("Available Hours", f"{available_hours:.1f}h")
 
             # ALI Gauge Visual
@@ -651,10 +485,14 @@ elif page == "📊 Student Assessment":
             **Step 3: Academic Load Index**  
             ALI = {total_required_hours:.1f} ÷ {available_hours:.1f} = **{ali:.2f}**
             
+            **Horizon ALI (per deadline):**  
+            Working through assignments by deadline, the tightest point is day {score.horizon_deadline}
+            with a load of **{score.horizon_ali:.2f}** (see *Load by Deadline* below)
+            
             **Interpretation:**
-            - **< 1.0:** You have more time than needed ✅
-            - **1.0–1.3:** Tight fit ⚠️
-            - **> 1.3:** Not manageable 🚨
+            - **{policy.describe(STATUS_SAFE)}:** You have more time than needed ✅
+            - **{policy.describe(STATUS_WARNING)}:** Tight fit ⚠️
+            - **{policy.describe(STATUS_CRITICAL)}:** Not manageable 🚨
             """
             
             st.markdown(
@@ -669,57 +507,138 @@ elif page == "📊 Student Assessment":
             # Recommendation
             st.markdown("### 💡 Your Next Steps")
             
-            # Move the helper function definition above its first usage
-            def _get_recommendation(ali, total_hours, available_hours, deadline, daily_hours):
-                if ali < 1.0:
-                    buffer_hours = available_hours - total_hours
-                    return (
-                        f"✅ **You're in Good Shape!**  \n"
-                        f"You have **{buffer_hours:.1f} hours of buffer**. Use this time to deepen learning and rest."
-                    )
-                elif ali <= 1.3:
-                    shortage = total_hours - available_hours
-                    return (
-                        f"⚠️ **Stay Disciplined**  \n"
-                        f"You need **{shortage:.1f} more hours than available**. Any disruption could cause problems. "
-                        f"Reach out to your mentor and consider asking for deadline extensions."
-                    )
-                else:
-                    shortage = total_hours - available_hours
-                    return (
-                        f"🚨 **Action Required**  \n"
-                        f"Your workload exceeds capacity by **{shortage:.1f} hours**. **Contact your mentor immediately.** "
-                        f"Request deadline extensions, workload reduction, or academic support."
-                    )
-
-            recommendation = _get_recommendation(ali, total_required_hours, available_hours, min_deadline, daily_study_hours)
+            recommendation = _get_recommendation(score.status_code, total_required_hours, available_hours)
             st.info(recommendation)
 
             # Breakdown Table
             st.markdown("### 📊 Subject Breakdown")
+            # Earliest deadline first, with hours due so far vs. hours available by then
+            order, cum_hours, load = edf_sweep(
+                [0] * len(subject_data),
+                [s["assignments"] * s["hours_per_assignment"] for s in subject_data],
+                [s["deadline_days"] for s in subject_data],
+                [daily_study_hours] * len(subject_data),
+            )
             breakdown_df = pd.DataFrame([
                 {
                     "Subject": s["name"],
                     "Assignments": s["assignments"],
                     "Hours Each": s["hours_per_assignment"],
                     "Total": round(s["assignments"] * s["hours_per_assignment"], 1),
-                    "Deadline": s["deadline_days"]
+                    "Deadline": s["deadline_days"],
+                    "Due by Deadline": round(cum, 1),
+                    "Load by Deadline": round(ratio, 2)
                 }
-                for s in subject_data
+                for s, cum, ratio in zip((subject_data[i] for i in order), cum_hours, load)
             ])
             st.dataframe(breakdown_df, use_container_width=True, hide_index=True)
 
-            st.success("✅ Assessment saved! Check the Mentor Dashboard to see all results.")
+            # Trend across this student's previous assessments (once this one is committed)
+            is_saved = False
+            if saved is not None:
+                try:
+                    saved.result(timeout=SAVE_WAIT_SECONDS)
+                    is_saved = True
+                except Exception as exc:  # timed out or the store rejected the batch
+                    st.warning(f"⚠️ Your assessment could not be saved yet: {exc or 'timed out'}")
+            ali_history = record_store.history(student_name, last=30)
+            if len(ali_history) > 1:
+                st.markdown("### 📈 Your ALI Over Time")
+                trend_df = pd.DataFrame(ali_history, columns=["Assessed", "ALI"]).set_index("Assessed")
+                trend_df["Rolling Avg"] = rolling_mean(trend_df["ALI"].to_numpy())
+                st.line_chart(trend_df, use_container_width=True)
+                if rising_fast(trend_df["ALI"].to_numpy()):
+                    st.warning(f"📈 Your ALI is rising fast (+{ali_delta(trend_df['ALI'].to_numpy()):.2f} vs. your recent average).")
 
-# ============================================================================
-# HELPER: RECOMMENDATION
-# ============================================================================
-# (Removed duplicate definition of _get_recommendation)
+            if is_saved:
+                st.success("✅ Assessment saved! Check the Mentor Dashboard to see all results.")
+
+    # ========================================================================
+    # WHAT-IF SIMULATOR
+    # ========================================================================
+    profiler.checkpoint("Assessment: what-if")
+    if "last_assessment" in st.session_state:
+        last = st.session_state.last_assessment
+        last_score = last["score"]
+
+        st.markdown("---")
+        st.markdown("## 🔮 What-If Simulator")
+        st.caption(f"Scenarios for {last['name']}'s latest assessment (ALI {last_score.ali:.2f}).")
+
+        total_assignments = int(sum(s["assignments"] for s in last["subjects"]))
+
+        sim_col1, sim_col2, sim_col3 = st.columns(3)
+        with sim_col1:
+            max_daily_hours = st.slider(
+                "Daily hours up to",
+                min_value=float(last["daily_hours"]),
+                max_value=max(16.0, float(last["daily_hours"])),
+                value=min(float(last["daily_hours"]) + 4.0, 16.0),
+                step=0.5
+            )
+        with sim_col2:
+            max_extension = st.slider("Extension days up to", min_value=0, max_value=14, value=7)
+        with sim_col3:
+            dropped_count = st.slider(
+                "Dropped assignments",
+                min_value=0,
+                max_value=max(total_assignments, 1),
+                value=0,
+                help="Drops the largest assignments first"
+            )
+
+        daily_options = np.arange(last["daily_hours"], max_daily_hours + 0.25, 0.5)
+        extension_options = np.arange(max_extension + 1)
+        removed = dropped_hours(last["subjects"], max(total_assignments, 1))
+
+        # Whole daily hours x extension x dropped grid in one engine call
+        grid = scenario_grid(
+            last_score.total_hours, last_score.min_deadline, daily_options, extension_options, removed,
+            policy=record_store.policy,
+        )
+        ali_surface = grid["ali"][:, :, dropped_count]
+        status_surface = grid["status_code"][:, :, dropped_count]
+
+        surface_df = pd.DataFrame(
+            [
+                [f"{STATUS_EMOJIS[code]} {value:.2f}" for value, code in zip(ali_row, status_row)]
+                for ali_row, status_row in zip(ali_surface, status_surface)
+            ],
+            index=[f"{hours:.1f}h/day" for hours in daily_options],
+            columns=[f"+{days}d" for days in extension_options],
+        )
+        st.dataframe(surface_df, use_container_width=True)
+
+        safe_extensions = np.flatnonzero(status_surface[0] == STATUS_SAFE)
+        if safe_extensions.size and safe_extensions[0] == 0:
+            st.success(f"✅ Already Safe at {daily_options[0]:.1f}h/day with no extension.")
+        elif safe_extensions.size:
+            st.info(
+                f"💡 At {daily_options[0]:.1f}h/day, a **{extension_options[safe_extensions[0]]}-day** "
+                f"extension brings the ALI into the Safe zone."
+            )
+        else:
+            st.warning(f"No extension up to {max_extension} days reaches Safe at {daily_options[0]:.1f}h/day.")
 
 # ============================================================================
 # PAGE 2: MENTOR DASHBOARD
 # ============================================================================
 elif page == "👨‍🏫 Mentor Dashboard":
+    import math
+
+    import pandas as pd
+
+    from academiq.engine import STATUS_COLORS, ThresholdPolicy, classify
+    from academiq.export import EXPORT_FORMATS, export_bytes
+    from academiq.history import SPARKLINE_POINTS, ali_delta, rising_fast, sparkline_svg
+    from academiq.importer import import_cohort
+    from academiq.policies import load_policies
+    from academiq.records import records_from_frame
+    from academiq.topk import RANK_LABELS
+    from academiq.whatif import status_transitions
+
+    frame_cache = get_frame_cache()
+    profiler.checkpoint("Dashboard: header & import")
     st.markdown("# 👨‍🏫 Mentor Dashboard")
     
     st.markdown(
@@ -732,18 +651,80 @@ elif page == "👨‍🏫 Mentor Dashboard":
         unsafe_allow_html=True
     )
 
-    if st.session_state.student_records:
-        dashboard_df = pd.DataFrame(st.session_state.student_records)
+    # Bulk Import
+    with st.expander("📂 Bulk Import (CSV / Parquet)"):
+        st.markdown(
+            "Upload a per-assignment workload file with columns "
+            "`student`, `hours_per_assignment`, `deadline_days`, `daily_hours` "
+            "and optionally `assignments`. The file is processed in chunks."
+        )
+        uploaded_file = st.file_uploader(
+            "Workload file",
+            type=["csv", "parquet"],
+            label_visibility="collapsed"
+        )
+        if uploaded_file is not None and st.button("📥 Import Cohort", use_container_width=True):
+            progress_text = st.empty()
+            try:
+                scored = import_cohort(
+                    uploaded_file,
+                    progress=lambda rows, chunks: progress_text.caption(f"Read {rows:,} rows ({chunks} chunks)...")
+                )
+            except (ValueError, ImportError) as exc:
+                st.error(f"❌ Import failed: {exc}")
+            else:
+                record_store.add_many(records_from_frame(scored))
+                frame_cache.invalidate()
+                st.success(f"✅ Imported {len(scored):,} students.")
+
+    # Threshold policy for this cohort
+    current_policy = record_store.policy
+    with st.expander(f"🎚️ Threshold Policy: {current_policy.name}"):
+        st.caption(
+            f"✅ Safe: {current_policy.describe(STATUS_SAFE)} · ⚠️ Warning: {current_policy.describe(STATUS_WARNING)} · "
+            f"🚨 Critical: {current_policy.describe(STATUS_CRITICAL)}. Applying a policy reclassifies only the "
+            f"stored records whose status changes."
+        )
+        policies = load_policies()
+        policies.setdefault(current_policy.name, current_policy)
+        policy_names = list(policies)
+        policy_name = st.selectbox(
+            "Programme policy", policy_names, index=policy_names.index(current_policy.name)
+        )
+        chosen = policies[policy_name]
+        policy_col1, policy_col2 = st.columns(2)
+        with policy_col1:
+            safe_max = st.number_input(
+                "Safe below ALI", min_value=0.0, max_value=5.0, value=float(chosen.safe_max), step=0.05,
+                key=f"policy_safe_{policy_name}"
+            )
+        with policy_col2:
+            warning_max = st.number_input(
+                "Critical above ALI", min_value=0.0, max_value=5.0, value=float(chosen.warning_max), step=0.05,
+                key=f"policy_warning_{policy_name}"
+            )
+        if st.button("Apply Policy", use_container_width=True):
+            if safe_max > warning_max:
+                st.error("❌ The Safe cut-off must not exceed the Critical cut-off.")
+            else:
+                name = policy_name if (safe_max, warning_max) == (chosen.safe_max, chosen.warning_max) else "custom"
+                moved = record_store.set_policy(ThresholdPolicy(safe_max, warning_max, name))
+                frame_cache.invalidate()
+                st.success(f"✅ Policy applied - {moved:,} stored records reclassified.")
 
+    if record_store:
         # Summary
+        profiler.checkpoint("Dashboard: overview")
         st.markdown("## 📌 Overview")
         
         col1, col2, col3, col4 = st.columns(4)
 
-        total_students = len(dashboard_df)
-        safe_count = sum(1 for r in st.session_state.student_records if r["ALI"] < 1.0)
-        warning_count = sum(1 for r in st.session_state.student_records if 1.0 <= r["ALI"] <= 1.3)
-        critical_count = sum(1 for r in st.session_state.student_records if r["ALI"] > 1.3)
+        store_stats = record_store.stats()
+        status_counts = store_stats["counts"]
+        total_students = store_stats["total"]
+        safe_count = status_counts[STATUS_SAFE]
+        warning_count = status_counts[STATUS_WARNING]
+        critical_count = status_counts[STATUS_CRITICAL]
 
         with col1:
             st.metric("Total Students", total_students)
@@ -754,118 +735,363 @@ elif page == "👨‍🏫 Mentor Dashboard":
         with col4:
             st.metric("Critical 🚨", critical_count)
 
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric("Mean ALI", _ali_text(store_stats["mean_ali"]))
+        with col2:
+            st.metric("Lowest ALI", _ali_text(store_stats["min_ali"]))
+        with col3:
+            st.metric("Highest ALI", _ali_text(store_stats["max_ali"]))
+
+        # Distribution from the store's streaming sketch: constant cost at any cohort size
+        profiler.checkpoint("Dashboard: distribution")
+        st.markdown("## 📈 ALI Distribution")
+
+        sketch = record_store.distribution()
+        percentiles = sketch.quantiles(list(DISTRIBUTION_PERCENTILES.values()))
+        percentile_cols = st.columns(len(DISTRIBUTION_PERCENTILES))
+        for col, label, value in zip(percentile_cols, DISTRIBUTION_PERCENTILES, percentiles):
+            with col:
+                st.metric(label, _ali_text(value))
+
+        bin_lows, bin_counts = sketch.histogram(DISTRIBUTION_STEP, DISTRIBUTION_UPPER, record_store.policy)
+        distribution_df = pd.DataFrame(
+            bin_counts,
+            index=[f"{low:.1f}" for low in bin_lows[:-1]] + [f"{DISTRIBUTION_UPPER:.1f}+"],
+            columns=STATUS_SHORT_LABELS,
+        )
+        distribution_df.index.name = "ALI"
+        st.bar_chart(distribution_df, color=list(STATUS_HEX), height=260)
+
+        st.markdown("---")
+
+        # Subject totals are maintained by the store on every write - no cohort scan
+        profiler.checkpoint("Dashboard: subject load")
+
+        @_fragment
+        def _subject_load():
+            st.markdown("## 📚 Subject Load")
+
+            subject_limit = st.number_input("Subjects shown", min_value=1, max_value=100, value=10, step=1, key="subject_limit")
+            subject_df = pd.DataFrame(
+                record_store.subject_load(int(subject_limit)),
+                columns=["Subject", "Total Hours", "Students", "Critical Students", "Critical Hours", "Critical Share"],
+            )
+            if subject_df.empty:
+                st.info("No subject data yet - assessments from the form record their subjects.")
+                return
+            subject_df["Critical Share"] = (subject_df["Critical Share"] * 100).round(1)
+            subject_df = subject_df.rename(columns={"Critical Share": "Critical Share (%)"})
+            st.dataframe(subject_df, use_container_width=True, hide_index=True)
+            st.caption("Ranked by hours coming from students in Critical overload; the share is of all Critical hours.")
+
+        _subject_load()
+
+        st.markdown("---")
+
+        # Top N at risk
+        profiler.checkpoint("Dashboard: top N")
+
+        @_fragment
+        def _top_at_risk():
+            st.markdown("## 🎯 Top N at Risk")
+
+            top_col1, top_col2 = st.columns([2, 1])
+            with top_col1:
+                rank_label = st.selectbox("Rank by", list(RANK_LABELS.values()), key="top_rank_by")
+                rank_by = next(key for key, label in RANK_LABELS.items() if label == rank_label)
+            with top_col2:
+                top_n = st.number_input("N", min_value=1, max_value=100, value=10, step=1, key="top_n")
+
+            # Served from the store's heap index - no full sort
+            top_records = record_store.top(rank_by, int(top_n))
+            top_df = pd.DataFrame(top_records, columns=["Name", "ALI", "Status", "Total Hours", "Available Hours", "Tightest Deadline", "Horizon ALI"])
+            top_df.insert(5, "Shortage (h)", (top_df["Total Hours"] - top_df["Available Hours"]).clip(lower=0).round(1))
+            top_df.insert(0, "#", range(1, len(top_df) + 1))
+            st.dataframe(top_df, use_container_width=True, hide_index=True)
+
+        _top_at_risk()
+
         st.markdown("---")
 
         # Student Cards View
-        st.markdown("## 👥 Student Workload Cards")
-        
-        dashboard_df_sorted = dashboard_df.sort_values("ALI", ascending=False)
-        
-        for idx, row in dashboard_df_sorted.iterrows():
-            ali_value = row["ALI"]
-            
-            if ali_value < 1.0:
-                card_style = "safe"
-                color = "#3fb950"
-            elif ali_value <= 1.3:
-                card_style = "warning"
-                color = "#d29922"
+        profiler.checkpoint("Dashboard: cards")
+
+        @_fragment
+        def _student_cards():
+            total_students = record_store.count()
+            st.markdown("## 👥 Student Workload Cards")
+
+            # Only the visible page is queried and rendered
+            page_col1, page_col2, page_col3 = st.columns([1, 1, 2])
+            with page_col1:
+                page_size = st.selectbox("Cards per page", CARD_PAGE_SIZES, index=1, key="card_page_size")
+
+            num_pages = max(1, math.ceil(total_students / page_size))
+            # Seeded through session state (not `value=`) so the clamp below never conflicts with the widget
+            st.session_state.setdefault("card_page", 1)
+            if st.session_state.card_page > num_pages:
+                st.session_state.card_page = num_pages
+
+            with page_col2:
+                page_number = st.number_input("Jump to page", min_value=1, max_value=num_pages, step=1, key="card_page")
+
+            page_start = (page_number - 1) * page_size
+            if page_number == 1:
+                # Default view: straight from the top-K index (same tie order as ali_range)
+                page_records = record_store.top("ali", page_size)
             else:
-                card_style = "critical"
-                color = "#f85149"
+                # Indexed ORDER BY ali DESC, id DESC - highest risk first
+                page_records = record_store.ali_range(limit=page_size, offset=page_start)
+
+            with page_col3:
+                st.caption(
+                    f"Showing {page_start + 1}–{page_start + len(page_records)} of {total_students} students "
+                    f"(page {page_number} of {num_pages})"
+                )
+
+            # Recent ALI points for every student on this page, in one query
+            page_histories = record_store.histories([row["Name"] for row in page_records], last=SPARKLINE_POINTS)
+
+            # Whole page classified in one call under the store's policy
+            page_codes = classify([row["ALI"] for row in page_records], record_store.policy).tolist()
+            for row, code in zip(page_records, page_codes):
+                ali_value = row["ALI"]
+                card_style = STATUS_COLORS[code]
+                color = STATUS_HEX[code]
+
+                if row["Horizon ALI"] is None:
+                    horizon_text = "—"
+                else:
+                    horizon_text = f"{row['Horizon ALI']:.2f} @ day {row['Horizon Deadline']}"
+
+                trend_values = [ali for _, ali in page_histories.get(row["Name"], [])]
+                trend_delta = ali_delta(trend_values)
+                if trend_delta is None:
+                    trend_text = "First assessment"
+                elif rising_fast(trend_values):
+                    trend_text = f'<span style="color: #f85149;">📈 Rising fast (+{trend_delta:.2f})</span>'
+                else:
+                    trend_text = f"{trend_delta:+.2f} vs. recent avg"
+                sparkline = sparkline_svg(trend_values, color=color)
             
-            st.markdown(f"""
-            <div class="status-card status-card-{card_style}">
-                <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">
-                    <div>
-                        <h3 style="margin: 0; color: {color};">{row['Name']}</h3>
-                        <p style="margin: 0.5rem 0; color: #8b949e;">{row['Status']}</p>
+                st.markdown(f"""
+                <div class="status-card status-card-{card_style}">
+                    <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">
+                        <div>
+                            <h3 style="margin: 0; color: {color};">{row['Name']}</h3>
+                            <p style="margin: 0.5rem 0; color: #8b949e;">{row['Status']}</p>
+                        </div>
+                        <div style="text-align: right;">
+                            <div style="font-size: 2.5rem; font-weight: bold; color: {color};">{ali_value:.2f}</div>
+                            <p style="margin: 0; color: #8b949e; font-size: 0.9rem;">ALI Score</p>
+                        </div>
                     </div>
-                    <div style="text-align: right;">
-                        <div style="font-size: 2.5rem; font-weight: bold; color: {color};">{ali_value:.2f}</div>
-                        <p style="margin: 0; color: #8b949e; font-size: 0.9rem;">ALI Score</p>
+                    <hr style="border-color: rgba(88, 166, 255, 0.1); margin: 1rem 0;">
+                    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem;">
+                        <div>
+                            <p style="margin: 0; color: #8b949e; font-size: 0.9rem;">Required Hours</p>
+                            <p style="margin: 0.5rem 0; font-size: 1.2rem; color: #e6edf3;">{row['Total Hours']:.1f}h</p>
+                        </div>
+                        <div>
+                            <p style="margin: 0; color: #8b949e; font-size: 0.9rem;">Available Hours</p>
+                            <p style="margin: 0.5rem 0; font-size: 1.2rem; color: #e6edf3;">{row['Available Hours']:.1f}h</p>
+                        </div>
+                        <div>
+                            <p style="margin: 0; color: #8b949e; font-size: 0.9rem;">Tightest Deadline</p>
+                            <p style="margin: 0.5rem 0; font-size: 1.2rem; color: #e6edf3;">{row['Tightest Deadline']} day(s)</p>
+                        </div>
+                        <div>
+                            <p style="margin: 0; color: #8b949e; font-size: 0.9rem;">Horizon ALI</p>
+                            <p style="margin: 0.5rem 0; font-size: 1.2rem; color: #e6edf3;">{horizon_text}</p>
+                        </div>
+                        <div>
+                            <p style="margin: 0; color: #8b949e; font-size: 0.9rem;">Last Updated</p>
+                            <p style="margin: 0.5rem 0; font-size: 0.95rem; color: #8b949e;">{row['Timestamp']}</p>
+                        </div>
+                        <div>
+                            <p style="margin: 0; color: #8b949e; font-size: 0.9rem;">ALI Trend</p>
+                            <div style="margin: 0.5rem 0;">{sparkline}</div>
+                            <p style="margin: 0; font-size: 0.9rem; color: #8b949e;">{trend_text}</p>
+                        </div>
                     </div>
                 </div>
-                <hr style="border-color: rgba(88, 166, 255, 0.1); margin: 1rem 0;">
-                <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem;">
-                    <div>
-                        <p style="margin: 0; color: #8b949e; font-size: 0.9rem;">Required Hours</p>
-                        <p style="margin: 0.5rem 0; font-size: 1.2rem; color: #e6edf3;">{row['Total Hours']:.1f}h</p>
-                    </div>
-                    <div>
-                        <p style="margin: 0; color: #8b949e; font-size: 0.9rem;">Available Hours</p>
-                        <p style="margin: 0.5rem 0; font-size: 1.2rem; color: #e6edf3;">{row['Available Hours']:.1f}h</p>
-                    </div>
-                    <div>
-                        <p style="margin: 0; color: #8b949e; font-size: 0.9rem;">Tightest Deadline</p>
-                        <p style="margin: 0.5rem 0; font-size: 1.2rem; color: #e6edf3;">{row['Tightest Deadline']} day(s)</p>
-                    </div>
-                    <div>
-                        <p style="margin: 0; color: #8b949e; font-size: 0.9rem;">Last Updated</p>
-                        <p style="margin: 0.5rem 0; font-size: 0.95rem; color: #8b949e;">{row['Timestamp']}</p>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+                """, unsafe_allow_html=True)
+
+        _student_cards()
 
         st.markdown("---")
 
         # Filters
-        st.markdown("## 🔍 Quick Filters")
+        profiler.checkpoint("Dashboard: filters")
+
+        @_fragment
+        def _quick_filters():
+            st.markdown("## 🔍 Quick Filters")
         
-        filter_col1, filter_col2, filter_col3 = st.columns(3)
-
-        with filter_col1:
-            if st.button("🚨 Critical Students", use_container_width=True, type="primary"):
-                critical = dashboard_df[dashboard_df["ALI"] > 1.3]
-                if len(critical) > 0:
-                    st.markdown(f"### Critical Overload ({len(critical)})")
-                    st.dataframe(critical[["Name", "ALI", "Total Hours", "Available Hours"]], use_container_width=True, hide_index=True)
-                    st.error("⚠️ These students need immediate intervention!")
-                else:
-                    st.success("✅ No critical students!")
-
-        with filter_col2:
-            if st.button("⚠️ Warning Zone", use_container_width=True):
-                at_risk = dashboard_df[dashboard_df["ALI"] >= 1.0]
-                if len(at_risk) > 0:
-                    st.markdown(f"### At Risk ({len(at_risk)})")
-                    st.dataframe(at_risk[["Name", "ALI", "Total Hours", "Available Hours"]], use_container_width=True, hide_index=True)
-                    st.warning("Monitor these students closely.")
-                else:
-                    st.success("✅ No at-risk students!")
-
-        with filter_col3:
-            if st.button("✅ Safe Students", use_container_width=True):
-                safe = dashboard_df[dashboard_df["ALI"] < 1.0]
-                if len(safe) > 0:
-                    st.markdown(f"### Safe ({len(safe)})")
-                    st.dataframe(safe[["Name", "ALI", "Total Hours", "Available Hours"]], use_container_width=True, hide_index=True)
-                    st.success("Great workload balance!")
+            filter_col1, filter_col2, filter_col3 = st.columns(3)
+
+            with filter_col1:
+                st.button("🚨 Critical Students", use_container_width=True, type="primary",
+                          on_click=_set_status_filter, args=([STATUS_CRITICAL],))
+            with filter_col2:
+                st.button("⚠️ Warning Zone", use_container_width=True,
+                          on_click=_set_status_filter, args=([STATUS_WARNING, STATUS_CRITICAL],))
+            with filter_col3:
+                st.button("✅ Safe Students", use_container_width=True,
+                          on_click=_set_status_filter, args=([STATUS_SAFE],))
+
+            selected_labels = st.multiselect("Status", STATUS_SHORT_LABELS, key="filter_statuses")
+            range_col1, range_col2 = st.columns(2)
+            with range_col1:
+                deadline_window = st.slider("Tightest deadline (days)", 1, 60, (1, 60), key="filter_deadline")
+            with range_col2:
+                daily_window = st.slider("Daily capacity (hours)", 0.0, 16.0, (0.0, 16.0), step=0.5, key="filter_daily")
+
+            if selected_labels:
+                selected_codes = [STATUS_SHORT_LABELS.index(label) for label in selected_labels]
+                # Slider ends are left open: imported cohorts can go past the form limits
+                deadline_range = (deadline_window[0] if deadline_window[0] > 1 else None,
+                                  deadline_window[1] if deadline_window[1] < 60 else None)
+                daily_range = (daily_window[0] if daily_window[0] > 0 else None,
+                               daily_window[1] if daily_window[1] < 16 else None)
+
+                # Served from the store's status buckets, one page at a time
+                filter_page = st.session_state.get("filter_page", 1)
+                matches, total_matches = record_store.query(
+                    selected_codes, deadline_range, daily_range,
+                    limit=FILTER_PAGE_SIZE, offset=(filter_page - 1) * FILTER_PAGE_SIZE
+                )
+                filter_pages = max(1, math.ceil(total_matches / FILTER_PAGE_SIZE))
+                if filter_page > filter_pages:
+                    st.session_state.filter_page = filter_page = filter_pages
+                    matches, total_matches = record_store.query(
+                        selected_codes, deadline_range, daily_range,
+                        limit=FILTER_PAGE_SIZE, offset=(filter_page - 1) * FILTER_PAGE_SIZE
+                    )
+
+                st.markdown(f"### {', '.join(selected_labels)} ({total_matches})")
+                if matches:
+                    st.dataframe(
+                        pd.DataFrame(matches, columns=["Name", "ALI", "Horizon ALI", "Total Hours", "Available Hours", "Tightest Deadline", "Daily Capacity"]),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                    result_col1, result_col2 = st.columns([1, 3])
+                    with result_col1:
+                        st.number_input("Results page", min_value=1, max_value=filter_pages, step=1, key="filter_page")
+                    with result_col2:
+                        st.caption(f"Page {filter_page} of {filter_pages}")
+                    if STATUS_CRITICAL in selected_codes:
+                        st.error("⚠️ Critical students need immediate intervention!")
                 else:
-                    st.info("No safe students yet.")
+                    st.success("✅ No students match these filters.")
+            else:
+                st.caption("Pick a quick filter or choose statuses to list matching students.")
+
+        _quick_filters()
 
         st.markdown("---")
 
-        # Export
-        st.markdown("## 📥 Export & Manage")
-        
-        col_export, col_clear = st.columns(2)
+        # Cohort What-If
+        profiler.checkpoint("Dashboard: cohort what-if")
 
-        with col_export:
-            csv = dashboard_df.to_csv(index=False)
-            st.download_button(
-                label="📊 Download Records (CSV)",
-                data=csv,
-                file_name=f"ali_records_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
+        @_fragment
+        def _cohort_whatif():
+            st.markdown("## 🔮 Cohort What-If")
+
+            whatif_col1, whatif_col2 = st.columns(2)
+            with whatif_col1:
+                cohort_extension = st.number_input("Deadline extension (days)", min_value=0, max_value=60, value=3)
+            with whatif_col2:
+                cohort_extra_hours = st.number_input(
+                    "Extra daily study hours", min_value=0.0, max_value=8.0, value=0.0, step=0.5
+                )
+
+            cohort_df = frame_cache.frame(record_store)
+            transitions = status_transitions(
+                cohort_df["Total Hours"].to_numpy(),
+                cohort_df["Tightest Deadline"].to_numpy(),
+                cohort_df["Daily Capacity"].to_numpy(),
+                extension_days=cohort_extension,
+                extra_daily_hours=cohort_extra_hours,
+                policy=record_store.policy,
+            )
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Critical → Safe", int(transitions[STATUS_CRITICAL, STATUS_SAFE]))
+            with col2:
+                st.metric("Critical → Warning", int(transitions[STATUS_CRITICAL, STATUS_WARNING]))
+            with col3:
+                st.metric("Warning → Safe", int(transitions[STATUS_WARNING, STATUS_SAFE]))
+
+            st.dataframe(
+                pd.DataFrame(
+                    transitions,
+                    index=[f"Now {name}" for name in STATUS_SHORT_LABELS],
+                    columns=[f"Then {name}" for name in STATUS_SHORT_LABELS],
+                ),
                 use_container_width=True
             )
 
-        with col_clear:
-            if st.button("🗑️ Clear All", use_container_width=True, type="secondary"):
-                st.session_state.student_records = []
-                st.rerun()
+        _cohort_whatif()
+
+        st.markdown("---")
+
+        # Export
+        profiler.checkpoint("Dashboard: export")
+        @_fragment
+        def _export_and_manage():
+            st.markdown("## 📥 Export & Manage")
+
+            col_export, col_clear = st.columns(2)
+
+            with col_export:
+                format_label = st.selectbox(
+                    "Export format",
+                    [label for label, _, _ in EXPORT_FORMATS.values()],
+                    label_visibility="collapsed"
+                )
+                export_format = next(fmt for fmt, spec in EXPORT_FORMATS.items() if spec[0] == format_label)
+                _, extension, mime = EXPORT_FORMATS[export_format]
+
+                # The payload is only serialized on request, then reused until the records change
+                export_key = (record_store.version, export_format)
+                if st.button(f"⚙️ Prepare {format_label} export", use_container_width=True):
+                    try:
+                        # Serialized batch by batch straight from the record store
+                        st.session_state.export_payload = (export_key, export_bytes(record_store, export_format))
+                    except ImportError as exc:
+                        st.error(f"❌ {exc}")
+
+                prepared = st.session_state.get("export_payload")
+                if prepared is not None and prepared[0] == export_key:
+                    st.download_button(
+                        label=f"📊 Download Records ({format_label})",
+                        data=prepared[1],
+                        file_name=f"ali_records_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+                        mime=mime,
+                        use_container_width=True
+                    )
+                else:
+                    st.session_state.pop("export_payload", None)
+
+            with col_clear:
+                if st.button("🗑️ Clear All", use_container_width=True, type="secondary"):
+                    record_store.clear()
+                    frame_cache.invalidate()
+                    st.session_state.pop("export_payload", None)
+                    st.rerun()
+
+            cache_stats = frame_cache.stats()
+            st.caption(
+                f"Records cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                f"({cache_stats['hit_rate']:.0%} hit rate, last build {cache_stats['last_build_seconds'] * 1000:.1f} ms)"
+            )
+
+        _export_and_manage()
 
     else:
         st.info("📭 No assessments yet. Start with Student Assessment.")
@@ -874,6 +1100,8 @@ elif page == "👨‍🏫 Mentor Dashboard":
 # PAGE 3: SYSTEM GUIDE
 # ============================================================================
 elif page == "📚 System Guide":
+    profiler.checkpoint("System Guide")
+    policy = record_store.policy
     st.markdown("# 📚 System Guide")
 
     st.markdown("## 🎯 What is ALI?")
@@ -893,28 +1121,28 @@ elif page == "📚 System Guide":
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown("""
+        st.markdown(f"""
         <div class="status-card status-card-safe">
             <h3 style="margin: 0; color: #3fb950;">✅ Safe</h3>
-            <p style="margin: 0.5rem 0;">ALI < 1.0</p>
+            <p style="margin: 0.5rem 0;">{policy.describe(STATUS_SAFE)}</p>
             <p style="margin: 0; font-size: 0.9rem; color: #8b949e;">Good buffer, manageable workload</p>
         </div>
         """, unsafe_allow_html=True)
     
     with col2:
-        st.markdown("""
+        st.markdown(f"""
         <div class="status-card status-card-warning">
             <h3 style="margin: 0; color: #d29922;">⚠️ Warning</h3>
-            <p style="margin: 0.5rem 0;">1.0 ≤ ALI ≤ 1.3</p>
+            <p style="margin: 0.5rem 0;">{policy.describe(STATUS_WARNING)}</p>
             <p style="margin: 0; font-size: 0.9rem; color: #8b949e;">Tight fit, monitor closely</p>
         </div>
         """, unsafe_allow_html=True)
     
     with col3:
-        st.markdown("""
+        st.markdown(f"""
         <div class="status-card status-card-critical">
             <h3 style="margin: 0; color: #f85149;">🚨 Critical</h3>
-            <p style="margin: 0.5rem 0;">ALI > 1.3</p>
+            <p style="margin: 0.5rem 0;">{policy.describe(STATUS_CRITICAL)}</p>
             <p style="margin: 0; font-size: 0.9rem; color: #8b949e;">Intervention needed now</p>
         </div>
         """, unsafe_allow_html=True)
@@ -940,15 +1168,15 @@ elif page == "📚 System Guide":
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("""
+        st.markdown(f"""
         ### Actions by Status
         
-        **✅ Safe (ALI < 1.0)**
+        **✅ Safe ({policy.describe(STATUS_SAFE)})**
         - Celebrate balance
         - Encourage continued discipline
         - Use time for deeper learning
         
-        **⚠️ Warning (1.0–1.3)**
+        **⚠️ Warning ({policy.describe(STATUS_WARNING)})**
         - Check in regularly
         - Offer workload review
         - Help prioritize assignments
@@ -956,8 +1184,8 @@ elif page == "📚 System Guide":
         """)
     
     with col2:
-        st.markdown("""
-        ### Critical (ALI > 1.3)
+        st.markdown(f"""
+        ### Critical ({policy.describe(STATUS_CRITICAL)})
         
         - **Contact immediately**
         - Discuss extensions
@@ -991,26 +1219,26 @@ elif page == "📚 System Guide":
         """)
 
 # ============================================================================
-# HELPER: RECOMMENDATION
+# RENDER PROFILE (opt-in)
 # ============================================================================
-def _get_recommendation(ali, total_hours, available_hours, deadline, daily_hours):
-    if ali < 1.0:
-        buffer_hours = available_hours - total_hours
-        return (
-            f"✅ **You're in Good Shape!**  \n"
-            f"You have **{buffer_hours:.1f} hours of buffer**. Use this time to deepen learning and rest."
-        )
-    elif ali <= 1.3:
-        shortage = total_hours - available_hours
-        return (
-            f"⚠️ **Stay Disciplined**  \n"
-            f"You need **{shortage:.1f} more hours than available**. Any disruption could cause problems. "
-            f"Reach out to your mentor and consider asking for deadline extensions."
-        )
-    else:
-        shortage = total_hours - available_hours
-        return (
-            f"🚨 **Action Required**  \n"
-            f"Your workload exceeds capacity by **{shortage:.1f} hours**. **Contact your mentor immediately.** "
-            f"Request deadline extensions, workload reduction, or academic support."
+if profiler.enabled:
+    import pandas as pd
+
+    profiler.finish()
+    with st.expander(f"⏱️ Render profile: {profiler.total_seconds * 1000:.1f} ms this rerun"):
+        profile_df = pd.DataFrame(profiler.sections)
+        profile_df["ms"] = (profile_df.pop("seconds") * 1000).round(2)
+        profile_df["share"] = (profile_df["ms"] / profile_df["ms"].sum()).map("{:.0%}".format)
+        st.dataframe(profile_df, use_container_width=True, hide_index=True)
+        st.caption(
+            f"{int(profile_df['markdown_calls'].sum())} st.markdown calls, "
+            f"{int(profile_df['markdown_bytes'].sum()):,} bytes emitted"
         )
+        if profiler.mode == "cprofile":
+            st.code(profiler.cprofile_text(), language="text")
+            st.download_button(
+                label="💾 Download cProfile dump (.prof)",
+                data=profiler.cprofile_bytes(),
+                file_name=f"academiq_rerun_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof",
+                mime="application/octet-stream"
+            )
@@ -0,0 +1,460 @@
+"""
+AcademiQ benchmark suite.
+
+Measures, across increasing cohort sizes:
+
+- ALI scoring throughput (vectorized engine, per-student arrays)
+- per-assignment cohort scoring (aggregation + horizon ALI)
+- Mentor Dashboard render time, driven headlessly through Streamlit's
+  AppTest harness against a synthetic SQLite record store
+- export time and peak Python memory (tracemalloc) per export format
+- multi-process sharded scoring of a CSV workload file per worker count
+- app cold start (fresh interpreter, first render) and rerun time per page
+- concurrent submissions (one thread per session) through the batched
+  writer vs. direct store writes: p50 / p99 submit latency and throughput
+- dashboard distribution queries (percentiles + histogram) from the
+  streaming sketch vs. sorting every ALI
+
+Results are written as JSON so runs can be compared:
+
+    python -m benchmarks.run                       # full run -> bench_results.json
+    python -m benchmarks.run --quick -o quick.json
+    python -m benchmarks.run --compare baseline.json
+"""
+
+import argparse
+import gc
+import threading
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from academiq.distribution import AliSketch
+from academiq.engine import score_arrays, score_assignments, score_student
+from academiq.export import export_bytes
+from academiq.parallel import score_sharded
+from academiq.records import make_record, records_from_frame
+from academiq.store import SQLiteStore
+from academiq.writer import BatchWriter
+
+ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = ROOT / "app1.py"
+DASHBOARD_PAGE = "👨‍🏫 Mentor Dashboard"
+APP_PAGES = ["🏠 Home", "📊 Student Assessment", DASHBOARD_PAGE, "📚 System Guide"]
+
+SIZES = {
+    "scoring": [1_000, 10_000, 100_000, 1_000_000],
+    "assignments": [1_000, 10_000, 100_000],
+    "dashboard": [100, 1_000, 10_000],
+    "export": [1_000, 10_000, 100_000],
+    "sharded": [100_000, 1_000_000],
+    "startup": [1_000],
+    "writes": [2_000],
+    "distribution": [10_000, 100_000, 1_000_000],
+}
+QUICK_SIZES = {
+    "scoring": [1_000, 10_000],
+    "assignments": [1_000],
+    "dashboard": [100],
+    "export": [1_000],
+    "sharded": [10_000],
+    "startup": [100],
+    "writes": [200],
+    "distribution": [10_000],
+}
+WRITE_SESSIONS = [1, 16, 128]
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+def _timeit(fn, repeat):
+    """Run `fn` `repeat` times; return (min, median) seconds."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times), statistics.median(times)
+
+
+def _cohort(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.uniform(1, 80, n),        # total hours
+        rng.integers(1, 60, n),       # tightest deadline
+        rng.uniform(1, 12, n),        # daily hours
+    )
+
+
+def _assignment_rows(n_students, per_student=8, seed=0):
+    rng = np.random.default_rng(seed)
+    n = n_students * per_student
+    students = np.repeat(np.arange(n_students), per_student)
+    return pd.DataFrame({
+        "student": students.astype(str),
+        "assignments": rng.integers(1, 4, n),
+        "hours_per_assignment": rng.uniform(0.5, 6, n),
+        "deadline_days": rng.integers(1, 60, n),
+        "daily_hours": rng.uniform(1, 12, n_students)[students],
+    })
+
+
+def _seeded_store(path, n_students):
+    scored = score_assignments(_assignment_rows(n_students, per_student=4))
+    store = SQLiteStore(path)
+    store.add_many(records_from_frame(scored))
+    return store
+
+
+# ============================================================================
+# BENCHMARKS
+# ============================================================================
+def bench_scoring(sizes, repeat):
+    results = []
+    for n in sizes:
+        total, deadline, daily = _cohort(n)
+        best, median = _timeit(lambda: score_arrays(total, deadline, daily), repeat)
+        results.append({"students": n, "min_s": best, "median_s": median, "students_per_s": n / best})
+        print(f"  scoring      {n:>10,} students  {best * 1000:9.2f} ms", file=sys.stderr)
+    return results
+
+
+def bench_assignments(sizes, repeat):
+    results = []
+    for n in sizes:
+        rows = _assignment_rows(n)
+        best, median = _timeit(lambda: score_assignments(rows), repeat)
+        results.append({
+            "students": n, "rows": len(rows), "min_s": best, "median_s": median,
+            "rows_per_s": len(rows) / best,
+        })
+        print(f"  assignments  {n:>10,} students  {best * 1000:9.2f} ms", file=sys.stderr)
+    return results
+
+
+def bench_dashboard(sizes, repeat, workdir):
+    try:
+        import streamlit as st
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        print("  dashboard    skipped (streamlit not installed)", file=sys.stderr)
+        return []
+
+    results = []
+    for n in sizes:
+        path = os.path.join(workdir, f"dashboard_{n}.db")
+        _seeded_store(path, n).close()
+        os.environ["ACADEMIQ_DB"] = path
+        st.cache_resource.clear()
+
+        at = AppTest.from_file(str(APP_PATH), default_timeout=600).run()
+        at.sidebar.radio[0].set_value(DASHBOARD_PAGE)
+        started = time.perf_counter()
+        at.run()
+        first = time.perf_counter() - started
+        if at.exception:
+            raise RuntimeError(f"dashboard raised: {at.exception[0].message}")
+
+        # Reruns with nothing changed (e.g. a widget interaction)
+        best, median = _timeit(at.run, repeat)
+        markdown_bytes = sum(len(el.value.encode("utf-8")) for el in at.markdown)
+        results.append({
+            "students": n, "first_render_s": first, "rerun_min_s": best, "rerun_median_s": median,
+            "markdown_elements": len(at.markdown), "markdown_bytes": markdown_bytes,
+        })
+        print(f"  dashboard    {n:>10,} students  first {first * 1000:9.2f} ms  rerun {best * 1000:9.2f} ms",
+              file=sys.stderr)
+    st.cache_resource.clear()
+    return results
+
+
+def bench_export(sizes, repeat, workdir, formats=("csv", "parquet", "arrow")):
+    results = []
+    for n in sizes:
+        store = _seeded_store(os.path.join(workdir, f"export_{n}.db"), n)
+        for fmt in formats:
+            try:
+                best, median = _timeit(lambda: export_bytes(store, fmt), repeat)
+            except ImportError:
+                continue
+            tracemalloc.start()
+            payload = export_bytes(store, fmt)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results.append({
+                "students": n, "format": fmt, "min_s": best, "median_s": median,
+                "bytes": len(payload), "peak_mem_bytes": peak,
+            })
+            print(f"  export {fmt:<7} {n:>10,} students  {best * 1000:9.2f} ms  peak {peak / 2**20:8.1f} MiB",
+                  file=sys.stderr)
+        store.close()
+    return results
+
+
+def _worker_counts():
+    counts, n = [], 1
+    while n < (os.cpu_count() or 1):
+        counts.append(n)
+        n *= 2
+    return counts + [os.cpu_count() or 1]
+
+
+def bench_sharded(sizes, repeat, workdir):
+    results = []
+    for n in sizes:
+        path = os.path.join(workdir, f"sharded_{n}.csv")
+        _assignment_rows(n).to_csv(path, index=False)
+        rows = n * 8
+        # Blocks small enough that every worker gets several
+        block_bytes = max(os.path.getsize(path) // (4 * (os.cpu_count() or 1)), 1 << 20)
+        for workers in _worker_counts():
+            best, median = _timeit(lambda: score_sharded(path, workers=workers, block_bytes=block_bytes), repeat)
+            results.append({
+                "students": n, "rows": rows, "workers": workers, "min_s": best, "median_s": median,
+                "rows_per_s": rows / best,
+            })
+            print(f"  sharded      {n:>10,} students  {workers:>3} workers  {best * 1000:9.2f} ms",
+                  file=sys.stderr)
+    return results
+
+
+# Run in a fresh interpreter so module imports count towards the first render
+_STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+harness = time.perf_counter() - started
+at = AppTest.from_file(sys.argv[1], default_timeout=600)
+at.session_state["page"] = sys.argv[2]
+started = time.perf_counter()
+at.run()
+first = time.perf_counter() - started
+if at.exception:
+    raise SystemExit(at.exception[0].message)
+reruns = []
+for _ in range(int(sys.argv[3])):
+    started = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - started)
+print(json.dumps({"harness_import_s": harness, "cold_s": first, "reruns": reruns,
+                  "pandas_loaded": "pandas" in sys.modules}))
+"""
+
+
+def bench_startup(sizes, repeat, workdir):
+    try:
+        import streamlit  # noqa: F401
+    except ImportError:
+        print("  startup      skipped (streamlit not installed)", file=sys.stderr)
+        return []
+
+    results = []
+    for n in sizes:
+        path = os.path.join(workdir, f"startup_{n}.db")
+        _seeded_store(path, n).close()
+        env = dict(os.environ, ACADEMIQ_DB=path, PYTHONPATH=str(ROOT))
+        for page in APP_PAGES:
+            proc = subprocess.run(
+                [sys.executable, "-c", _STARTUP_SCRIPT, str(APP_PATH), page, str(repeat)],
+                cwd=ROOT, env=env, capture_output=True, text=True,
+            )
+            if proc.returncode:
+                raise RuntimeError(f"{page} startup failed: {proc.stderr.strip()[-500:]}")
+            run = json.loads(proc.stdout.strip().splitlines()[-1])
+            reruns = run.pop("reruns")
+            results.append({
+                "students": n, "page": page, **run,
+                "rerun_min_s": min(reruns), "rerun_median_s": statistics.median(reruns),
+            })
+            print(f"  startup      {page:<24} cold {run['cold_s'] * 1000:9.2f} ms  "
+                  f"rerun {min(reruns) * 1000:9.2f} ms  pandas {'yes' if run['pandas_loaded'] else 'no'}",
+                  file=sys.stderr)
+    return results
+
+
+def _submit_concurrently(submit, submissions, sessions):
+    """Each session thread submits its share in turn; returns (wall seconds, latencies)."""
+    score = score_student([{"assignments": 3, "hours_per_assignment": 4, "deadline_days": 5}], 3)
+    latencies = [[] for _ in range(sessions)]
+    start = threading.Barrier(sessions + 1)
+
+    def session(index):
+        start.wait()
+        for i in range(index, submissions, sessions):
+            record = make_record(f"student_{i % 5_000}", score, 3)
+            began = time.perf_counter()
+            submit(record)
+            latencies[index].append(time.perf_counter() - began)
+
+    threads = [threading.Thread(target=session, args=(index,)) for index in range(sessions)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - began, np.concatenate([np.asarray(values) for values in latencies])
+
+
+def bench_writes(sizes, repeat, workdir):
+    results = []
+    for n in sizes:
+        for sessions in WRITE_SESSIONS:
+            for mode in ("direct", "batched"):
+                store = SQLiteStore(os.path.join(workdir, f"writes_{n}_{sessions}_{mode}.db"))
+                writer = BatchWriter(store) if mode == "batched" else None
+                # A session waits until its own record is committed, as the assessment page does
+                submit = store.add if writer is None else (lambda record: writer.submit(record).result())
+                wall, latencies = _submit_concurrently(submit, n, sessions)
+                p50, p99 = np.percentile(latencies, [50, 99])
+                row = {
+                    "students": n, "sessions": sessions, "mode": mode, "min_s": wall,
+                    "submits_per_s": n / wall, "p50_s": float(p50), "p99_s": float(p99),
+                }
+                if writer is not None:
+                    row["mean_batch"] = writer.stats()["mean_batch"]
+                    writer.close()
+                store.close()
+                results.append(row)
+                print(f"  writes {mode:<7} {n:>10,} submits {sessions:>4} sessions  "
+                      f"{n / wall:9.0f}/s  p99 {p99 * 1000:8.2f} ms", file=sys.stderr)
+    return results
+
+
+def bench_distribution(sizes, repeat):
+    results = []
+    qs = [0.25, 0.5, 0.75, 0.9, 0.99]
+    for n in sizes:
+        total, deadline, daily = _cohort(n)
+        alis = np.round(score_arrays(total, deadline, daily)["ali"], 2)
+        sketch = AliSketch.from_values(alis)
+
+        def sorted_query():
+            np.percentile(alis, [q * 100 for q in qs], method="inverted_cdf")
+            np.histogram(np.minimum(alis, 3.0), bins=31, range=(0.0, 3.1))
+
+        def sketch_query():
+            sketch.quantiles(qs)
+            sketch.histogram()
+
+        for mode, query in (("sort", sorted_query), ("sketch", sketch_query)):
+            best, median = _timeit(query, repeat)
+            results.append({"students": n, "mode": mode, "min_s": best, "median_s": median})
+            print(f"  distribution {mode:<7} {n:>10,} students  {best * 1000:9.3f} ms", file=sys.stderr)
+    return results
+
+
+# ============================================================================
+# REPORTING
+# ============================================================================
+def _environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def _metric_key(suite, row):
+    return (suite, row.get("students"), row.get("format"), row.get("workers"), row.get("page"),
+            row.get("sessions"), row.get("mode"))
+
+
+def compare(baseline, current, threshold=0.10):
+    """Print timing ratios current/baseline; return the number of regressions."""
+    timing_fields = ("min_s", "rerun_min_s", "cold_s", "p99_s")
+    base_rows = {
+        _metric_key(suite, row): row
+        for suite, rows in baseline["results"].items()
+        for row in rows
+    }
+    regressions = 0
+    for suite, rows in current["results"].items():
+        for row in rows:
+            old = base_rows.get(_metric_key(suite, row))
+            if old is None:
+                continue
+            for field in timing_fields:
+                if field in row and old.get(field):
+                    ratio = row[field] / old[field]
+                    flag = "REGRESSION" if ratio > 1 + threshold else ""
+                    regressions += bool(flag)
+                    variant = (row.get("format") or row.get("page")
+                               or (f"{row['workers']}w" if "workers" in row else "")
+                               or (f"{row['mode']} {row['sessions']}s" if "sessions" in row else "")
+                               or row.get("mode", ""))
+                    label = f"{suite} {variant} n={row.get('students'):,}"
+                    print(f"{label:<40} {field:<12} {ratio:6.2f}x {flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.split("\n\n")[0])
+    parser.add_argument("-o", "--output", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--quick", action="store_true", help="small sizes only (smoke run)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed repetitions per measurement")
+    parser.add_argument("--only", choices=sorted(SIZES), action="append", help="run only these suites")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a previous results file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown ratio reported as a regression (default: 0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    sizes = QUICK_SIZES if args.quick else SIZES
+    suites = args.only or list(SIZES)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        if "scoring" in suites:
+            results["scoring"] = bench_scoring(sizes["scoring"], args.repeat)
+        if "assignments" in suites:
+            results["assignments"] = bench_assignments(sizes["assignments"], args.repeat)
+        if "dashboard" in suites:
+            results["dashboard"] = bench_dashboard(sizes["dashboard"], args.repeat, workdir)
+        if "export" in suites:
+            results["export"] = bench_export(sizes["export"], args.repeat, workdir)
+        if "sharded" in suites:
+            results["sharded"] = bench_sharded(sizes["sharded"], args.repeat, workdir)
+        if "startup" in suites:
+            results["startup"] = bench_startup(sizes["startup"], args.repeat, workdir)
+        if "writes" in suites:
+            results["writes"] = bench_writes(sizes["writes"], args.repeat, workdir)
+        if "distribution" in suites:
+            results["distribution"] = bench_distribution(sizes["distribution"], args.repeat)
+
+    report = {"environment": _environment(), "repeat": args.repeat, "results": results}
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Wrote {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        return 1 if compare(baseline, report, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Alert batches reach the outbox once, and a restarted scanner resumes."""
+
+import json
+
+import pytest
+
+from academiq.alerts import AlertScanner, JSONLinesOutbox, SQLiteOutbox
+from academiq.engine import STATUS_CRITICAL, STATUS_WARNING, score_student
+from academiq.records import make_record
+from academiq.store import MemoryStore, SQLiteStore
+
+SUBJECTS = [{"name": "Math", "assignments": 2, "hours_per_assignment": 3, "deadline_days": 4}]
+
+
+def _record(name, daily_hours):
+    # 6 h due in 4 days: 2 h/day is Safe (0.75), 1.2 Warning (1.25), 1 Critical (1.5)
+    return make_record(name, score_student(SUBJECTS, daily_hours), daily_hours)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    return MemoryStore() if request.param == "memory" else SQLiteStore(str(tmp_path / "records.db"))
+
+
+def test_sqlite_outbox_delivers_each_alert_once(store, tmp_path):
+    store.add_many([_record("Ada", 2)])  # before the scanner: never alerted
+    outbox = SQLiteOutbox(str(tmp_path / "alerts.db"))
+    scanner = AlertScanner(store, outbox)
+    store.add_many([_record("Ada", 1), _record("Bo", 1.2), _record("Cy", 2)])
+
+    sent = scanner.scan()
+    assert sorted((a.name, a.from_status, a.to_status) for a in sent) == [
+        ("Ada", 0, STATUS_CRITICAL), ("Bo", None, STATUS_WARNING),
+    ]
+    pending = outbox.pending()
+    assert sorted(alert.name for _, alert in pending) == ["Ada", "Bo"]
+    outbox.mark_delivered(outbox_id for outbox_id, _ in pending)
+    assert outbox.pending() == []
+
+    # A restarted scanner resumes from the outbox's watermark: nothing is re-sent
+    assert AlertScanner(store, outbox).scan() == []
+    store.add_many([_record("Cy", 1)])
+    assert [alert.name for _, alert in outbox.pending()] == []
+    assert [a.name for a in AlertScanner(store, outbox).scan()] == ["Cy"]
+    assert [alert.name for _, alert in outbox.pending()] == ["Cy"]
+
+
+def test_jsonlines_outbox_appends_one_object_per_alert(store, tmp_path):
+    path = tmp_path / "alerts.jsonl"
+    scanner = AlertScanner(store, JSONLinesOutbox(str(path)))
+    store.add_many([_record("Ada", 1), _record("Bo", 2)])
+    scanner.scan()
+    scanner.scan()
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [(line["name"], line["to_label"]) for line in lines] == [("Ada", "Critical Overload")]
+    assert lines[0]["watermark"] == store.last_change()
@@ -0,0 +1,61 @@
+"""ALI scoring against the original form's formula, at the status boundaries."""
+
+import math
+
+import numpy as np
+import pytest
+
+from academiq.engine import ThresholdPolicy, classify, score_arrays, score_student
+
+BASELINE_STATUS = ("Safe", "Warning", "Critical Overload")
+
+
+def _baseline(total_hours, min_deadline, daily_hours, safe_max=1.0, warning_max=1.3):
+    # The original app: ALI = hours / (daily x tightest deadline), classified
+    # at the 2 decimals it was stored and counted at
+    available = daily_hours * min_deadline
+    ali = total_hours / available if available > 0 else float("inf")
+    stored = round(ali, 2) if math.isfinite(ali) else ali
+    if stored < safe_max:
+        return ali, 0
+    if stored <= warning_max:
+        return ali, 1
+    return ali, 2
+
+
+# Hours due over 100 available hours (1 h/day for 100 days)
+BOUNDARY_HOURS = [0, 99.4, 99.6, 100, 104, 129.9, 130, 130.4, 130.6, 131, 250]
+
+
+@pytest.mark.parametrize("policy", [None, ThresholdPolicy(0.8, 1.05, "strict")])
+def test_score_arrays_matches_baseline_formula(policy):
+    cutoffs = {} if policy is None else {"safe_max": policy.safe_max, "warning_max": policy.warning_max}
+    expected = [_baseline(hours, 100, 1.0, **cutoffs) for hours in BOUNDARY_HOURS]
+    result = score_arrays(BOUNDARY_HOURS, [100] * len(BOUNDARY_HOURS), [1.0] * len(BOUNDARY_HOURS), policy)
+    np.testing.assert_allclose(result["ali"], [ali for ali, _ in expected])
+    assert result["status_code"].tolist() == [code for _, code in expected]
+
+
+def test_status_boundaries_are_inclusive_as_in_the_form():
+    assert classify([0.99, 1.0, 1.3, 1.31]).tolist() == [0, 1, 1, 2]
+    # 0.996 is stored as 1.00 and 1.304 as 1.30: classified as stored
+    assert classify([0.996, 1.304, 1.306]).tolist() == [1, 1, 2]
+
+
+def test_no_available_time_is_critical():
+    result = score_arrays([5.0, 0.0], [3, 3], [0.0, 0.0])
+    assert np.isinf(result["ali"]).all()
+    assert result["status_code"].tolist() == [2, 2]
+
+
+def test_score_student_matches_baseline_for_a_form_submission():
+    subjects = [
+        {"assignments": 2, "hours_per_assignment": 3, "deadline_days": 4},
+        {"assignments": 1, "hours_per_assignment": 7, "deadline_days": 2},
+    ]
+    score = score_student(subjects, 3.5)
+    ali, code = _baseline(13, 2, 3.5)
+    assert score.ali == pytest.approx(ali)
+    assert score.status_code == code
+    assert BASELINE_STATUS[code] == score.status
+    assert (score.buffer_hours, score.shortage_hours) == (0.0, pytest.approx(6.0))
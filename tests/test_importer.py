@@ -0,0 +1,65 @@
+"""Bulk cohort import: results must not depend on how the file is chunked."""
+
+import pandas as pd
+import pytest
+
+from academiq.importer import import_cohort
+from academiq.parallel import score_sharded
+
+# Student ids that look numeric must stay text, whichever chunk they land in
+WORKLOAD = """student,assignments,hours_per_assignment,deadline_days,daily_hours
+007,2,3,5,4
+7,1,2,3,2
+Ada,3,2,4,3
+007,1,4,2,4
+Bo,1,1,9,1
+7,2,2,6,2
+Ada,1,5,1,3
+"""
+
+
+@pytest.fixture
+def workload(tmp_path):
+    path = tmp_path / "workload.csv"
+    path.write_text(WORKLOAD)
+    return str(path)
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 3, 5, 100])
+def test_import_is_independent_of_chunksize(workload, chunksize):
+    expected = import_cohort(workload, chunksize=100).sort_index()
+    result = import_cohort(workload, chunksize=chunksize).sort_index()
+    assert list(result.index) == ["007", "7", "Ada", "Bo"]
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_sharded_import_matches_sequential(workload):
+    expected = import_cohort(workload).sort_index()
+    result = score_sharded(workload, workers=2, block_bytes=32, chunksize=1)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_blank_numeric_cells_are_rejected(tmp_path):
+    path = tmp_path / "blank.csv"
+    path.write_text(WORKLOAD + "Cy,1,2,3,\n")
+    with pytest.raises(ValueError, match="daily_hours.*Cy"):
+        import_cohort(str(path))
+    path.write_text(WORKLOAD + "Di,x,2,3,4\n")
+    with pytest.raises(ValueError, match="assignments.*Di"):
+        import_cohort(str(path), chunksize=2)
+
+
+@pytest.mark.parametrize("chunksize", [1, 100])
+def test_spellings_of_one_student_are_aggregated_together(tmp_path, chunksize):
+    path = tmp_path / "spellings.csv"
+    path.write_text(
+        "student,assignments,hours_per_assignment,deadline_days,daily_hours\n"
+        "Ada Lovelace,2,3,3,2\n"
+        " ada  lovelace ,2,3,3,2\n"
+    )
+    result = import_cohort(str(path), chunksize=chunksize)
+    assert list(result.index) == ["Ada Lovelace"]  # first spelling is shown
+    assert result.loc["Ada Lovelace", "ali"] == 2.0  # 12 h over 2 h/day x 3 days
+    assert result.loc["Ada Lovelace", "status"] == "Critical Overload"
+    sharded = score_sharded(str(path), workers=2, block_bytes=16, chunksize=1)
+    pd.testing.assert_frame_equal(sharded, result, check_dtype=False)
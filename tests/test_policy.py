@@ -0,0 +1,57 @@
+"""Changing the threshold policy reclassifies what both stores hold."""
+
+import pytest
+
+from academiq.engine import ThresholdPolicy, score_student
+from academiq.records import make_record
+from academiq.store import MemoryStore, SQLiteStore
+
+# 6 h due in 4 days; daily hours -> ALI
+DAILY_HOURS = {"Ada": 2, "Bo": 1.6, "Cy": 1.3, "Di": 1}  # 0.75, 0.94, 1.15, 1.5
+SUBJECTS = [{"name": "Math", "assignments": 2, "hours_per_assignment": 3, "deadline_days": 4}]
+STRICT = ThresholdPolicy(0.9, 1.1, "strict")
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    store = MemoryStore() if request.param == "memory" else SQLiteStore(str(tmp_path / "records.db"))
+    store.add_many([
+        make_record(name, score_student(SUBJECTS, daily), daily, subjects=SUBJECTS)
+        for name, daily in DAILY_HOURS.items()
+    ])
+    return store
+
+
+def _statuses(store):
+    return {code: sorted(r["Name"] for r in store.by_status(code)) for code in (0, 1, 2)}
+
+
+def test_set_policy_reclassifies_records_counts_and_subjects(store):
+    assert _statuses(store) == {0: ["Ada", "Bo"], 1: ["Cy"], 2: ["Di"]}
+    version = store.version
+
+    assert store.set_policy(STRICT) > 0
+    assert store.policy == STRICT
+    assert store.version > version
+    assert _statuses(store) == {0: ["Ada"], 1: ["Bo"], 2: ["Cy", "Di"]}
+    assert store.counts_by_status() == {0: 1, 1: 1, 2: 2}
+    assert store.stats()["counts"] == {0: 1, 1: 1, 2: 2}
+    assert {r["Name"]: r["Status"] for r in store.top("ali", 4)}["Cy"] == "🚨 Critical Overload"
+    [math] = store.subject_load()
+    assert (math["Critical Students"], math["Critical Hours"]) == (2, 12.0)
+
+    assert store.set_policy(STRICT) == 0  # unchanged: nothing moves
+    store.set_policy(ThresholdPolicy())
+    assert _statuses(store) == {0: ["Ada", "Bo"], 1: ["Cy"], 2: ["Di"]}
+
+
+def test_new_records_use_the_current_policy(store):
+    store.set_policy(STRICT)
+    store.add_many([make_record("Ed", score_student(SUBJECTS, 1.3), 1.3)])  # ALI 1.15
+    assert "Ed" in [r["Name"] for r in store.by_status(2)]
+
+
+def test_sqlite_policy_persists(tmp_path):
+    path = str(tmp_path / "records.db")
+    SQLiteStore(path).set_policy(STRICT)
+    assert SQLiteStore(path).policy == STRICT
@@ -0,0 +1,75 @@
+"""Request validation and micro-batching of the scoring API."""
+
+import asyncio
+import json
+from http import HTTPStatus
+
+import pytest
+
+import academiq.server
+from academiq.engine import score_students
+from academiq.server import MicroBatcher, ScoringAPI
+from academiq.store import MemoryStore
+
+SUBJECT = {"assignments": 2, "hours_per_assignment": 3, "deadline_days": 7}
+
+
+@pytest.fixture
+def api():
+    api = ScoringAPI(MemoryStore())
+    yield api
+    api.writer.close()
+
+
+def _call(api, method, path, payload):
+    return asyncio.run(api.handle(method, path, {}, json.dumps(payload).encode()))
+
+
+@pytest.mark.parametrize("student", [
+    {"daily_hours": 0.5, "subjects": [SUBJECT]},
+    {"daily_hours": 25, "subjects": [SUBJECT]},
+    {"daily_hours": "lots", "subjects": [SUBJECT]},
+    {"daily_hours": 4, "subjects": [dict(SUBJECT, deadline_days=0)]},
+    {"daily_hours": 4, "subjects": [dict(SUBJECT, deadline_days=1e9)]},
+    {"daily_hours": 4, "subjects": [dict(SUBJECT, assignments=-1)]},
+    {"daily_hours": 4, "subjects": [dict(SUBJECT, hours_per_assignment=1e308)]},
+    {"daily_hours": 4, "subjects": "Math"},
+    ["not", "an", "object"],
+])
+def test_invalid_students_are_rejected_with_400(api, student):
+    status, body = _call(api, "POST", "/score", student)
+    assert status == HTTPStatus.BAD_REQUEST, body
+    status, body = _call(api, "POST", "/score/batch", {"students": [student]})
+    assert status == HTTPStatus.BAD_REQUEST, body
+
+
+def test_batch_body_must_be_an_object(api):
+    status, _ = _call(api, "POST", "/score/batch", [{"daily_hours": 4, "subjects": [SUBJECT]}])
+    assert status == HTTPStatus.BAD_REQUEST
+
+
+def test_valid_student_is_scored(api):
+    status, body = _call(api, "POST", "/score", {"daily_hours": 4, "subjects": [SUBJECT]})
+    assert status == HTTPStatus.OK
+    assert body["ali"] == score_students([([SUBJECT], 4)])[0].ali
+
+
+def test_failing_item_only_fails_its_own_request(monkeypatch):
+    def fragile(items, policy=None):
+        if any(daily == 13 for _, daily in items):
+            raise ArithmeticError("cannot score")
+        return score_students(items, policy)
+
+    monkeypatch.setattr(academiq.server, "score_students", fragile)
+
+    async def submit_all():
+        batcher = MicroBatcher(window=0.01)
+        return await asyncio.gather(
+            *(batcher.submit([SUBJECT], daily) for daily in (4, 13, 6)), return_exceptions=True
+        ), batcher
+
+    (good, bad, other), batcher = asyncio.run(submit_all())
+    assert batcher.batches == 1
+    assert isinstance(bad, ArithmeticError)
+    assert good == score_students([([SUBJECT], 4)])[0]
+    assert other == score_students([([SUBJECT], 6)])[0]
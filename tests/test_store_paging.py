@@ -0,0 +1,29 @@
+"""Paging through the record stores when many students share an ALI."""
+
+import pytest
+
+from academiq.engine import score_student
+from academiq.records import make_record
+from academiq.store import MemoryStore, SQLiteStore
+
+SUBJECTS = [{"name": "Math", "assignments": 2, "hours_per_assignment": 3, "deadline_days": 4}]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    return MemoryStore() if request.param == "memory" else SQLiteStore(str(tmp_path / "records.db"))
+
+
+def _records(names, daily_hours):
+    return [make_record(name, score_student(SUBJECTS, daily_hours), daily_hours) for name in names]
+
+
+def test_tied_ali_pages_cover_every_student_once(store):
+    store.add_many(_records([f"tied-{i}" for i in range(30)], 4))
+    store.add_many(_records(["tied-3", "tied-17"], 4))  # re-assessed: stored again, same ALI
+    store.add_many(_records([f"low-{i}" for i in range(5)], 8))
+
+    first = [r["Name"] for r in store.top("ali", 10)]
+    assert first == [r["Name"] for r in store.ali_range(limit=10, offset=0)]
+    shown = first + [r["Name"] for offset in (10, 20, 30) for r in store.ali_range(limit=10, offset=offset)]
+    assert sorted(shown) == sorted([f"tied-{i}" for i in range(30)] + [f"low-{i}" for i in range(5)])
@@ -0,0 +1,42 @@
+"""Two SQLiteStore connections on one database file stay in step."""
+
+import pytest
+
+import academiq.store
+from academiq.engine import ThresholdPolicy, score_student
+from academiq.records import make_record
+from academiq.store import SQLiteStore
+
+
+def _record(name, subjects, daily_hours):
+    return make_record(name, score_student(subjects, daily_hours), daily_hours, subjects=subjects)
+
+
+def _subjects(name, assignments):
+    return [{"name": name, "assignments": assignments, "hours_per_assignment": 3, "deadline_days": 4}]
+
+
+def _snapshot(store):
+    return (store.policy, store.stats(), store.counts_by_status(), store.top("ali", 10), store.subject_load())
+
+
+def _write(store):
+    store.add_many([_record(f"s{i}", _subjects("Math", i % 4 + 1), i % 5 + 0.5) for i in range(12)])
+    store.add_many([_record("s3", _subjects("Art", 6), 0.5), _record("s4", _subjects("Math", 1), 8)])
+    store.set_policy(ThresholdPolicy(0.8, 1.2))
+    store.add_many([_record("s20", _subjects("Bio", 2), 1)])
+
+
+@pytest.mark.parametrize("keep", [200_000, 5])
+def test_lagging_store_replays_other_connections_commits(tmp_path, monkeypatch, keep):
+    monkeypatch.setattr(academiq.store, "CHANGE_LOG_KEEP", keep)  # 5: the log is pruned past the reader
+    path = str(tmp_path / "records.db")
+    writer, reader = SQLiteStore(path), SQLiteStore(path)
+    reader.top("ali", 10)  # build the heap index, so it is maintained too
+    _write(writer)
+    assert _snapshot(reader) == _snapshot(SQLiteStore(path))
+
+    reader.add_many([_record("s5", _subjects("Art", 2), 2)])
+    writer.clear()
+    writer.add_many([_record("t1", _subjects("Math", 2), 2)])
+    assert _snapshot(reader) == _snapshot(SQLiteStore(path)) == _snapshot(writer)
@@ -0,0 +1,33 @@
+"""The top-K index against a full sort, across merges, compactions and ties."""
+
+import random
+
+import pytest
+
+import academiq.topk
+from academiq.topk import RANK_KEYS, TopKIndex
+
+
+@pytest.mark.parametrize("dense_ids", [True, False])
+def test_top_matches_a_full_sort(monkeypatch, dense_ids):
+    monkeypatch.setattr(academiq.topk, "MIN_PENDING", 5)  # merge into the sorted block often
+    rng = random.Random(7)
+    index, live = TopKIndex(dense_ids=dense_ids), {}
+    for _ in range(300):
+        if live and rng.random() < 0.2:
+            record_id = rng.choice(list(live))
+            index.remove(record_id)
+            del live[record_id]
+            continue
+        items = [
+            (rng.randrange(40), {"ALI": rng.choice([0.5, 1.25, 2.0]), "Total Hours": rng.randint(1, 5),
+                                 "Available Hours": rng.randint(1, 5), "Tightest Deadline": rng.randint(1, 3)})
+            for _ in range(rng.choice([1, 4, 30]))
+        ]
+        index.add_many(items)
+        live.update(items)
+        for key, rank in RANK_KEYS.items():
+            # Ties: higher id first
+            expected = sorted(live, key=lambda record_id: (-rank(live[record_id]), -record_id))[:10]
+            assert index.top(key, 10) == expected
+    assert len(index) == len(live)
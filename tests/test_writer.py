@@ -0,0 +1,80 @@
+"""The shared write queue confirms a submission only once it is stored."""
+
+import threading
+
+import pytest
+
+from academiq.engine import score_student
+from academiq.records import make_record
+from academiq.store import MemoryStore
+from academiq.writer import BatchWriter, WriterOverloaded
+
+SUBJECTS = [{"name": "Math", "assignments": 2, "hours_per_assignment": 3, "deadline_days": 4}]
+
+
+def _record(name):
+    return make_record(name, score_student(SUBJECTS, 2), 2)
+
+
+class GatedStore(MemoryStore):
+    """Holds every write until `gate` is set; fails it if `error` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.error = None
+
+    def add_many(self, records):
+        self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        super().add_many(records)
+
+
+@pytest.fixture
+def store():
+    return GatedStore()
+
+
+def test_future_resolves_only_after_the_commit(store):
+    writer = BatchWriter(store)
+    try:
+        future = writer.submit(_record("Ada"))
+        assert not future.done()
+        assert len(store) == 0
+        store.gate.set()
+        assert future.result(timeout=5) is None
+        assert [r["Name"] for r in store.all()] == ["Ada"]
+    finally:
+        writer.close()
+
+
+def test_failed_write_fails_every_waiter_in_the_batch(store):
+    store.error = OSError("disk full")
+    writer = BatchWriter(store, max_delay=0.05)
+    try:
+        futures = [writer.submit(_record(name)) for name in ("Ada", "Bo")]
+        store.gate.set()
+        for future in futures:
+            with pytest.raises(OSError, match="disk full"):
+                future.result(timeout=5)
+        assert len(store) == 0
+        assert writer.stats()["failed"] == 2
+    finally:
+        writer.close()
+
+
+def test_full_queue_rejects_instead_of_confirming(store):
+    writer = BatchWriter(store, max_batch=1, max_pending=1)
+    try:
+        writer.submit(_record("Ada"))  # taken by the writer thread, blocked on the gate
+        queued = writer.submit(_record("Bo"), timeout=1)
+        with pytest.raises(WriterOverloaded):
+            writer.submit(_record("Cy"), timeout=0.05)
+        store.gate.set()
+        queued.result(timeout=5)
+        writer.flush()
+        assert sorted(r["Name"] for r in store.all()) == ["Ada", "Bo"]
+        assert writer.stats()["rejected"] == 1
+    finally:
+        writer.close()